@@ -6,17 +6,26 @@ PyMT is a python module for developing multi-touch enabled media rich applicatio
 Currently the aim is to allow for quick and easy interaction design and rapid prototype development. There is also a focus on logging tasks or sessions of user interaction to quantitative data and the analysis/visualization of such data.
 
 You can visit http://pymt.txzone.net/ for more informations !
+
+Only the light parts of PyMT (configuration, clock, events, vector,
+gesture...) are imported with the package. The heavy subsystems (OpenGL,
+CSS, input and core providers, widgets) are imported on the first use of
+one of their names, or by pymt_import_all() ::
+
+    from pymt.vector import Vector      # no OpenGL initialization
+    from pymt import *                  # everything is imported
 '''
 
 from __future__ import with_statement
 from ConfigParser import ConfigParser
+from types import ModuleType
 import sys
 import getopt
 import os
 from logger import pymt_logger, LOG_LEVELS
 
 # Version number of current configuration format
-PYMT_CONFIG_VERSION = 3
+PYMT_CONFIG_VERSION = 10
 
 # Global settings options for pymt
 options = {
@@ -158,6 +167,35 @@ if not os.path.basename(sys.argv[0]).startswith('sphinx'):
             # add show cursor
             pymt_config.setdefault('graphics', 'show_cursor', '1')
 
+        elif pymt_config_version == 3:
+            # add frame pacing
+            pymt_config.setdefault('pymt', 'max_fps', '0')
+
+        elif pymt_config_version == 4:
+            # add redraw on demand
+            pymt_config.setdefault('graphics', 'redraw_on_demand', '0')
+
+        elif pymt_config_version == 5:
+            # add profiler trace
+            pymt_config.setdefault('pymt', 'profile_trace', '')
+
+        elif pymt_config_version == 6:
+            # add cache size budget (in megabytes)
+            pymt_config.setdefault('graphics', 'cache_budget', '64')
+
+        elif pymt_config_version == 7:
+            # add disk cache
+            pymt_config.setdefault('pymt', 'disk_cache', '1')
+
+        elif pymt_config_version == 8:
+            # add input recorder
+            pymt_config.setdefault('pymt', 'record_input', '')
+
+        elif pymt_config_version == 9:
+            # add fixed timestep and frames limit
+            pymt_config.setdefault('pymt', 'fixed_timestep', '0')
+            pymt_config.setdefault('pymt', 'max_frames', '0')
+
         else:
             # for future.
             pass
@@ -187,30 +225,80 @@ if not os.path.basename(sys.argv[0]).startswith('sphinx'):
     from baseobject import *
     from exceptions import *
     from cache import Cache
+    from diskcache import DiskCache
 
     # system dependices
     from utils import *
     from time import *
     from event import *
     from clock import *
-    from texture import *
-    from plugin import *
+    from profiler import *
 
     # internal dependices
-    from graphx import *
     from vector import *
+    from affine import *
+    from gesture import *
 
-    # dependices
-    from core import *
-    from modules import *
-    from input import *
-    from base import *
+    # heavy subsystems, imported by pymt_import_all(), in this order
+    _heavy_subsystems = (
+        # system dependices
+        'texture', 'plugin',
+        # internal dependices
+        'graphx',
+        # dependices
+        'core', 'modules', 'input', 'base',
+        # widgets
+        'ui',
+    )
+    _import_state = {'loaded': False, 'loading': False}
+
+    def pymt_import_all():
+        '''Import all the heavy subsystems of PyMT, and create the shadow
+        window. It's done automatically on the first access to one of their
+        names.'''
+        if _import_state['loaded'] or _import_state['loading']:
+            return
+        _import_state['loading'] = True
+        module = sys.modules['pymt']
+
+        # headless without an offscreen context: OpenGL calls do nothing
+        if 'null' in options['window'] and \
+           os.environ.get('PYOPENGL_PLATFORM') != 'osmesa':
+            from nullgl import install_null_gl
+            install_null_gl()
 
-    # after dependices
-    from gesture import *
+        try:
+            for name in _heavy_subsystems:
+                # same as "from name import *"
+                mod = __import__('pymt.%s' % name, fromlist=['*'])
+                names = getattr(mod, '__all__', None)
+                if names is None:
+                    names = [x for x in dir(mod) if not x.startswith('_')]
+                for x in names:
+                    setattr(module, x, getattr(mod, x))
+            _import_state['loaded'] = True
+        finally:
+            _import_state['loading'] = False
 
-    # widgets
-    from ui import *
+        # last initialization
+        if options['shadow_window']:
+            pymt_logger.debug('Creating PyMT Window')
+            module.shadow_window = module.MTWindow()
+
+    class _PyMTModule(ModuleType):
+        '''PyMT package, importing the heavy subsystems when a missing name
+        is requested.'''
+        def __getattr__(self, name):
+            if name.startswith('_') and name != '__all__':
+                raise AttributeError(name)
+            if not _import_state['loaded']:
+                pymt_import_all()
+            if name == '__all__':
+                return [x for x in self.__dict__ if not x.startswith('_')]
+            try:
+                return self.__dict__[name]
+            except KeyError:
+                raise AttributeError(name)
 
     #from obj import OBJ
     #from plugin import *
@@ -220,12 +308,14 @@ if not os.path.basename(sys.argv[0]).startswith('sphinx'):
     # Can be overrided in command line
     try:
         opts, args = getopt.getopt(sys.argv[1:], 'hp:fwFem:s',
-            ['help', 'fullscreen', 'windowed', 'fps', 'event',
-             'module=', 'save',
+            ['help', 'fullscreen', 'windowed', 'fps', 'eventstats',
+             'module=', 'save', 'profile-trace=', 'record=',
+             'headless', 'fixed-timestep=', 'max-frames=',
              'display=', 'size=', 'dump-frame', 'dump-format=', 'dump-prefix='])
         need_save = False
         for opt, arg in opts:
             if opt in ['-h', '--help']:
+                from base import pymt_usage
                 pymt_usage()
                 sys.exit(0)
             elif opt in ['-p', '--provider']:
@@ -239,6 +329,16 @@ if not os.path.basename(sys.argv[0]).startswith('sphinx'):
                 pymt_config.set('pymt', 'show_fps', '1')
             elif opt in ['-e', '--eventstats']:
                 pymt_config.set('pymt', 'show_eventstats', '1')
+            elif opt in ['--profile-trace']:
+                pymt_config.set('pymt', 'profile_trace', str(arg))
+            elif opt in ['--record']:
+                pymt_config.set('pymt', 'record_input', str(arg))
+            elif opt in ['--headless']:
+                options['window'] = ('null', )
+            elif opt in ['--fixed-timestep']:
+                pymt_config.set('pymt', 'fixed_timestep', str(arg))
+            elif opt in ['--max-frames']:
+                pymt_config.set('pymt', 'max_frames', str(arg))
             elif opt in ['--dump-frame']:
                 pymt_config.set('dump', 'enabled', '1')
             elif opt in ['--dump-prefix']:
@@ -253,6 +353,7 @@ if not os.path.basename(sys.argv[0]).startswith('sphinx'):
                 pymt_config.set('graphics', 'display', str(arg))
             elif opt in ['-m', '--module']:
                 if str(arg) == 'list':
+                    from modules import pymt_modules
                     pymt_modules.usage_list()
                     sys.exit(0)
                 pymt_config.set('modules', str(arg), '')
@@ -268,12 +369,13 @@ if not os.path.basename(sys.argv[0]).startswith('sphinx'):
             pymt_logger.info('PyMT configuration saved.')
             sys.exit(0)
 
-        # last initialization
-        if options['shadow_window']:
-            pymt_logger.debug('Creating PyMT Window')
-            shadow_window = MTWindow()
-
     except getopt.GetoptError, err:
         pymt_logger.error(err)
+        from base import pymt_usage
         pymt_usage()
         sys.exit(2)
+
+    # replace the package by the lazy one: names are looked up in the lazy
+    # package, and the heavy subsystems are imported in it.
+    sys.modules[__name__] = _PyMTModule(__name__, __doc__)
+    sys.modules[__name__].__dict__.update(globals())
@@ -0,0 +1,123 @@
+'''
+Affine: 2D affine transformation, computed without OpenGL
+
+A transformation is stored as 6 values (a, b, c, d, e, f), and transform a
+point like this ::
+
+    x' = a * x + c * y + e
+    y' = b * x + d * y + f
+
+Transformations are immutable: all operations return a new transformation.
+The inverse is computed only once, and cached.
+
+Transformations can be composed like OpenGL calls, the last one is applied
+first on the point ::
+
+    # same as glTranslatef(10, 20, 0); glRotatef(45, 0, 0, 1)
+    t = AffineTransform.translation(10, 20).rotate(45)
+'''
+
+__all__ = ['AffineTransform']
+
+from math import radians, cos, sin
+
+class AffineTransform(object):
+    '''2D affine transformation.
+
+    :Parameters:
+        `a`, `b`, `c`, `d`, `e`, `f` : float
+            Values of the transformation, default to identity
+    '''
+
+    __slots__ = ('a', 'b', 'c', 'd', 'e', 'f', '_inverse')
+
+    def __init__(self, a=1., b=0., c=0., d=1., e=0., f=0.):
+        self.a, self.b, self.c, self.d, self.e, self.f = a, b, c, d, e, f
+        self._inverse = None
+
+    @staticmethod
+    def from_gl(m):
+        '''Create a transformation from an OpenGL 4x4 matrix (as returned by
+        glGetFloatv(GL_MODELVIEW_MATRIX), or flat with 16 values)'''
+        if len(m) == 16:
+            return AffineTransform(m[0], m[1], m[4], m[5], m[12], m[13])
+        return AffineTransform(m[0][0], m[0][1], m[1][0], m[1][1],
+                               m[3][0], m[3][1])
+
+    @staticmethod
+    def translation(x, y):
+        '''Create a translation'''
+        return AffineTransform(e=x, f=y)
+
+    @staticmethod
+    def scaling(sx, sy=None):
+        '''Create a scaling. If `sy` is None, `sx` is used for both axis'''
+        if sy is None:
+            sy = sx
+        return AffineTransform(a=sx, d=sy)
+
+    @staticmethod
+    def rotation(angle):
+        '''Create a rotation, `angle` in degrees (counter clockwise)'''
+        angle = radians(angle)
+        c, s = cos(angle), sin(angle)
+        return AffineTransform(a=c, b=s, c=-s, d=c)
+
+    def to_gl(self):
+        '''Return the transformation as an OpenGL 4x4 matrix, usable with
+        glMultMatrixf()'''
+        return [[self.a, self.b, 0., 0.],
+                [self.c, self.d, 0., 0.],
+                [0., 0., 1., 0.],
+                [self.e, self.f, 0., 1.]]
+
+    def translate(self, x, y):
+        '''Return the transformation composed with a translation'''
+        return self.multiply(AffineTransform.translation(x, y))
+
+    def scale(self, sx, sy=None):
+        '''Return the transformation composed with a scaling'''
+        return self.multiply(AffineTransform.scaling(sx, sy))
+
+    def rotate(self, angle):
+        '''Return the transformation composed with a rotation'''
+        return self.multiply(AffineTransform.rotation(angle))
+
+    def multiply(self, other):
+        '''Return the transformation that apply `other`, then self'''
+        a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
+        return AffineTransform(
+            a * other.a + c * other.b,
+            b * other.a + d * other.b,
+            a * other.c + c * other.d,
+            b * other.c + d * other.d,
+            a * other.e + c * other.f + e,
+            b * other.e + d * other.f + f)
+
+    def inverse(self):
+        '''Return the inverse transformation'''
+        if self._inverse is None:
+            a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
+            det = float(a * d - b * c)
+            if det == 0:
+                raise ZeroDivisionError('Singular transformation')
+            ia, ib, ic, id = d / det, -b / det, -c / det, a / det
+            inverse = AffineTransform(ia, ib, ic, id,
+                -(ia * e + ic * f), -(ib * e + id * f))
+            inverse._inverse = self
+            self._inverse = inverse
+        return self._inverse
+
+    def transform_point(self, x, y):
+        '''Apply the transformation on a point, return (x, y)'''
+        return (self.a * x + self.c * y + self.e,
+                self.b * x + self.d * y + self.f)
+
+    def is_identity(self):
+        '''Return True if the transformation do nothing'''
+        return self.a == 1 and self.b == 0 and self.c == 0 and \
+               self.d == 1 and self.e == 0 and self.f == 0
+
+    def __repr__(self):
+        return '<AffineTransform a=%g b=%g c=%g d=%g e=%g f=%g>' % (
+            self.a, self.b, self.c, self.d, self.e, self.f)
@@ -15,9 +15,13 @@ __all__ = [
 import pymt
 import sys
 import os
+import select
+import socket
 from logger import pymt_logger
 from exceptions import pymt_exception_manager, ExceptionManager
 from clock import getClock
+from profiler import getProfiler
+from cache import Cache
 from input import *
 
 # All event listeners will add themselves to this
@@ -56,20 +60,41 @@ def getEventLoop():
 
 class TouchEventLoop(object):
     '''Main event loop. This loop handle update of input + dispatch event
+
+    If the clock have a `max_fps`, the loop is sleeping between frames.
+    When nothing happen (no input, nothing to redraw, and all the providers
+    are event driven), the loop sleep until the next scheduled event, or
+    until the window events must be polled. Input providers running in
+    another thread can call wakeup() to interrupt the sleep.
     '''
     def __init__(self):
         super(TouchEventLoop, self).__init__()
         self.quit = False
+        self.started = False
         self.input_events = []
+        self.input_events_last = {}
         self.postproc_modules = []
+        self.have_activity = False
+        # select() on this socket is used to sleep, wakeup() write on it
+        self._wakeup = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._wakeup.bind(('127.0.0.1', 0))
+        self._wakeup.setblocking(0)
+        #: Number of frames done, and maximum number of frames (0 = no limit)
+        self.frames = 0
+        self.max_frames = 0
 
     def start(self):
         global pymt_providers
         for provider in pymt_providers:
             provider.start()
+        self.started = True
 
-    def close(self):
+    def stop(self):
+        '''Stop the input providers'''
         global pymt_providers
+        if not self.started:
+            return
+        self.started = False
         for provider in pymt_providers:
             provider.stop()
 
@@ -129,12 +154,20 @@ class TouchEventLoop(object):
                 touch.pop()
         touch.grab_state = False
 
+        # the touch can be reused by the provider
+        if type == 'up':
+            touch.release()
+
     def _dispatch_input(self, type, touch):
-        ev = (type, touch)
-        # remove the save event for the touch if exist
-        if ev in self.input_events:
-            self.input_events.remove(ev)
-        self.input_events.append(ev)
+        # the queue is indexed by touch uid, with the type of the last
+        # event queued for it. Providers are updating the touch in place,
+        # so consecutive moves of the same touch can be merged into the
+        # one already queued, without breaking the down/move/up order.
+        last = self.input_events_last.get(touch.uid)
+        if type == 'move' and last == 'move':
+            return
+        self.input_events_last[touch.uid] = type
+        self.input_events.append((type, touch))
 
     def dispatch_input(self):
         global pymt_providers
@@ -151,7 +184,9 @@ class TouchEventLoop(object):
         for type, touch in self.input_events:
             self.post_dispatch_input(type=type, touch=touch)
 
+        self.have_activity = len(self.input_events) > 0
         self.input_events = []
+        self.input_events_last = {}
 
     def idle(self):
         # update dt
@@ -162,18 +197,89 @@ class TouchEventLoop(object):
         self.dispatch_input()
 
         if pymt_window:
+            # any input can change the state of a widget
+            if self.have_activity:
+                pymt_window.need_redraw = True
+
             pymt_window.dispatch_events()
             pymt_window.dispatch_event('on_update')
-            pymt_window.dispatch_event('on_draw')
-            pymt_window.flip()
+
+            # in redraw on demand mode, draw only if something changed
+            if pymt_window.need_redraw or not pymt_window.redraw_on_demand:
+                pymt_window.need_redraw = False
+                pymt_window.dispatch_event('on_draw')
+                pymt_window.flip()
+
+        # stop after the maximum number of frames
+        self.frames += 1
+        if self.max_frames and self.frames >= self.max_frames:
+            pymt_logger.info('Stop application after %d frames' % self.frames)
+            self.close()
+            return True
 
         # don't loop if we don't have listeners !
         if len(touch_event_listeners) == 0:
             self.exit()
             return False
 
+        # wait for the next frame
+        self.sleep()
+
         return self.quit
 
+    def wakeup(self):
+        '''Interrupt the sleep of the loop. Can be called from any thread.'''
+        try:
+            self._wakeup.sendto('w', self._wakeup.getsockname())
+        except socket.error:
+            pass
+
+    def is_idle(self):
+        '''Return True if the loop can sleep more than one frame: nothing
+        happened, nothing need to be redrawn, and no provider need to be
+        polled.'''
+        if self.have_activity:
+            return False
+        if pymt_window and (pymt_window.need_redraw or
+                            not pymt_window.redraw_on_demand):
+            return False
+        for provider in pymt_providers:
+            if not provider.event_driven:
+                return False
+        return True
+
+    def get_sleep_timeout(self):
+        '''Return the time to sleep before the next frame'''
+        clock = getClock()
+        if clock.fixed_dt > 0:
+            return 0
+        timeout = clock.get_frame_timeout()
+        if not self.is_idle():
+            return timeout
+
+        # sleep until the next scheduled event, without missing the window
+        # events
+        idle_timeout = 1.
+        if pymt_window and pymt_window.poll_timeout is not None:
+            idle_timeout = pymt_window.poll_timeout
+        next_timeout = clock.get_next_timeout()
+        if next_timeout is not None:
+            idle_timeout = min(idle_timeout, next_timeout)
+        return max(timeout, idle_timeout)
+
+    def sleep(self):
+        '''Sleep until the next frame, or until wakeup() is called'''
+        timeout = self.get_sleep_timeout()
+        if timeout <= 0:
+            return
+        wakeup = self._wakeup
+        try:
+            if select.select([wakeup], [], [], timeout)[0]:
+                while True:
+                    wakeup.recv(16)
+        except (select.error, socket.error):
+            pass
+
     def run(self):
         while not self.quit:
             self.idle()
@@ -184,9 +290,28 @@ class TouchEventLoop(object):
 
     def exit(self):
         self.close()
+        self.stop()
         if pymt_window:
             pymt_window.close()
 
+    def mainloop(self):
+        '''Run the loop until the application stop, and handle the
+        exceptions with the exception manager'''
+        while True:
+            try:
+                self.run()
+                stopTouchApp()
+                break
+            except BaseException, inst:
+                # use exception manager first
+                r = pymt_exception_manager.handle_exception(inst)
+                if r == ExceptionManager.RAISE:
+                    stopTouchApp()
+                    self.exit()
+                    raise
+                else:
+                    pass
+
 
 def pymt_usage():
     '''PyMT Usage: %s [OPTION...] ::
@@ -196,6 +321,12 @@ def pymt_usage():
         -w, --windowed              force run in window
         -p, --provider id:provider[,options] add a provider (eg: ccvtable1:tuio,192.168.0.1:3333)
         -F, --fps                   show fps in window
+        -e, --eventstats            profile widgets, and show a summary at exit
+        --profile-trace=file.json   save a Chrome trace of the widgets profiler
+        --record=file.rec           record the input (play it with -p id:replay,file.rec)
+        --headless                  run without display (null window)
+        --fixed-timestep=dt         advance the clock of dt seconds on each frame
+        --max-frames=n              stop the application after n frames
         -m mod, --module=mod        activate a module (use "list" to get available module)
         -s, --save                  save current PyMT configuration
         --size=640x480              size of window
@@ -207,23 +338,6 @@ def pymt_usage():
     print pymt_usage.__doc__ % (os.path.basename(sys.argv[0]))
 
 
-def _run_mainloop():
-    '''Main loop is done by us.'''
-    while True:
-        try:
-            pymt_evloop.run()
-            stopTouchApp()
-            break
-        except BaseException, inst:
-            # use exception manager first
-            r = pymt_exception_manager.handle_exception(inst)
-            if r == ExceptionManager.RAISE:
-                stopTouchApp()
-                raise
-            else:
-                pass
-
-
 def runTouchApp(widget=None, slave=False):
     '''Static main function that starts the application loop.
     You got some magic things, if you are using argument like this ::
@@ -260,9 +374,10 @@ def runTouchApp(widget=None, slave=False):
     #    from ui.window import MTWindow
     #    pymt_window = MTWindow()
 
-    # Check if we show event stats
-    if pymt.pymt_config.getboolean('pymt', 'show_eventstats'):
-        pymt.widget.event_stats_activate()
+    # Check if we profile widgets
+    profile_trace = pymt.pymt_config.get('pymt', 'profile_trace')
+    if pymt.pymt_config.getboolean('pymt', 'show_eventstats') or profile_trace:
+        getProfiler().activate(trace=bool(profile_trace))
 
     # Instance all configured input
     for key, value in pymt.pymt_config.items('input'):
@@ -285,6 +400,15 @@ def runTouchApp(widget=None, slave=False):
 
     pymt_evloop = TouchEventLoop()
 
+    # configure frame pacing
+    getClock().max_fps = pymt.pymt_config.getint('pymt', 'max_fps')
+    getClock().fixed_dt = pymt.pymt_config.getfloat('pymt', 'fixed_timestep')
+    pymt_evloop.max_frames = pymt.pymt_config.getint('pymt', 'max_frames')
+
+    # configure the memory budget of the cache
+    Cache.set_size_budget(
+        pymt.pymt_config.getint('graphics', 'cache_budget') * 1024 * 1024)
+
     # add postproc modules
     for mod in pymt_postproc_modules:
         pymt_evloop.add_postproc_module(mod)
@@ -313,13 +437,17 @@ def runTouchApp(widget=None, slave=False):
     #    ourself (previous behavior.)
     #
     if pymt_window is None:
-        _run_mainloop()
+        pymt_evloop.mainloop()
     else:
         pymt_window.mainloop()
 
-    # Show event stats
-    if pymt.pymt_config.getboolean('pymt', 'show_eventstats'):
-        pymt.widget.event_stats_print()
+    # Show profiler summary
+    profiler = getProfiler()
+    if profiler.enabled:
+        profiler.deactivate()
+        profiler.print_summary()
+        if profile_trace:
+            profiler.export_trace(profile_trace)
 
 def stopTouchApp():
     global pymt_evloop
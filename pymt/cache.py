@@ -1,19 +1,175 @@
 '''
 Cache Manager: a way to cache things, and delete them automaticly
+
+Each category keep its objects ordered from the least to the most recently
+used. When the limit of a category is reached, the least recently used
+objects are removed. All operations are done in constant time.
+
+Timeouts are managed with a timeout wheel: each object is placed in the slot
+of the second where it can expire. When a slot is reached, only its objects
+are checked: if they have been used in the meantime, they are moved to a
+later slot.
+
+Usage ::
+
+    Cache.register('mycache', limit=10, timeout=5)
+    Cache.append('mycache', 'objectid', obj)
+    obj = Cache.get('mycache', 'objectid')
+
+Objects can also report their size (like the bytes of a texture) when they
+are added. A category can have a size limit, and all the categories share a
+global size budget (see set_size_budget()): when the budget is exceeded, the
+least recently used objects of all categories are removed. A category can
+give a `release` function, called when an object is removed from the cache,
+to free its resources (OpenGL names...) immediately ::
+
+    Cache.register('lists', size_limit=1024 * 1024,
+                   release=lambda dl: dl.release())
+    Cache.append('lists', 'background', dl, size=vertex_count * 16)
 '''
 
 __all__ = ('Cache', )
 
+from math import ceil
+from heapq import heappush, heappop
 from pymt.logger import pymt_logger
 from pymt.clock import getClock
 
+# Index of the values in the cache nodes
+_PREV, _NEXT, _KEY, _OBJECT, _TIMEOUT, _LASTACCESS, _SLOT, _SIZE = range(8)
+
+class _CacheCategory(object):
+    '''Objects of one category, stored in a dict and a circular doubly
+    linked list, ordered by last access.'''
+
+    #: Size of the objects of all the categories
+    total_size = 0
+
+    def __init__(self, limit, timeout, size_limit, release):
+        self.limit = limit
+        self.timeout = timeout
+        self.size_limit = size_limit
+        self.release = release
+        self.size = 0
+        self.nodes = {}
+        # sentinel of the linked list: root[_NEXT] is the least recently used
+        self.root = root = [None] * 8
+        root[_PREV] = root[_NEXT] = root
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _link(self, node):
+        # insert the node at the most recently used position
+        root = self.root
+        last = root[_PREV]
+        node[_PREV] = last
+        node[_NEXT] = root
+        last[_NEXT] = root[_PREV] = node
+
+    def _unlink(self, node):
+        node[_PREV][_NEXT] = node[_NEXT]
+        node[_NEXT][_PREV] = node[_PREV]
+
+    def get(self, key, curtime):
+        node = self.nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        node[_LASTACCESS] = curtime
+        self._unlink(node)
+        self._link(node)
+        return node[_OBJECT]
+
+    def append(self, key, obj, timeout, curtime, size):
+        node = self.nodes.get(key)
+        if node is not None:
+            self._unlink(node)
+            self._resize(-node[_SIZE])
+            if node[_OBJECT] is not obj and self.release is not None:
+                self.release(node[_OBJECT])
+        else:
+            node = [None] * 8
+            node[_KEY] = key
+            self.nodes[key] = node
+        node[_OBJECT] = obj
+        node[_TIMEOUT] = timeout
+        node[_LASTACCESS] = curtime
+        node[_SIZE] = size
+        self._resize(size)
+        self._link(node)
+
+        # enforce the limits, but keep the new object
+        limit, size_limit = self.limit, self.size_limit
+        while len(self.nodes) > 1:
+            if limit is not None and len(self.nodes) > limit:
+                self.evict()
+            elif size_limit is not None and self.size > size_limit:
+                lru = self.get_lru(node)
+                if lru is None:
+                    break
+                self.evict(lru)
+            else:
+                break
+        return node
+
+    def _resize(self, delta):
+        self.size += delta
+        _CacheCategory.total_size += delta
+
+    def evict(self, node=None):
+        '''Remove a node, or the least recently used object'''
+        if node is None:
+            node = self.root[_NEXT]
+        self.remove(node[_KEY])
+        self.evictions += 1
+
+    def get_lru(self, keep=None):
+        '''Return the least recently used node with a size, except `keep`,
+        or None'''
+        root = self.root
+        node = root[_NEXT]
+        while node is not root:
+            if node[_SIZE] and node is not keep:
+                return node
+            node = node[_NEXT]
+        return None
+
+    def remove(self, key):
+        node = self.nodes.pop(key, None)
+        if node is not None:
+            self._unlink(node)
+            self._resize(-node[_SIZE])
+            if self.release is not None:
+                self.release(node[_OBJECT])
+        return node
+
+    def clear(self):
+        if self.release is not None:
+            for node in self.nodes.itervalues():
+                self.release(node[_OBJECT])
+        self.nodes = {}
+        self._resize(-self.size)
+        root = self.root
+        root[_PREV] = root[_NEXT] = root
+
+
 class Cache:
+    '''See module documentation for more information.
+    '''
 
     _categories = {}
-    _objects = {}
+    # global size budget of all the categories
+    _size_budget = None
+    # timeout wheel: slot -> list of (category, key), and heap of the slots
+    _wheel = {}
+    _wheel_slots = []
 
     @staticmethod
-    def register(category, limit=None, timeout=None):
+    def register(category, limit=None, timeout=None, size_limit=None,
+                 release=None):
         '''Register a new category in cache, with limit
 
         :Parameters:
@@ -25,17 +181,35 @@ class Cache:
             `timeout` : double (optionnal)
                 Time to delete the object when it's not used.
                 if None, no timeout is applied.
+            `size_limit` : int (optionnal)
+                Maximum size of all the objects in the category.
+                If None, only the global size budget is applied.
+            `release` : callable (optionnal)
+                Function called with an object when it's removed from
+                the cache.
         '''
-        Cache._categories[category] = {
-            'limit': limit,
-            'timeout': timeout
-        }
-        Cache._objects[category] = {}
+        old = Cache._categories.get(category)
+        if old is not None:
+            _CacheCategory.total_size -= old.size
+        Cache._categories[category] = _CacheCategory(limit, timeout,
+                                                     size_limit, release)
         pymt_logger.debug('Cache: register <%s> with limit=%s, timeout=%ss' %
             (category, str(limit), str(timeout)))
 
     @staticmethod
-    def append(category, key, obj, timeout=None):
+    def set_size_budget(budget):
+        '''Set the maximum size of the objects of all categories. If None,
+        no budget is applied.'''
+        Cache._size_budget = budget
+        Cache._enforce_size_budget()
+
+    @staticmethod
+    def get_size():
+        '''Return the size of the objects of all categories'''
+        return _CacheCategory.total_size
+
+    @staticmethod
+    def append(category, key, obj, timeout=None, size=0):
         '''Add a new object in the cache.
 
         :Parameters:
@@ -47,17 +221,22 @@ class Cache:
                 Object to store in cache
             `timeout` : double (optionnal)
                 Custom time to delete the object if it's not used.
+            `size` : int (optionnal)
+                Size of the object (bytes of a texture...), used for the
+                size limit and budget.
         '''
-        if not category in Cache._categories:
-            pymt.pymt_logger.warning('Cache: category <%s> not exist' % category)
+        cat = Cache._categories.get(category)
+        if cat is None:
+            pymt_logger.warning('Cache: category <%s> not exist' % category)
             return
         if timeout is None:
-            timeout = Cache._categories[category]['timeout']
-        Cache._objects[category][key] = {
-            'object': obj,
-            'timeout': timeout,
-            'lastaccess': getClock().get_time()
-        }
+            timeout = cat.timeout
+        curtime = getClock().get_time()
+        node = cat.append(key, obj, timeout, curtime, size)
+        if timeout is not None:
+            Cache._schedule(category, node, curtime + timeout)
+        if size and Cache._size_budget is not None:
+            Cache._enforce_size_budget(node)
 
     @staticmethod
     def get(category, key):
@@ -69,11 +248,10 @@ class Cache:
             `key` : str
                 Uniq identifier of the object to store
         '''
-        try:
-            Cache._objects[category][key]['lastaccess'] = getClock().get_time()
-            return Cache._objects[category][key]['object']
-        except:
+        cat = Cache._categories.get(category)
+        if cat is None:
             return None
+        return cat.get(key, getClock().get_time())
 
     @staticmethod
     def remove(category, key=None):
@@ -85,49 +263,106 @@ class Cache:
             `key` : str (optionnal)
                 Uniq identifier of the object to store
         '''
-        try:
-            if key is not None:
-                del Cache._objects[category][key]
-            else:
-                Cache._objects[category] = {}
-        except:
-            pass
+        cat = Cache._categories.get(category)
+        if cat is None:
+            return
+        if key is not None:
+            cat.remove(key)
+        else:
+            cat.clear()
 
     @staticmethod
-    def _purge_by_timeout(*largs):
-
-        curtime = getClock().get_time()
-
-        for category in Cache._objects:
-
-            timeout = Cache._categories[category]['timeout']
+    def _enforce_size_budget(keep=None):
+        budget = Cache._size_budget
+        if budget is None:
+            return
+        categories = Cache._categories.values()
+        while _CacheCategory.total_size > budget:
+            # evict the least recently used object with a size, of all
+            # categories
+            oldest = None
+            for cat in categories:
+                node = cat.get_lru(keep)
+                if node is None:
+                    continue
+                if oldest is None or node[_LASTACCESS] < oldest[1][_LASTACCESS]:
+                    oldest = (cat, node)
+            if oldest is None:
+                break
+            oldest[0].evict(oldest[1])
 
-            for key in Cache._objects[category].keys():
+    @staticmethod
+    def get_stats(category):
+        '''Return a dict with the statistics of a category: count, limit,
+        size, size_limit, hits, misses, evictions (objects removed due to
+        the limits) and expirations (objects removed due to the timeout).'''
+        cat = Cache._categories[category]
+        return {
+            'count': len(cat),
+            'limit': cat.limit,
+            'size': cat.size,
+            'size_limit': cat.size_limit,
+            'hits': cat.hits,
+            'misses': cat.misses,
+            'evictions': cat.evictions,
+            'expirations': cat.expirations,
+        }
 
-                lastaccess  = Cache._objects[category][key]['lastaccess']
-                objtimeout  = Cache._objects[category][key]['timeout']
+    @staticmethod
+    def _schedule(category, node, deadline):
+        # an object stay in the earliest slot where it can expire: nothing
+        # to do if it's already scheduled before the deadline.
+        slot = int(ceil(deadline))
+        if node[_SLOT] is not None and node[_SLOT] <= slot:
+            return
+        node[_SLOT] = slot
+        entries = Cache._wheel.get(slot)
+        if entries is None:
+            Cache._wheel[slot] = [(category, node[_KEY])]
+            heappush(Cache._wheel_slots, slot)
+        else:
+            entries.append((category, node[_KEY]))
 
-                # take the object timeout if available
-                if objtimeout is not None:
-                    timeout = objtimeout
+    @staticmethod
+    def _purge_by_timeout(*largs):
+        curtime = getClock().get_time()
+        wheel = Cache._wheel
+        slots = Cache._wheel_slots
+        categories = Cache._categories
 
-                # no timeout, cancel
-                if timeout is None:
+        while slots and slots[0] <= curtime:
+            slot = heappop(slots)
+            for category, key in wheel.pop(slot, ()):
+                cat = categories.get(category)
+                if cat is None:
                     continue
-
-                if curtime - lastaccess > timeout:
-                    del Cache._objects[category][key]
+                node = cat.nodes.get(key)
+                # object removed, or moved to another slot
+                if node is None or node[_SLOT] != slot:
+                    continue
+                node[_SLOT] = None
+                if node[_TIMEOUT] is None:
+                    continue
+                deadline = node[_LASTACCESS] + node[_TIMEOUT]
+                if deadline <= curtime:
+                    cat.remove(key)
+                    cat.expirations += 1
+                else:
+                    Cache._schedule(category, node, deadline)
 
     @staticmethod
     def print_usage():
         print 'Cache usage :'
         for category in Cache._categories:
-            print ' * %s : %d / %s, timeout=%s' % (
-                category.capitalize(),
-                len(Cache._objects[category]),
-                str(Cache._categories[category]['limit']),
-                str(Cache._categories[category]['timeout'])
+            cat = Cache._categories[category]
+            print ' * %s : %d / %s, size=%d / %s, timeout=%s, hits=%d, ' \
+                  'misses=%d, evictions=%d, expirations=%d' % (
+                category.capitalize(), len(cat), str(cat.limit),
+                cat.size, str(cat.size_limit), str(cat.timeout),
+                cat.hits, cat.misses, cat.evictions, cat.expirations
             )
+        print ' Total size : %d / %s' % (Cache.get_size(),
+                                         str(Cache._size_budget))
 
 # install the schedule clock for purging
 getClock().schedule_interval(Cache._purge_by_timeout, 1)
@@ -1,29 +1,98 @@
+'''
+Clock: a clock with scheduled events
+
+Events are stored in a priority queue ordered by deadline, so a tick only
+touches the events that must be executed. Every schedule function return an
+event that can be used to cancel it ::
+
+    def my_callback(dt):
+        pass
+
+    # call my_callback every 0.5 seconds
+    event = getClock().schedule_interval(my_callback, 0.5)
+
+    # stop it
+    event.cancel()
+
+If you need to call a function only once per frame, even if you're asking
+it many times, use a trigger ::
+
+    trigger = getClock().create_trigger(my_callback)
+    trigger()
+    trigger()   # my_callback will be called only once, on next frame
+
+The clock can limit the number of frames per second, with the `max_fps`
+attribute (0 mean no limit). The main loop use it to sleep between frames.
+
+With a `fixed_dt` (0 mean real time), each tick advance the time of the
+clock by this value, whatever the real time spent: animations and scheduled
+events are reproducible, and the main loop doesn't sleep.
+'''
+
 __all__ =  ('Clock', 'getClock')
 
+import sys
 import time
+from heapq import heappush, heappop
+
+# Use a monotonic and high resolution time if available
+_default_time = time.time
+if sys.platform == 'win32':
+    _default_time = time.clock
+elif sys.platform.startswith('linux'):
+    try:
+        import ctypes
+        import ctypes.util
+
+        class _timespec(ctypes.Structure):
+            _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+        _CLOCK_MONOTONIC = 1
+        _librt = ctypes.CDLL(ctypes.util.find_library('rt'), use_errno=True)
+        _clock_gettime = _librt.clock_gettime
+        _clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_timespec)]
+
+        def _monotonic_time():
+            t = _timespec()
+            if _clock_gettime(_CLOCK_MONOTONIC, ctypes.pointer(t)) != 0:
+                return time.time()
+            return t.tv_sec + t.tv_nsec * 1e-9
+
+        _monotonic_time()
+        _default_time = _monotonic_time
+    except:
+        _default_time = time.time
 
 class _Event(object):
 
     loop = False
     callback = None
     timeout = 0.
+    deadline = 0.
+    cancelled = False
     _last_dt = 0.
     _dt = 0.
 
-    def __init__(self, loop, callback, timeout, starttime):
+    def __init__(self, clock, loop, callback, timeout, starttime):
+        self.clock = clock
         self.loop = loop
         self.callback = callback
         self.timeout = timeout
         self._last_dt = starttime
+        self.deadline = starttime + timeout
+
+    def cancel(self):
+        '''Cancel the event. It will be dropped from the clock queue
+        when its deadline is reached.'''
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self.clock._unregister(self)
 
     def do(self, dt):
         self.callback(dt)
 
     def tick(self, curtime):
-        # timeout happen ?
-        if curtime - self._last_dt < self.timeout:
-            return True
-
         # calculate current timediff for this event
         self._dt = curtime - self._last_dt
         self._last_dt = curtime
@@ -41,21 +110,57 @@ class _Event(object):
         if ret == False:
             return False
 
+        # reschedule the event from the current time
+        self.deadline = curtime + self.timeout
         return True
 
 
+class _Trigger(object):
+    '''Callable that schedule its callback once for the next frame,
+    whatever the number of calls done before the frame.'''
+
+    def __init__(self, clock, callback, timeout):
+        self.clock = clock
+        self.callback = callback
+        self.timeout = timeout
+        self.event = None
+
+    def __call__(self, *largs):
+        if self.event is not None and not self.event.cancelled:
+            return
+        self.event = self.clock.schedule_once(self._do, self.timeout)
+
+    def _do(self, dt):
+        self.event = None
+        self.callback(dt)
+
+    def cancel(self):
+        '''Cancel the pending call if any'''
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+
+
 class Clock(object):
 
-    _dt = 0
-    _last_tick = time.time()
-    _fps = 0
-    _fps_counter = 0
-    _last_fps_tick = None
-    _events = []
+    def __init__(self):
+        self.max_fps = 0
+        self.fixed_dt = 0
+        self._dt = 0
+        self._last_tick = _default_time()
+        self._fps = 0
+        self._fps_counter = 0
+        self._last_fps_tick = None
+        self._events = []
+        self._events_by_callback = {}
+        self._events_seq = 0
 
     def tick(self):
-        # tick the current time
-        current = time.time()
+        # tick the current time, or advance it by the fixed timestep
+        if self.fixed_dt > 0:
+            current = self._last_tick + self.fixed_dt
+        else:
+            current = _default_time()
         self._dt = current - self._last_tick
         self._fps_counter += 1
         self._last_tick = current
@@ -79,35 +184,99 @@ class Clock(object):
     def get_time(self):
         return self._last_tick
 
-    def schedule_once(self, callback, timeout):
-        event = _Event(False, callback, timeout, self._last_tick)
-        self._events.append(event)
+    def get_current_time(self):
+        '''Return the current time, not the time of the last tick'''
+        return _default_time()
+
+    def get_frame_timeout(self):
+        '''Return the time remaining before the next frame, according to
+        `max_fps`. Return 0 if no limit is set.'''
+        if self.max_fps <= 0:
+            return 0
+        timeout = self._last_tick + 1. / self.max_fps - _default_time()
+        return max(0, timeout)
+
+    def get_next_timeout(self):
+        '''Return the time remaining before the next scheduled event, or None
+        if no event is scheduled.'''
+        events = self._events
+        # drop cancelled events from the top of the queue
+        while events and events[0][2].cancelled:
+            heappop(events)
+        if not events:
+            return None
+        return max(0, events[0][0] - _default_time())
+
+    def schedule_once(self, callback, timeout=0):
+        '''Schedule an event in <timeout> seconds.
+        Return the event, that can be cancelled.'''
+        event = _Event(self, False, callback, timeout, self._last_tick)
+        self._register(event)
+        return event
 
     def schedule_interval(self, callback, timeout):
-        event = _Event(True, callback, timeout, self._last_tick)
-        self._events.append(event)
-
-    def unschedule(callback):
-        self._events = [x for x in self._events if x.callback != callback]
+        '''Schedule an event to be called every <timeout> seconds.
+        Return the event, that can be cancelled.'''
+        event = _Event(self, True, callback, timeout, self._last_tick)
+        self._register(event)
+        return event
+
+    def create_trigger(self, callback, timeout=0):
+        '''Create a trigger: calling it will schedule the callback once, in
+        <timeout> seconds. Many calls done before the callback execution
+        are coalesced in one call.'''
+        return _Trigger(self, callback, timeout)
+
+    def unschedule(self, callback):
+        '''Remove all the events scheduled for the callback'''
+        events = self._events_by_callback.pop(callback, None)
+        if events is None:
+            return
+        for event in events:
+            event.cancelled = True
+
+    def _register(self, event):
+        self._events_seq += 1
+        heappush(self._events, (event.deadline, self._events_seq, event))
+        events = self._events_by_callback.get(event.callback)
+        if events is None:
+            self._events_by_callback[event.callback] = [event]
+        else:
+            events.append(event)
+
+    def _unregister(self, event):
+        events = self._events_by_callback.get(event.callback)
+        if events is None or event not in events:
+            return
+        events.remove(event)
+        if not events:
+            del self._events_by_callback[event.callback]
 
     def _process_events(self):
-        to_remove = None
-
-        # process event
-        for event in self._events:
-            if event.tick(self._last_tick) == False:
-                if to_remove is None:
-                    to_remove = [event]
-                else:
-                    to_remove.append(event)
-
-        # event to remove ?
-        if to_remove is None:
-            return
-        for event in to_remove:
-            self._events.remove(event)
+        events = self._events
+        curtime = self._last_tick
 
+        # collect all the expired events first: events scheduled from a
+        # callback will be processed on the next tick.
+        expired = []
+        while events and events[0][0] <= curtime:
+            event = heappop(events)[2]
+            if not event.cancelled:
+                expired.append(event)
 
+        # process event
+        for event in expired:
+            # an event can be cancelled by a previous callback
+            if event.cancelled:
+                continue
+            if event.tick(curtime) == False:
+                event.cancel()
+                continue
+            # event can be cancelled inside his own callback
+            if event.cancelled:
+                continue
+            self._events_seq += 1
+            heappush(events, (event.deadline, self._events_seq, event))
 
 
 # create a default clock
@@ -117,4 +286,3 @@ _default_clock = Clock()
 def getClock():
     global _default_clock
     return _default_clock
-
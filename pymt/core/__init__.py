@@ -1,35 +1,104 @@
 '''
 Core: providers for image, text, video, audio, camera...
+
+The providers that failed to load are remembered in the disk cache: during
+`probe_retry_delay` seconds, they are tried only if none of the other
+providers work. The providers are always tried in the configured order.
+The cache is invalidated when the python path change (new module
+installed...).
 '''
 
 import pymt
+import os
+import sys
+import time
+from ..diskcache import DiskCache
+
+#: Time (in seconds) before a provider that failed is tried again first
+probe_retry_delay = 24 * 60 * 60
+
+def _probe_key(category, options):
+    # any change in the python path can change the result of the probing
+    paths = [(path, os.path.getmtime(path)) for path in sys.path
+             if os.path.isdir(path)]
+    return DiskCache.hash(category, options, pymt.options.get(category),
+                          sys.version, paths)
+
+def _probe_load(key):
+    # return the options that failed recently, with the time of the failure
+    failed = {}
+    data = DiskCache.load('providers', key)
+    if data is None:
+        return failed
+    now = time.time()
+    for item in data[:].split(','):
+        try:
+            option, failtime = item.split(':')
+            failtime = float(failtime)
+        except ValueError:
+            continue
+        if 0 <= now - failtime < probe_retry_delay:
+            failed[option] = failtime
+    return failed
+
+def _probe_save(key, failed):
+    DiskCache.save('providers', key, ','.join(
+        ['%s:%f' % item for item in failed.iteritems()]))
+
+def _probe_groups(category, llist, failed):
+    # return the options activated in config, in the configured order: the
+    # ones to try, and the ones that failed recently, to try if nothing
+    # else works
+    first, last = [], []
+    for item in llist:
+        option = item[0]
+        if option not in pymt.options[category]:
+            pymt.pymt_logger.debug('%s: option <%s> ignored by config' %
+                (category.capitalize(), option))
+        elif option in failed:
+            pymt.pymt_logger.debug('%s: option <%s> tried last, failed on '
+                'a previous run' % (category.capitalize(), option))
+            last.append(item)
+        else:
+            first.append(item)
+    return first, last
 
 def core_select_lib(category, llist):
     category = category.lower()
-    for option, modulename, classname in llist:
-        try:
-            # module activated in config ?
-            if option not in pymt.options[category]:
-                pymt.pymt_logger.debug('%s: option <%s> ignored by config' %
-                    (category.capitalize(), option))
-                continue
 
-            # import module
-            mod = __import__(name='%s.%s' % (category, modulename),
-                             globals=globals(),
-                             locals=locals(),
-                             fromlist=[modulename], level=-1)
-            cls = mod.__getattribute__(classname)
+    key = _probe_key(category, llist)
+    failed = _probe_load(key)
+    previous = dict(failed)
+    selected = None
+
+    for group in _probe_groups(category, llist, failed):
+        for option, modulename, classname in group:
+            try:
+                # import module
+                mod = __import__(name='%s.%s' % (category, modulename),
+                                 globals=globals(),
+                                 locals=locals(),
+                                 fromlist=[modulename], level=-1)
+                selected = mod.__getattribute__(classname)
+
+                # ok !
+                pymt.pymt_logger.info('%s: using <%s> as %s provider' %
+                    (category.capitalize(), option, category))
+                failed.pop(option, None)
+                break
 
-            # ok !
-            pymt.pymt_logger.info('%s: using <%s> as %s provider' %
-                (category.capitalize(), option, category))
-            return cls
+            except Exception as e:
+                pymt.pymt_logger.warning('%s: Unable to use <%s> as %s provider' %
+                    (category.capitalize(), option, category))
+                pymt.pymt_logger.debug('', exc_info=e)
+                failed[option] = time.time()
+        if selected is not None:
+            break
 
-        except Exception as e:
-            pymt.pymt_logger.warning('%s: Unable to use <%s> as %s provider' %
-                (category.capitalize(), option, category))
-            pymt.pymt_logger.debug('', exc_info=e)
+    if failed != previous:
+        _probe_save(key, failed)
+    if selected is not None:
+        return selected
 
     pymt.pymt_logger.critical('%s: Unable to find any valuable %s provider at all!' %
         (category.capitalize(),category.capitalize()))
@@ -37,24 +106,33 @@ def core_select_lib(category, llist):
 
 def core_register_libs(category, libs):
     category = category.lower()
-    for option, lib in libs:
-        try:
-            # module activated in config ?
-            if option not in pymt.options[category]:
-                pymt.pymt_logger.debug('%s: option <%s> ignored by config' %
-                    (category.capitalize(), option))
-                continue
 
-            # import module
-            mod = __import__(name='%s.%s' % (category, lib),
-                             globals=globals(),
-                             locals=locals(),
-                             fromlist=[lib], level=-1)
+    key = _probe_key(category, libs)
+    failed = _probe_load(key)
+    previous = dict(failed)
+    working = False
 
-        except Exception as e:
-            pymt.pymt_logger.warning('%s: Unable to use <%s> as loader!' %
-                (category.capitalize(), option))
-            pymt.pymt_logger.debug('', exc_info=e)
+    for group in _probe_groups(category, libs, failed):
+        for option, lib in group:
+            try:
+                # import module
+                mod = __import__(name='%s.%s' % (category, lib),
+                                 globals=globals(),
+                                 locals=locals(),
+                                 fromlist=[lib], level=-1)
+                failed.pop(option, None)
+                working = True
+
+            except Exception as e:
+                pymt.pymt_logger.warning('%s: Unable to use <%s> as loader!' %
+                    (category.capitalize(), option))
+                pymt.pymt_logger.debug('', exc_info=e)
+                failed[option] = time.time()
+        if working:
+            break
+
+    if failed != previous:
+        _probe_save(key, failed)
 
 
 from audio import *
@@ -5,11 +5,16 @@ Text: Handle drawing of text
 __all__ = ('LabelBase', 'Label')
 
 import pymt
+import struct
 from .. import core_select_lib
 from ...baseobject import BaseObject
+from ...diskcache import DiskCache
 
 DEFAULT_FONT = 'Liberation Sans,Bitstream Vera Sans,Free Sans,Arial, Sans'
 
+# Label bitmap in the disk cache: width, height and mode, followed by data
+_label_header = struct.Struct('<II4s')
+
 class LabelBase(BaseObject):
     __slots__ = ('options', 'texture', '_label', 'color')
 
@@ -43,6 +48,11 @@ class LabelBase(BaseObject):
         '''
         return (0, 0, None)
 
+    def get_font_filename(self):
+        '''Return the filename of the font used, or None if unknown. The
+        labels are saved in the disk cache only if the font is known.'''
+        return None
+
     def _render_begin(self):
         pass
 
@@ -122,6 +132,10 @@ class LabelBase(BaseObject):
         data = self._render_end()
         assert(data)
 
+        self._update_texture(data)
+        return data
+
+    def _update_texture(self, data):
         # create texture is necessary
         if self.texture is None:
             self.texture = pymt.Texture.create(*self.size)
@@ -133,12 +147,43 @@ class LabelBase(BaseObject):
         # update texture
         self.texture.blit_data(data)
 
+    def _use_disk_cache(self):
+        # only the labels of the first frame are cached: they are the labels
+        # of the interface, the next ones are often dynamic (counters, user
+        # input...), and disk access would stall the frames
+        if not DiskCache.is_enabled():
+            return False
+        from ...base import getEventLoop
+        evloop = getEventLoop()
+        return evloop is None or evloop.frames == 0
 
     def refresh(self):
+        # search the label in the disk cache
+        key = None
+        if self._use_disk_cache():
+            # a replaced font file give another key
+            fontstat = DiskCache.stat(self.get_font_filename())
+            if fontstat:
+                key = DiskCache.hash(self.__class__.__name__, self.label,
+                                     self.fontid, self.usersize, fontstat)
+        if key is not None:
+            bitmap = DiskCache.load('label', key)
+            if bitmap is not None:
+                offset = _label_header.size
+                width, height, mode = _label_header.unpack(bitmap[:offset])
+                self.size = width, height
+                self._update_texture(pymt.ImageData(width, height,
+                    mode.rstrip('\0'), bitmap[offset:]))
+                return
+
         # first pass, calculating width/height
         self.size = self.render()
         # second pass, render for real
-        self.render(real=True)
+        data = self.render(real=True)
+
+        if key is not None:
+            DiskCache.save('label', key, _label_header.pack(
+                data.width, data.height, data.mode) + data.data)
 
     def draw(self):
         if self.texture is None:
@@ -31,6 +31,9 @@ class LabelPIL(LabelBase):
 
         return self._cache[id]
 
+    def get_font_filename(self):
+        return os.path.join(pymt.pymt_data_dir, 'DejaVuSans.ttf')
+
     def get_extents(self, text):
         font = self._select_font()
         w, h = font.getsize(text)
@@ -4,6 +4,7 @@ Text Pygame: Draw text with pygame
 
 __all__ = ('LabelPygame', )
 
+import os
 import pymt
 from . import LabelBase
 
@@ -13,6 +14,7 @@ except:
     raise
 
 pygame_cache = {}
+pygame_font_filenames = {}
 
 # init pygame font
 pygame.font.init()
@@ -22,14 +24,25 @@ class LabelPygame(LabelBase):
         return '|'.join([unicode(self.options[x]) for x \
             in ('font_size', 'font_name', 'bold', 'italic')])
 
-    def _get_font(self):
+    def get_font_filename(self):
         id = self._get_font_id()
-        if id not in pygame_cache:
-            # try to search the font
-            font = pygame.font.match_font(
+        if id not in pygame_font_filenames:
+            filename = pygame.font.match_font(
                 self.options['font_name'].replace(' ', ''),
                 bold=self.options['bold'],
                 italic=self.options['italic'])
+            if filename is None:
+                # pygame use its own default font
+                filename = os.path.join(os.path.dirname(pygame.__file__),
+                                        pygame.font.get_default_font())
+            pygame_font_filenames[id] = filename
+        return pygame_font_filenames[id]
+
+    def _get_font(self):
+        id = self._get_font_id()
+        if id not in pygame_cache:
+            # try to search the font
+            font = self.get_font_filename()
 
             # fontobject
             fontobject = pygame.font.Font(font,
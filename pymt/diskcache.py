@@ -0,0 +1,210 @@
+'''
+Disk Cache: keep expensive computations between application runs
+
+Objects are stored in binary files under ~/.pymt/cache/<category>/, named
+with a hash of their content (file data, text, parameters...). When the
+content change, the hash change too, so the cache never need to be
+invalidated. Files are memory-mapped when loaded ::
+
+    key = DiskCache.hash(svgdata, bezier_points)
+    data = DiskCache.load('svg', key)
+    if data is None:
+        data = tessellate(svgdata)
+        DiskCache.save('svg', key, data)
+
+The files of a category are limited in size (see set_size_limit()): when
+the limit is reached, the least recently used files are removed. Content
+coming from a file that can be replaced (like a font) should include the
+result of DiskCache.stat() in the hash.
+
+The disk cache can be deactivated with the disk_cache option in the pymt
+section of the configuration.
+'''
+
+from __future__ import with_statement
+
+__all__ = ('DiskCache', )
+
+import os
+import mmap
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import new as sha1
+import pymt
+from pymt.logger import pymt_logger
+
+class DiskCache:
+    '''See module documentation for more information.
+    '''
+
+    #: Version of the files format, change it to drop all the old files
+    version = 1
+
+    #: Size limit of a category, in bytes, if not set with set_size_limit()
+    default_size_limit = 32 * 1024 * 1024
+
+    _enabled = None
+    _directory = None
+    _size_limits = {}
+    # category -> size of the files, computed on the first save
+    _usage = {}
+
+    @staticmethod
+    def is_enabled():
+        '''Return True if the disk cache can be used'''
+        if DiskCache._enabled is None:
+            try:
+                DiskCache._enabled = pymt.pymt_config.getboolean(
+                    'pymt', 'disk_cache')
+                DiskCache._directory = os.path.join(pymt.pymt_home_dir, 'cache')
+            except:
+                # no configuration (documentation generation...)
+                DiskCache._enabled = False
+        return DiskCache._enabled
+
+    @staticmethod
+    def hash(*parts):
+        '''Return a key for the parts (strings or any object with a stable
+        representation)'''
+        h = sha1(str(DiskCache.version))
+        for part in parts:
+            if type(part) is unicode:
+                part = part.encode('utf8')
+            elif type(part) is not str:
+                part = repr(part)
+            h.update(str(len(part)))
+            h.update(':')
+            h.update(part)
+        return h.hexdigest()
+
+    @staticmethod
+    def stat(filename):
+        '''Return a string identifying the version of a file (path, size and
+        modification time), to use in a hash. Return '' if the file don't
+        exist.'''
+        try:
+            st = os.stat(filename)
+        except (OSError, TypeError):
+            return ''
+        return '%s:%d:%d' % (filename, st.st_size, int(st.st_mtime))
+
+    @staticmethod
+    def set_size_limit(category, size):
+        '''Set the maximum size of the files of a category, in bytes'''
+        DiskCache._size_limits[category] = size
+
+    @staticmethod
+    def load(category, key):
+        '''Return the data stored for the key as a read-only memory map, or
+        None if it's not in the cache.'''
+        if not DiskCache.is_enabled():
+            return None
+        filename = os.path.join(DiskCache._directory, category, key)
+        try:
+            with open(filename, 'rb') as fd:
+                data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            # not in cache, or empty file
+            return None
+        # the modification time is used as access time for the size limit
+        try:
+            os.utime(filename, None)
+        except OSError:
+            pass
+        return data
+
+    @staticmethod
+    def save(category, key, data):
+        '''Store the data (string) for the key'''
+        if not DiskCache.is_enabled():
+            return
+        directory = os.path.join(DiskCache._directory, category)
+        filename = os.path.join(directory, key)
+        tmpfilename = '%s.%d.tmp' % (filename, os.getpid())
+        try:
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(tmpfilename, 'wb') as fd:
+                fd.write(data)
+            # an application reading the cache at the same time will get the
+            # old file or the new one, never a partial one.
+            oldsize = 0
+            if os.path.exists(filename):
+                oldsize = os.path.getsize(filename)
+                os.remove(filename)
+            os.rename(tmpfilename, filename)
+        except (IOError, OSError):
+            pymt_logger.warning('DiskCache: unable to save %s/%s' % (
+                                category, key))
+            return
+
+        usage = DiskCache._usage.get(category)
+        if usage is None:
+            usage = DiskCache._get_directory_size(directory)
+        else:
+            usage += len(data) - oldsize
+        DiskCache._usage[category] = usage
+        limit = DiskCache._size_limits.get(category,
+                                           DiskCache.default_size_limit)
+        if limit is not None and usage > limit:
+            DiskCache._prune(category, limit)
+
+    @staticmethod
+    def _get_directory_size(directory):
+        size = 0
+        for name in os.listdir(directory):
+            try:
+                size += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+        return size
+
+    @staticmethod
+    def _prune(category, limit):
+        # remove the least recently used files, until 3/4 of the limit, to
+        # not prune again on the next save
+        directory = os.path.join(DiskCache._directory, category)
+        files = []
+        size = 0
+        for name in os.listdir(directory):
+            filename = os.path.join(directory, name)
+            try:
+                st = os.stat(filename)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, filename))
+            size += st.st_size
+        files.sort()
+        target = limit * 3 / 4
+        count = 0
+        for mtime, filesize, filename in files:
+            if size <= target:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                continue
+            size -= filesize
+            count += 1
+        DiskCache._usage[category] = size
+        pymt_logger.debug('DiskCache: %d files removed from %s' % (
+                          count, category))
+
+    @staticmethod
+    def remove(category=None):
+        '''Remove all the files of a category, or of all categories'''
+        if not DiskCache.is_enabled():
+            return
+        directory = DiskCache._directory
+        if category is not None:
+            directory = os.path.join(directory, category)
+        for root, dirs, files in os.walk(directory, topdown=False):
+            for name in files:
+                os.remove(os.path.join(root, name))
+            for name in dirs:
+                os.rmdir(os.path.join(root, name))
+        if category is not None:
+            DiskCache._usage.pop(category, None)
+        else:
+            DiskCache._usage.clear()
@@ -40,21 +40,47 @@
 __all__ = ('EventDispatcher', )
 
 import inspect
+from types import FunctionType
+
+# Compiled dispatch tables: for each class, map an event type to the default
+# handler found in the class hierarchy (a plain function, called with the
+# instance), or None if the class don't have a default handler.
+_dispatch_tables = {}
+
+# Marker for default handlers that are not plain functions (staticmethod,
+# callable object...): they are resolved with getattr() on each dispatch.
+_use_getattr = object()
+
+def _compile_handler(cls, event_type):
+    for klass in cls.__mro__:
+        if event_type in klass.__dict__:
+            handler = klass.__dict__[event_type]
+            if type(handler) is FunctionType:
+                return handler
+            return _use_getattr
+    return None
+
+def clear_dispatch_tables():
+    '''Forget all the compiled dispatch tables. Must be called if a default
+    handler is replaced on a class after instances have dispatched events.'''
+    _dispatch_tables.clear()
 
 class EventDispatcher(object):
     _event_stack = ()
 
     def __init__(self):
         super(EventDispatcher, self).__init__()
-        self._event_types = []
+        self._event_types = set()
+        table = _dispatch_tables.get(self.__class__)
+        if table is None:
+            table = _dispatch_tables[self.__class__] = {}
+        self._dispatch_table = table
 
     def unregister_event_type(self, event_type):
-        if event_type in self._event_types:
-            self._event_types.remove(event_type)
+        self._event_types.discard(event_type)
 
     def register_event_type(self, event_type):
-        if not event_type in self._event_types:
-            self._event_types.append(event_type)
+        self._event_types.add(event_type)
 
     def push_handlers(self, *args, **kwargs):
         # Create event stack if necessary
@@ -143,26 +169,42 @@ class EventDispatcher(object):
             return
 
         # search handler stack for matching event handlers
-        for frame in self._event_stack:
-            handler = frame.get(event_type, None)
-            if handler:
+        if self._event_stack:
+            for frame in self._event_stack:
+                handler = frame.get(event_type, None)
+                if handler:
+                    try:
+                        if handler(*args):
+                            return True
+                    except TypeError:
+                        self._raise_dispatch_exception(event_type, args, handler)
+
+        # handler set directly on the instance
+        handler = self.__dict__.get(event_type)
+        if handler is None:
+            # default handler of the class
+            try:
+                func = self._dispatch_table[event_type]
+            except KeyError:
+                func = self._dispatch_table[event_type] = \
+                    _compile_handler(self.__class__, event_type)
+            if func is None:
+                return
+            if func is not _use_getattr:
                 try:
-                    if handler(*args):
+                    if func(self, *args):
                         return True
                 except TypeError:
-                    self._raise_dispatch_exception(event_type, args, handler)
-
-        # check instance for an event handler
-        if hasattr(self, event_type):
-            try:
-                # call event
-                func = getattr(self, event_type)
-                if func(*args):
-                    return True
-
-            except TypeError, e:
-                self._raise_dispatch_exception(
-                    event_type, args, getattr(self, event_type))
+                    self._raise_dispatch_exception(
+                        event_type, args, getattr(self, event_type))
+                return
+            handler = getattr(self, event_type)
+
+        try:
+            if handler(*args):
+                return True
+        except TypeError:
+            self._raise_dispatch_exception(event_type, args, handler)
 
     def _raise_dispatch_exception(self, event_type, args, handler):
         # A common problem in applications is having the wrong number of
@@ -6,6 +6,7 @@ from colors import *
 from draw import *
 from paint import *
 from stencil import *
+from viewport import *
 from statement import *
 from fbo import *
 from css import *
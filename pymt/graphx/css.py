@@ -10,7 +10,12 @@ from statement import GlDisplayList
 from OpenGL.GL import GL_LINE_LOOP
 
 
-Cache.register('css_rect', limit=100, timeout=5)
+# estimated size of a display list: vertices of rounded corners, with
+# color (4 bytes) and position (12 bytes) for each vertex.
+_css_rect_size = 128 * 16
+
+Cache.register('css_rect', limit=100, timeout=5,
+               release=GlDisplayList.release)
 def drawCSSRectangle(pos=(0,0), size=(100,100), style={}, prefix=None):
     '''Draw a rectangle with CSS
 
@@ -37,6 +42,9 @@ def drawCSSRectangle(pos=(0,0), size=(100,100), style={}, prefix=None):
             if prefix in k:
                 newstyle[k.replace(prefix, '')] = style[k]
         style = newstyle
+    else:
+        # don't modify the style of the widget
+        style = dict(style)
 
     style.setdefault('border-radius', 0)
     style.setdefault('border-radius-precision', .1)
@@ -66,6 +74,6 @@ def drawCSSRectangle(pos=(0,0), size=(100,100), style={}, prefix=None):
             if style['draw-alpha-background']:
                 drawRectangleAlpha(alpha=style['alpha-background'], **k)
 
-    Cache.append('css_rect', cache_id, new_cache)
     new_cache.draw()
+    Cache.append('css_rect', cache_id, new_cache, size=_css_rect_size)
 
@@ -21,8 +21,21 @@ from paint import *
 from statement import *
 from colors import *
 
+def _label_size(label):
+    # bytes used by the label texture (the whole texture for a region)
+    texture = label.texture
+    if texture is None:
+        return 0
+    texture = getattr(texture, 'owner', texture)
+    return texture.width * texture.height * 4
+
+def _label_release(label):
+    # drop the texture now, instead of waiting for the label collection
+    label.texture = None
+
 # create a cache for label
-pymt.Cache.register('drawlabel', timeout=1., limit=100)
+pymt.Cache.register('drawlabel', timeout=1., limit=100,
+                    release=_label_release)
 def drawLabel(label, pos=(0,0), **kwargs):
     '''Draw a label on the window.
 
@@ -56,7 +69,12 @@ def drawLabel(label, pos=(0,0), **kwargs):
     temp_label = pymt.Cache.get('drawlabel', id)
     if not temp_label:
         temp_label = pymt.Label(label, **kwargs)
-        pymt.Cache.append('drawlabel', id, temp_label)
+        temp_label.x, temp_label.y = pos
+        temp_label.draw()
+        width = temp_label.content_width
+        pymt.Cache.append('drawlabel', id, temp_label,
+                          size=_label_size(temp_label))
+        return width
 
     # draw
     temp_label.x, temp_label.y = pos
@@ -19,6 +19,7 @@ from OpenGL.GL.EXT.framebuffer_object import *
 from paint import *
 from colors import *
 from draw import *
+from viewport import viewportPush, viewportPop
 
 # for a specific bug in 3.0.0, about deletion of framebuffer.
 OpenGLversion = tuple(int(re.match('^(\d+)', i).groups()[0]) for i in OpenGL.__version__.split('.'))
@@ -185,8 +186,11 @@ class HardwareFbo(AbstractFbo):
         if self.push_viewport:
             glPushAttrib(GL_VIEWPORT_BIT)
             glViewport(0, 0, self.size[0], self.size[1])
+        # no culling inside fbo, the coordinates are not the window one
+        viewportPush(None)
 
     def release(self):
+        viewportPop()
         if self.push_viewport:
             glPopAttrib()
         Fbo.fbo_stack.pop()
@@ -232,7 +236,12 @@ class SoftwareFbo(AbstractFbo):
         set_color(1,1,1)
         drawTexturedRectangle(self.texture, size=self.size)
 
+        # no culling inside fbo, the coordinates are not the window one
+        viewportPush(None)
+
     def release(self):
+        viewportPop()
+
         # Restore viewport
         if self.push_viewport:
             glPopAttrib()
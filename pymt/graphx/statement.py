@@ -64,6 +64,14 @@ class GlDisplayList:
         '''Clear compiled flag'''
         self.compiled = False
 
+    def release(self):
+        '''Delete the OpenGL display list. The object can't be used anymore'''
+        if self.dl is None:
+            return
+        glDeleteLists(self.dl, 1)
+        self.dl = None
+        self.compiled = False
+
     def is_compiled(self):
         '''Return compiled flag'''
         return self.compiled
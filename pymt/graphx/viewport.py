@@ -0,0 +1,45 @@
+'''
+Viewport: stack of visible areas, in window coordinates
+
+Widgets are using it to skip the drawing of children that are outside the
+visible area. Window push his size, stencil containers push their bounding
+box, and FBO push None to disable the culling while drawing in them.
+'''
+
+__all__ = ['viewportPush', 'viewportPop', 'viewportGet', 'viewportIntersect']
+
+viewport_stack = []
+
+def viewportPush(rect):
+    '''Push a new visible area in the stack, as (x1, y1, x2, y2) in window
+    coordinates. The area is intersected with the current one. If `rect` is
+    None, the culling is disabled until the next viewportPop().'''
+    global viewport_stack
+    if rect is not None and len(viewport_stack):
+        current = viewport_stack[-1]
+        if current is not None:
+            rect = (max(rect[0], current[0]), max(rect[1], current[1]),
+                    min(rect[2], current[2]), min(rect[3], current[3]))
+    viewport_stack.append(rect)
+
+def viewportPop():
+    '''Pop the last visible area from the stack'''
+    global viewport_stack
+    viewport_stack.pop()
+
+def viewportGet():
+    '''Return the current visible area, or None if the culling is disabled'''
+    global viewport_stack
+    if not len(viewport_stack):
+        return None
+    return viewport_stack[-1]
+
+def viewportIntersect(rect, viewport=None):
+    '''Return True if the rect (x1, y1, x2, y2) intersect the viewport.
+    If viewport is None, the current visible area is used.'''
+    if viewport is None:
+        viewport = viewportGet()
+        if viewport is None:
+            return True
+    return rect[0] <= viewport[2] and rect[2] >= viewport[0] and \
+           rect[1] <= viewport[3] and rect[3] >= viewport[1]
@@ -7,3 +7,4 @@ from provider import *
 from factory import *
 from providers import *
 from touch import *
+from history import *
@@ -0,0 +1,140 @@
+'''
+History: last positions of a touch
+
+Each touch record its positions (in the provider coordinates, from 0 to 1,
+like `sx` and `sy`) with the time they have been received, in a ring buffer
+of fixed size. Widgets can use it instead of keeping their own list of
+positions ::
+
+    def on_touch_up(self, touch):
+        vx, vy = touch.history.velocity(.1)
+        print 'speed at release', vx, vy
+        print 'total distance', touch.history.path_length
+
+The positions are stored in arrays of doubles, and the queries work on
+slices of them (searching the time with a bisection), not position by
+position.
+'''
+
+__all__ = ['TouchHistory']
+
+from array import array
+from bisect import bisect_right
+from math import sqrt
+
+class TouchHistory(object):
+    '''Ring buffer of (time, x, y).
+
+    :Parameters:
+        `size` : int, default to 64
+            Maximum number of positions kept
+    '''
+
+    __slots__ = ('size', 'count', 'index', 'path_length', '_t', '_x', '_y')
+
+    def __init__(self, size=64):
+        self.size = size
+        self._t = array('d', [0.]) * size
+        self._x = array('d', [0.]) * size
+        self._y = array('d', [0.]) * size
+        self.clear()
+
+    def clear(self):
+        '''Remove all the positions'''
+        self.count = 0
+        # index of the next position to write
+        self.index = 0
+        #: Length of the whole path, including the positions not kept
+        self.path_length = 0.
+
+    def __len__(self):
+        return self.count
+
+    def append(self, t, x, y):
+        '''Add a position'''
+        index = self.index
+        if self.count:
+            dx = x - self._x[index - 1]
+            dy = y - self._y[index - 1]
+            self.path_length += sqrt(dx * dx + dy * dy)
+        self._t[index] = t
+        self._x[index] = x
+        self._y[index] = y
+        index += 1
+        if index == self.size:
+            index = 0
+        self.index = index
+        if self.count < self.size:
+            self.count += 1
+
+    def _ordered(self, data):
+        # return the values of data, from the oldest to the last one
+        if self.count < self.size:
+            return data[:self.count]
+        index = self.index
+        return data[index:] + data[:index]
+
+    def get_times(self):
+        '''Return an array of the times, from the oldest to the last one'''
+        return self._ordered(self._t)
+
+    def __getitem__(self, index):
+        '''Return the (time, x, y) at `index`, 0 is the oldest position and
+        -1 the last one'''
+        count = self.count
+        if index < 0:
+            index += count
+        if index < 0 or index >= count:
+            raise IndexError('history index out of range')
+        i = (self.index - count + index) % self.size
+        return self._t[i], self._x[i], self._y[i]
+
+    def __iter__(self):
+        return iter(zip(self._ordered(self._t), self._ordered(self._x),
+                        self._ordered(self._y)))
+
+    def positions(self, width=1., height=1.):
+        '''Return the list of (x, y), from the oldest to the last one,
+        multiplied by width and height (like Touch.scale_for_screen())'''
+        xs = self._ordered(self._x)
+        ys = self._ordered(self._y)
+        if width != 1:
+            xs = map(float(width).__mul__, xs)
+        if height != 1:
+            ys = map(float(height).__mul__, ys)
+        return zip(xs, ys)
+
+    def velocity(self, duration=None):
+        '''Return the velocity (vx, vy) in unit per second, between the last
+        position and the position `duration` seconds before. If duration is
+        None, the two last positions are used.'''
+        count = self.count
+        if count < 2:
+            return 0., 0.
+        t1, x1, y1 = self[-1]
+        if duration is None:
+            index = count - 2
+        else:
+            # last position received at least `duration` seconds before
+            index = bisect_right(self.get_times(), t1 - duration) - 1
+            index = min(max(index, 0), count - 2)
+        t0, x0, y0 = self[index]
+        dt = t1 - t0
+        if dt <= 0:
+            return 0., 0.
+        return (x1 - x0) / dt, (y1 - y0) / dt
+
+    def acceleration(self):
+        '''Return the acceleration (ax, ay) in unit per second squared,
+        computed from the three last positions'''
+        if self.count < 3:
+            return 0., 0.
+        t0, x0, y0 = self[-3]
+        t1, x1, y1 = self[-2]
+        t2, x2, y2 = self[-1]
+        if t1 <= t0 or t2 <= t1 or t2 <= t0:
+            return 0., 0.
+        vx0, vy0 = (x1 - x0) / (t1 - t0), (y1 - y0) / (t1 - t0)
+        vx1, vy1 = (x2 - x1) / (t2 - t1), (y2 - y1) / (t2 - t1)
+        dt = (t2 - t0) / 2.
+        return (vx1 - vx0) / dt, (vy1 - vy0) / dt
@@ -9,6 +9,7 @@ import sys
 import doubletap
 import ignorelist
 import retaintouch
+import recorder
 
 pymt_postproc_modules = []
 
@@ -17,3 +18,5 @@ if os.path.basename(sys.argv[0]) not in ('sphinx-build', 'autobuild.py'):
     pymt_postproc_modules.append(retaintouch.InputPostprocRetainTouch())
     pymt_postproc_modules.append(ignorelist.InputPostprocIgnoreList())
     pymt_postproc_modules.append(doubletap.InputPostprocDoubleTap())
+    # must be the last one, to record the events really dispatched
+    pymt_postproc_modules.append(recorder.InputPostprocRecorder())
@@ -0,0 +1,116 @@
+'''
+InputPostproc Recorder: save all the touch events in a file
+
+The recorder write every down/move/up event dispatched to the application
+in a compact binary file, that can be played again with the `replay`
+provider. Activate it with the --record option, or in the configuration ::
+
+    [pymt]
+    record_input = ~/session.rec
+
+The file start with a header (magic string and version), followed by one
+fixed size record per event: time since the start of the recording, event
+type, touch profile, touch uid, marker id, and the position, motion, angle,
+acceleration and shape size of the touch (in provider coordinates).
+'''
+
+__all__ = ['InputPostprocRecorder', 'record_header', 'record_magic',
+           'record_version', 'record_struct', 'record_profiles',
+           'record_types']
+
+import os
+import struct
+import atexit
+import pymt
+from ...logger import pymt_logger
+from ...clock import getClock
+
+#: Header of the file: magic string, and format version
+record_header = struct.Struct('<8sI')
+record_magic = 'PYMTREC\0'
+record_version = 1
+
+#: One event: time, type, profile mask, uid, markerid, sx, sy, sz, X, Y, Z,
+#: a, m, shape width, shape height
+record_struct = struct.Struct('<dBHIi10f')
+
+#: Event types, indexed by their code in the file
+record_types = ('down', 'move', 'up')
+
+#: Profiles saved in the mask, in bit order
+record_profiles = ('pos', 'pos3d', 'mov', 'mov3d', 'dim', 'dim3d',
+                   'markerid', 'sessionid', 'angle', 'angle3D', 'rot',
+                   'rotacc', 'rotacc3d', 'motacc', 'shape', 'kinetic')
+
+_record_type_codes = dict([(t, i) for i, t in enumerate(record_types)])
+_record_profile_bits = dict([(p, 1 << i) for i, p in
+                             enumerate(record_profiles)])
+
+class InputPostprocRecorder(object):
+    '''
+    InputPostprocRecorder is a post-processor saving all the events in a
+    file. It must be the last post-processor, to save the events really
+    dispatched. See module documentation for more information.
+    '''
+    def __init__(self):
+        self.filename = pymt.pymt_config.get('pymt', 'record_input')
+        self.fd = None
+        self.time_start = None
+        self.count = 0
+        if not self.filename:
+            return
+        filename = os.path.expanduser(self.filename)
+        try:
+            self.fd = open(filename, 'wb')
+        except IOError, e:
+            pymt_logger.error('Recorder: unable to open %s: %s' % (
+                              filename, e))
+            return
+        self.fd.write(record_header.pack(record_magic, record_version))
+        atexit.register(self.close)
+        pymt_logger.info('Recorder: recording input in %s' % filename)
+
+    def close(self):
+        '''Close the file'''
+        if self.fd is None:
+            return
+        self.fd.close()
+        self.fd = None
+        pymt_logger.info('Recorder: %d events saved' % self.count)
+
+    def process(self, events):
+        # check if module is disabled
+        if self.fd is None:
+            return events
+
+        curtime = getClock().get_time()
+        if self.time_start is None:
+            self.time_start = curtime
+        curtime -= self.time_start
+
+        pack = record_struct.pack
+        bits = _record_profile_bits
+        data = []
+        for type, touch in events:
+            code = _record_type_codes.get(type)
+            if code is None:
+                continue
+            mask = 0
+            for profile in touch.profile:
+                mask |= bits.get(profile, 0)
+            shape = touch.shape
+            width = height = 0.
+            if shape is not None:
+                width = getattr(shape, 'width', 0.)
+                height = getattr(shape, 'height', 0.)
+            try:
+                markerid = int(getattr(touch, 'fid', 0))
+            except (TypeError, ValueError):
+                markerid = 0
+            data.append(pack(curtime, code, mask, touch.uid, markerid,
+                             touch.sx, touch.sy, touch.sz,
+                             touch.X, touch.Y, touch.Z,
+                             touch.a, touch.m, width, height))
+        self.fd.write(''.join(data))
+        self.count += len(data)
+        return events
@@ -6,6 +6,12 @@ __all__ = ['TouchProvider']
 
 class TouchProvider(object):
 
+    #: True if the provider don't need to be polled on each frame: new input
+    #: come from the window events, or the provider call
+    #: TouchEventLoop.wakeup(). Otherwise, the event loop never sleep more
+    #: than one frame.
+    event_driven = False
+
     def __init__(self, device, args):
         self.device = device
         if self.__class__ == TouchProvider:
@@ -5,8 +5,11 @@ Providers: list of all input providers
 import pymt
 import sys
 
+from network import *
 from tuio import *
 from mouse import *
+from replay import *
+from synthetic import *
 
 if sys.platform == 'win32':
     from wm_touch import *
@@ -6,7 +6,6 @@ __all__ = ['MouseTouchProvider']
 
 import osc
 from collections import deque
-from ...base import getWindow
 from ..provider import TouchProvider
 from ..factory import TouchFactory
 from ..touch import Touch
@@ -20,6 +19,9 @@ class MouseTouch(Touch):
 class MouseTouchProvider(TouchProvider):
     __handlers__ = {}
 
+    # mouse events are coming from the window
+    event_driven = True
+
     def __init__(self, device, args):
         super(MouseTouchProvider, self).__init__(device, args)
         self.waiting_event  = deque()
@@ -82,6 +84,8 @@ class MouseTouchProvider(TouchProvider):
     def update(self, dispatch_fn):
         '''Update the mouse provider (pop event from the queue)'''
         if not self.window:
+            # base import the input package: import it when needed
+            from ...base import getWindow
             self.window = getWindow()
             if self.window:
                 self.window.push_handlers(
@@ -0,0 +1,242 @@
+'''
+Network: base for the input providers receiving datagrams
+
+All the network providers share one thread, waiting on their sockets with
+select(). The datagrams are decoded in this thread, and the result is
+queued for the main thread, where it's processed in update() ::
+
+    class MyNetworkProvider(DatagramTouchProvider):
+        def decode(self, data, address):
+            # called in the network thread, return None to ignore data
+            return data.split()
+
+        def process(self, dispatch_fn, item):
+            # called in the main thread
+            ...
+
+    TouchFactory.register('mynetwork', MyNetworkProvider)
+
+The queue of each provider is bounded: when it's full, the socket is not
+read anymore until the main thread consume the queue, and new datagrams
+stay in the system buffer (or are dropped by the system).
+'''
+
+from __future__ import with_statement
+
+__all__ = ('NetworkLoop', 'getNetworkLoop', 'DatagramTouchProvider')
+
+import os
+import errno
+import select
+import socket
+from collections import deque
+from threading import Thread, Lock
+from ..provider import TouchProvider
+from ...logger import pymt_logger
+
+class NetworkLoop(Thread):
+    '''Thread reading the sockets of all the network providers'''
+
+    def __init__(self):
+        super(NetworkLoop, self).__init__(name='NetworkLoop')
+        self.daemon = True
+        self.quit = False
+        self.providers = {}
+        self.lock = Lock()
+        # used to interrupt select() when the sockets are changing
+        self._wakeup = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._wakeup.bind(('127.0.0.1', 0))
+        self._wakeup.setblocking(0)
+
+    def add(self, provider):
+        '''Start to read the socket of the provider'''
+        with self.lock:
+            self.providers[provider.socket] = provider
+        self.wakeup()
+
+    def remove(self, provider):
+        '''Stop to read the socket of the provider. The thread stop when
+        there is no provider anymore.'''
+        with self.lock:
+            self.providers.pop(provider.socket, None)
+            if not self.providers:
+                self.quit = True
+        self.wakeup()
+
+    def wakeup(self):
+        '''Interrupt the wait, to check again the providers'''
+        try:
+            self._wakeup.sendto('w', self._wakeup.getsockname())
+        except socket.error:
+            pass
+
+    def stop(self):
+        '''Stop the thread'''
+        self.quit = True
+        self.wakeup()
+
+    def run(self):
+        wakeup = self._wakeup
+        while not self.quit:
+            with self.lock:
+                providers = self.providers.copy()
+            sockets = [sock for sock, provider in providers.iteritems()
+                       if not provider.is_full()]
+            sockets.append(wakeup)
+            try:
+                readable = select.select(sockets, [], [], 1.)[0]
+            except (select.error, socket.error):
+                # a socket have been closed in the meantime
+                continue
+            for sock in readable:
+                if sock is wakeup:
+                    try:
+                        while True:
+                            wakeup.recv(16)
+                    except socket.error:
+                        pass
+                    continue
+                try:
+                    providers[sock].read()
+                except Exception, e:
+                    pymt_logger.error('NetworkLoop: error while reading')
+                    pymt_logger.exception(e)
+        wakeup.close()
+
+
+# the shared network thread
+_network_loop = None
+
+def getNetworkLoop():
+    '''Return the network thread, start it if needed'''
+    global _network_loop
+    if _network_loop is None or _network_loop.quit:
+        _network_loop = NetworkLoop()
+        _network_loop.start()
+    return _network_loop
+
+
+class DatagramTouchProvider(TouchProvider):
+    '''Abstract provider listening to an UDP port. The provider is configured
+    with the address and port to listen, like `0.0.0.0:3333`.
+
+    :Parameters:
+        `queue_size` : int, default to 256
+            Maximum number of decoded datagrams waiting for the main thread
+    '''
+
+    #: Size of the receive buffer, enough for the biggest UDP datagram
+    bufsize = 65536
+
+    #: Size of the socket receive buffer asked to the system
+    rcvbuf = 1024 * 1024
+
+    # the network thread wake up the event loop
+    event_driven = True
+
+    def __init__(self, device, args, queue_size=256):
+        super(DatagramTouchProvider, self).__init__(device, args)
+        self.ip, self.port = None, None
+        self.socket = None
+        self.queue_size = queue_size
+        self.queue = deque()
+        ipport = args.split(',')[0].split(':')
+        if len(ipport) != 2:
+            pymt_logger.error('%s: invalid configuration <%s>' % (
+                              self.__class__.__name__, args))
+            pymt_logger.error('Format must be ip:port (eg. 127.0.0.1:3333)')
+            return
+        self.ip, self.port = ipport[0], int(ipport[1])
+
+    def start(self):
+        '''Open the socket, and start to read it in the network thread'''
+        if self.port is None:
+            return
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if os.name in ['posix', 'mac'] and hasattr(socket, 'SO_REUSEADDR'):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                                   self.rcvbuf)
+        except socket.error:
+            pass
+        try:
+            self.socket.bind((self.ip, self.port))
+        except socket.error, e:
+            pymt_logger.error('%s: unable to listen on %s:%d (%s)' % (
+                              self.__class__.__name__, self.ip, self.port, e))
+            self.socket.close()
+            self.socket = None
+            return
+        self.socket.setblocking(0)
+        getNetworkLoop().add(self)
+        pymt_logger.info('%s: listening on %s:%d' % (
+                         self.__class__.__name__, self.ip, self.port))
+
+    def stop(self):
+        '''Stop to read the socket, and close it'''
+        if self.socket is None:
+            return
+        getNetworkLoop().remove(self)
+        self.socket.close()
+        self.socket = None
+
+    def is_full(self):
+        '''Return True if the queue is full'''
+        return len(self.queue) >= self.queue_size
+
+    def read(self):
+        '''Read all the pending datagrams (called in the network thread)'''
+        sock = self.socket
+        if sock is None:
+            return
+        recv = sock.recvfrom
+        bufsize = self.bufsize
+        queue = self.queue
+        count = 0
+        while len(queue) < self.queue_size:
+            try:
+                data, address = recv(bufsize)
+            except socket.error, e:
+                if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            # a bad datagram must not stop the read of the next ones
+            try:
+                item = self.decode(data, address)
+            except Exception, e:
+                pymt_logger.error('%s: unable to decode a datagram from %s' % (
+                                  self.__class__.__name__, address[0]))
+                pymt_logger.exception(e)
+                continue
+            if item is not None:
+                queue.append(item)
+                count += 1
+        # new input, don't wait the end of the frame
+        if count:
+            from ...base import getEventLoop
+            evloop = getEventLoop()
+            if evloop:
+                evloop.wakeup()
+
+    def update(self, dispatch_fn):
+        '''Process the queued datagrams'''
+        queue = self.queue
+        full = len(queue) >= self.queue_size
+        try:
+            while True:
+                self.process(dispatch_fn, queue.popleft())
+        except IndexError:
+            pass
+        # the network thread can read our socket again
+        if full:
+            getNetworkLoop().wakeup()
+
+    def decode(self, data, address):
+        '''Decode a datagram in the network thread. Return the item to
+        queue for process(), or None.'''
+        return data
+
+    def process(self, dispatch_fn, item):
+        '''Process a decoded datagram in the main thread'''
+        pass
@@ -0,0 +1,134 @@
+'''
+Replay: play the input recorded with the --record option
+
+The replay provider read a file written by the recorder post-processor, and
+dispatch the same events again. It can be configured with the `[input]`
+configuration, or on the command line ::
+
+    [input]
+    # name = replay,<filename>[,fast]
+    session = replay,~/session.rec
+
+    python myapp.py -p session:replay,~/session.rec,fast
+
+By default, the events are dispatched at the time they were recorded. In
+`fast` mode, the events of one recorded frame are dispatched on each frame,
+as fast as the application can go: the run is deterministic, and can be
+used for benchmarks.
+'''
+
+from __future__ import with_statement
+
+__all__ = ['ReplayTouchProvider', 'ReplayTouch']
+
+import os
+from ..provider import TouchProvider
+from ..factory import TouchFactory
+from ..touch import Touch
+from ..shape import TouchShapeRect
+from ..postproc.recorder import record_header, record_magic, \
+        record_version, record_struct, record_types, record_profiles
+from ...logger import pymt_logger
+from ...clock import getClock
+
+class ReplayTouch(Touch):
+    '''A touch played from a record. The args are the unpacked record.'''
+
+    __slots__ = ('fid', )
+
+    def depack(self, args):
+        time, code, mask, uid, self.fid, self.sx, self.sy, self.sz, \
+            self.X, self.Y, self.Z, self.a, self.m, width, height = args
+        self.profile = tuple([profile for i, profile in
+                              enumerate(record_profiles) if mask & (1 << i)])
+        if 'shape' in self.profile:
+            if self.shape is None:
+                self.shape = TouchShapeRect()
+            self.shape.width = width
+            self.shape.height = height
+        super(ReplayTouch, self).depack(args)
+
+
+class ReplayTouchProvider(TouchProvider):
+    '''Replay provider, see module documentation for more information.'''
+
+    def __init__(self, device, args):
+        super(ReplayTouchProvider, self).__init__(device, args)
+        args = args.split(',')
+        self.filename = os.path.expanduser(args[0])
+        self.fast = 'fast' in args[1:]
+        self.data = ''
+        self.offset = 0
+        self.time_start = None
+        self.touches = {}
+
+    def start(self):
+        '''Load the record'''
+        try:
+            with open(self.filename, 'rb') as fd:
+                data = fd.read()
+        except IOError, e:
+            pymt_logger.error('Replay: unable to read %s: %s' % (
+                              self.filename, e))
+            return
+        if len(data) < record_header.size or \
+           record_header.unpack_from(data) != (record_magic, record_version):
+            pymt_logger.error('Replay: %s is not a record' % self.filename)
+            return
+        self.data = data
+        self.offset = record_header.size
+        self.time_start = None
+        pymt_logger.info('Replay: playing %d events from %s' % (
+            (len(data) - self.offset) / record_struct.size, self.filename))
+
+    def stop(self):
+        self.data = ''
+        self.offset = 0
+
+    def update(self, dispatch_fn):
+        data = self.data
+        offset = self.offset
+        if offset >= len(data):
+            return
+
+        # play the events until the current time, or until the end of the
+        # recorded frame in fast mode
+        if self.fast:
+            limit = record_struct.unpack_from(data, offset)[0]
+        else:
+            curtime = getClock().get_time()
+            if self.time_start is None:
+                self.time_start = curtime
+            limit = curtime - self.time_start
+
+        unpack_from = record_struct.unpack_from
+        size = record_struct.size
+        touches = self.touches
+        while offset + size <= len(data):
+            args = unpack_from(data, offset)
+            if args[0] > limit:
+                break
+            offset += size
+            type, uid = record_types[args[1]], args[3]
+            if type == 'down':
+                touch = ReplayTouch.create(self.device, uid, args)
+                touches[uid] = touch
+            else:
+                touch = touches.get(uid)
+                if touch is None:
+                    continue
+                touch.move(args)
+                if type == 'up':
+                    del touches[uid]
+            dispatch_fn(type, touch)
+        self.offset = offset
+
+        if offset + size > len(data):
+            # end of the record, release the touches still down
+            for touch in touches.itervalues():
+                dispatch_fn('up', touch)
+            touches.clear()
+            self.offset = len(data)
+            pymt_logger.info('Replay: end of %s' % self.filename)
+
+TouchFactory.register('replay', ReplayTouchProvider)
@@ -0,0 +1,182 @@
+'''
+Synthetic: generate touches, to test an application under load
+
+The synthetic provider move a number of fingers on the screen, without any
+hardware. The touches have the same profiles as the TUIO 2dCur touches.
+It's configured in the `[input]` configuration, with options separated by
+commas ::
+
+    [input]
+    # name = synthetic[,option=value...]
+    load = synthetic,touches=100,rate=60,pattern=mixed
+
+Options:
+
+    `touches` : int, default to 10
+        Number of fingers on the screen
+    `rate` : float, default to 60
+        Number of moves of each finger per second (more than 0)
+    `pattern` : str, default to mixed
+        Movement of the fingers: walk (random walk), swipe, pinch (pairs
+        of fingers), tap, or mixed (random pattern for each finger)
+    `seed` : int, default to 0
+        Seed of the random generator, the same seed give the same fingers
+'''
+
+__all__ = ['SyntheticTouchProvider']
+
+import math
+import random
+from ..provider import TouchProvider
+from ..factory import TouchFactory
+from ...logger import pymt_logger
+from ...clock import getClock
+from tuio import Tuio2dCurTouch
+
+class _Finger(object):
+    '''A finger following a pattern'''
+
+    __slots__ = ('pattern', 'duration', 'x', 'y', 'vx', 'vy', 'cx', 'cy',
+                 'angle', 'r0', 'r1', 'touch')
+
+    def __init__(self, pattern, rnd):
+        self.pattern = pattern
+        self.touch = None
+        self.vx = self.vy = 0.
+        self.x, self.y = rnd.uniform(.1, .9), rnd.uniform(.1, .9)
+        if pattern == 'walk':
+            self.duration = rnd.uniform(1., 3.)
+        elif pattern == 'swipe':
+            self.duration = rnd.uniform(.3, .8)
+            angle = rnd.uniform(0, math.pi * 2)
+            speed = rnd.uniform(.5, 1.5)
+            self.vx, self.vy = math.cos(angle) * speed, math.sin(angle) * speed
+        elif pattern == 'tap':
+            self.duration = rnd.uniform(.05, .15)
+        else:
+            self.duration = rnd.uniform(.5, 1.5)
+
+    def position(self, t, rnd):
+        '''Return the position at time t, from the start of the finger'''
+        pattern = self.pattern
+        if pattern == 'walk':
+            self.x += rnd.gauss(0, .005)
+            self.y += rnd.gauss(0, .005)
+        elif pattern == 'swipe':
+            return self.x + self.vx * t, self.y + self.vy * t
+        elif pattern == 'pinch':
+            r = self.r0 + (self.r1 - self.r0) * min(1., t / self.duration)
+            return (self.cx + math.cos(self.angle) * r,
+                    self.cy + math.sin(self.angle) * r)
+        return self.x, self.y
+
+
+class SyntheticTouchProvider(TouchProvider):
+    '''Synthetic provider, see module documentation for more information.'''
+
+    patterns = ('walk', 'swipe', 'pinch', 'tap')
+
+    def __init__(self, device, args):
+        super(SyntheticTouchProvider, self).__init__(device, args)
+        options = {'touches': '10', 'rate': '60', 'pattern': 'mixed',
+                   'seed': '0'}
+        for arg in args.split(','):
+            if not arg:
+                continue
+            if '=' not in arg or arg.split('=')[0] not in options:
+                pymt_logger.error('Synthetic: invalid option <%s>' % arg)
+                continue
+            key, value = arg.split('=', 1)
+            options[key] = value
+        self.count = self._parse(options, 'touches', int, 10,
+                                 lambda value: value >= 0)
+        self.rate = self._parse(options, 'rate', float, 60.,
+                                lambda value: 0 < value < float('inf'))
+        self.pattern = options['pattern']
+        if self.pattern != 'mixed' and self.pattern not in self.patterns:
+            pymt_logger.error('Synthetic: unknown pattern <%s>, use mixed' %
+                              self.pattern)
+            self.pattern = 'mixed'
+        self.random = random.Random(self._parse(options, 'seed', int, 0))
+        self.fingers = []
+        self.time = None
+        self.uid = 0
+
+    def _parse(self, options, key, convert, default, check=None):
+        # return the option converted, or the default value if it's invalid
+        try:
+            value = convert(options[key])
+            if check is not None and not check(value):
+                raise ValueError(options[key])
+        except ValueError:
+            pymt_logger.error('Synthetic: invalid value <%s> for %s, use %s' %
+                              (options[key], key, default))
+            return default
+        return value
+
+    def start(self):
+        self.time = None
+        self.fingers = []
+
+    def stop(self):
+        self.fingers = []
+
+    def _spawn(self, curtime):
+        rnd = self.random
+        pattern = self.pattern
+        if pattern == 'mixed':
+            pattern = rnd.choice(self.patterns)
+        finger = _Finger(pattern, rnd)
+        if pattern != 'pinch':
+            return [(curtime, finger)]
+        # two fingers moving in front of each other
+        other = _Finger(pattern, rnd)
+        other.duration = finger.duration
+        cx, cy = finger.x, finger.y
+        r0, r1 = rnd.uniform(.02, .2), rnd.uniform(.02, .2)
+        angle = rnd.uniform(0, math.pi)
+        for f, a in ((finger, angle), (other, angle + math.pi)):
+            f.cx, f.cy, f.r0, f.r1, f.angle = cx, cy, r0, r1, a
+        return [(curtime, finger), (curtime, other)]
+
+    def _move(self, dispatch_fn, curtime, start, finger):
+        t = curtime - start
+        x, y = finger.position(t, self.random)
+        x, y = min(1., max(0., x)), min(1., max(0., y))
+        touch = finger.touch
+        if touch is None:
+            self.uid += 1
+            finger.touch = Tuio2dCurTouch.create(self.device, self.uid,
+                                                 (x, y, 0., 0., 0.))
+            dispatch_fn('down', finger.touch)
+            return
+        # the positions are in TUIO coordinates, like the touch args
+        dt = 1. / self.rate
+        X, Y = (x - touch.sx) / dt, (y - (1. - touch.sy)) / dt
+        touch.move((x, y, X, Y, math.sqrt(X * X + Y * Y)))
+        dispatch_fn(t >= finger.duration and 'up' or 'move', touch)
+
+    def update(self, dispatch_fn):
+        curtime = getClock().get_time()
+        if self.time is None:
+            self.time = curtime
+        # move the fingers at the configured rate, without catching up more
+        # than few steps if the application is slow
+        dt = 1. / self.rate
+        steps = min(int((curtime - self.time) / dt), 5)
+        if steps == 0:
+            return
+        self.time = max(self.time + steps * dt, curtime - dt)
+
+        for step in xrange(steps):
+            steptime = curtime - (steps - step - 1) * dt
+            while len(self.fingers) < self.count:
+                self.fingers.extend(self._spawn(steptime))
+            fingers = []
+            for start, finger in self.fingers:
+                self._move(dispatch_fn, steptime, start, finger)
+                if steptime - start < finger.duration:
+                    fingers.append((start, finger))
+            self.fingers = fingers
+
+TouchFactory.register('synthetic', SyntheticTouchProvider)
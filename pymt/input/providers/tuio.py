@@ -4,15 +4,13 @@ Tuio: TUIO input provider implementation
 
 __all__ = ['TuioTouchProvider', 'Tuio2dCurTouch', 'Tuio2dObjTouch']
 
-import osc
-from collections import deque
-from ..provider import TouchProvider
+from osc.OSC import decodeOSC
+from network import DatagramTouchProvider
 from ..factory import TouchFactory
 from ..touch import Touch
 from ..shape import TouchShapeRect
-from ...logger import pymt_logger
 
-class TuioTouchProvider(TouchProvider):
+class TuioTouchProvider(DatagramTouchProvider):
     '''Tuio provider listen to a socket, and handle part of OSC message
 
         * /tuio/2Dcur
@@ -24,6 +22,10 @@ class TuioTouchProvider(TouchProvider):
         # name = tuio,<ip>:<port>
         multitouchtable = tuio,192.168.0.1:3333
 
+    The messages of a bundle are applied together, when the TUIO frame is
+    complete: only the last `set` of each touch is used, and the frames
+    received after a newer one (with a lower `fseq`) are ignored.
+
     You can easily handle new tuio path by extending the providers like this ::
 
         # Create a class to handle the new touch type
@@ -46,26 +48,14 @@ class TuioTouchProvider(TouchProvider):
 
     __handlers__ = {}
 
+    #: Frames with a sequence number less than this number before the last
+    #: one are stale. Otherwise, the tracker have been restarted.
+    fseq_window = 1000
+
     def __init__(self, device, args):
         super(TuioTouchProvider, self).__init__(device, args)
-        args = args.split(',')
-        if len(args) <= 0:
-            pymt_logger.error('Invalid configuration for TUIO provider')
-            pymt_logger.error('Format must be ip:port (eg. 127.0.0.1:3333)')
-            pymt_logger.error('Actual TUIO configuration is <%s>' % (str(','.join(args))))
-            return None
-        ipport = args[0].split(':')
-        if len(ipport) != 2:
-            pymt_logger.error('Invalid configuration for TUIO provider')
-            pymt_logger.error('Format must be ip:port (eg. 127.0.0.1:3333)')
-            pymt_logger.error('Actual TUIO configuration is <%s>' % (str(','.join(args))))
-            return None
-        self.ip, self.port = args[0].split(':')
-        self.port = int(self.port)
-        self.handlers = {}
-        self.oscid = None
-        self.tuio_event_q = deque()
         self.touches = {}
+        self.fseq = {}
 
     @staticmethod
     def register(oscpath, classname):
@@ -87,67 +77,81 @@ class TuioTouchProvider(TouchProvider):
 
     def start(self):
         '''Start the tuio provider'''
-        osc.init()
-        self.oscid = osc.listen(self.ip, self.port)
         for oscpath in TuioTouchProvider.__handlers__:
             self.touches[oscpath] = {}
-            osc.bind(self._osc_tuio_cb, oscpath)
-
-    def stop(self):
-        '''Stop the tuio provider'''
-        osc.dontListen(self.oscid)
-
-    def update(self, dispatch_fn):
-        '''Update the tuio provider (pop event from the queue)'''
-        # read the Queue with event
-        try:
-            while True:
-                value = self.tuio_event_q.pop()
-                self._update(dispatch_fn, value)
-        except IndexError:
-            return
-
-    def _osc_tuio_cb(self, *incoming):
-        message = incoming[0]
-        oscpath, types, args = message[0], message[1], message[2:]
-        self.tuio_event_q.appendleft([oscpath, args, types])
-
-    def _update(self, dispatch_fn, value):
-        oscpath, args, types = value
-        command = args[0]
-
-        # verify commands
-        if command not in ['alive', 'set']:
+        super(TuioTouchProvider, self).start()
+
+    def decode(self, data, address):
+        # called in the network thread: decode the datagram, and keep the
+        # messages of our paths. A bundle is queued as one item.
+        messages = []
+        self._collect(decodeOSC(data), messages)
+        if messages:
+            return messages
+
+    def _collect(self, decoded, messages):
+        if not decoded:
             return
+        if type(decoded[0]) == list:
+            for message in decoded:
+                self._collect(message, messages)
+        elif decoded[0] in self.touches:
+            messages.append((decoded[0], decoded[2:], decoded[1]))
+
+    def process(self, dispatch_fn, messages):
+        # collect the frame of each path: the alive ids, the last set of
+        # each id, and the frame sequence number
+        frames = {}
+        for oscpath, args, types in messages:
+            if not args:
+                continue
+            frame = frames.get(oscpath)
+            if frame is None:
+                frame = frames[oscpath] = [None, [], {}, None]
+            command = args[0]
+            if command == 'set':
+                id = args[1]
+                if id not in frame[2]:
+                    frame[1].append(id)
+                frame[2][id] = args[2:]
+            elif command == 'alive':
+                frame[0] = set(args[1:])
+            elif command == 'fseq' and len(args) > 1:
+                frame[3] = args[1]
+
+        for oscpath, (alives, order, sets, fseq) in frames.iteritems():
+            # skip frames older than the last one. -1 is used for redundant
+            # frames, and a big step back means the tracker was restarted.
+            if fseq is not None and fseq != -1:
+                last = self.fseq.get(oscpath)
+                if last is not None and \
+                   last - TuioTouchProvider.fseq_window < fseq <= last:
+                    continue
+                self.fseq[oscpath] = fseq
+            self._commit(dispatch_fn, oscpath, alives, order, sets)
+
+    def _commit(self, dispatch_fn, oscpath, alives, order, sets):
+        touches = self.touches[oscpath]
 
         # move or create a new touch
-        if command == 'set':
-            id = args[1]
-            if id not in self.touches[oscpath]:
+        for id in order:
+            touch = touches.get(id)
+            if touch is None:
                 # new touch
-                touch = TuioTouchProvider.__handlers__[oscpath](self.device, id, args[2:])
-                self.touches[oscpath][id] = touch
+                touch = TuioTouchProvider.__handlers__[oscpath].create(
+                    self.device, id, sets[id])
+                touches[id] = touch
                 dispatch_fn('down', touch)
             else:
                 # update a current touch
-                touch = self.touches[oscpath][id]
-                touch.move(args[2:])
+                touch.move(sets[id])
                 dispatch_fn('move', touch)
 
         # alive event, check for deleted touch
-        if command == 'alive':
-            alives = args[1:]
-            to_delete = []
-            for id in self.touches[oscpath]:
-                if not id in alives:
-                    # touch up
-                    touch = self.touches[oscpath][id]
-                    if not touch in to_delete:
-                        to_delete.append(touch)
-
-            for touch in to_delete:
-                dispatch_fn('up', touch)
-                del self.touches[oscpath][touch.id]
+        if alives is None:
+            return
+        for id in [id for id in touches if id not in alives]:
+            dispatch_fn('up', touches.pop(id))
 
 class Tuio2dCurTouch(Touch):
     '''A 2dCur tuio touch.  Multiple profiles are available:
@@ -156,6 +160,8 @@ class Tuio2dCurTouch(Touch):
         * xyXYm
         * xyXYmh
     '''
+    __slots__ = ()
+
     def __init__(self, device, id, args):
         super(Tuio2dCurTouch, self).__init__(device, id, args)
 
@@ -184,6 +190,8 @@ class Tuio2dObjTouch(Touch):
         * ixyaXYAmr
         * ixyaXYAmrh
     '''
+    __slots__ = ('fid', )
+
     def __init__(self, device, id, args):
         super(Tuio2dObjTouch, self).__init__(device, id, args)
 
@@ -4,7 +4,6 @@ from ctypes import *
 from ..provider import TouchProvider
 from ..factory import TouchFactory
 from ..touch import Touch
-from ...base import getWindow
 from ...utils import curry
 
 MI_WP_SIGNATURE = 0xFF515700
@@ -17,6 +16,9 @@ WM_LBUTTONUP = 514
 
 class WM_PenProvider(TouchProvider):
 
+    # pen events are coming from the window
+    event_driven = True
+
     def mouse_msg_handler(self, win, msg, wparam, lParam):
 
         info = windll.user32.GetMessageExtraInfo()
@@ -46,6 +48,7 @@ class WM_PenProvider(TouchProvider):
     def start(self):
         self.uid = 0
 
+        from ...base import getWindow
         win = getWindow()
         win.pen = None
         win.pen_events = []
@@ -60,6 +63,7 @@ class WM_PenProvider(TouchProvider):
 
 
     def update(self, dispatch_fn):
+        from ...base import getWindow
         win = getWindow()
         skipped = []
         win_x, win_y = win.get_location()
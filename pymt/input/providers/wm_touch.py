@@ -6,7 +6,6 @@ from ..provider import TouchProvider
 from ..factory import TouchFactory
 from ..touch import Touch
 from ..shape import TouchShapeRect
-from ...base import getWindow
 from ...utils import curry
 
 
@@ -59,6 +58,9 @@ class TOUCHINPUT(Structure):
 
 class WM_TOUCHProvider(TouchProvider):
 
+    # touch events are coming from the window
+    event_driven = True
+
 
     def wm_touch_handler(self, win, msg, wparam, lParam):
         touches = (TOUCHINPUT * wparam)()
@@ -91,6 +93,7 @@ class WM_TOUCHProvider(TouchProvider):
         self.touches = {}
         self.uid = 0
 
+        from ...base import getWindow
         win = getWindow()
         win.wm_touch_events = []
         windll.user32.RegisterTouchWindow(win._hwnd, 0)
@@ -107,6 +110,7 @@ class WM_TOUCHProvider(TouchProvider):
 
 
     def update(self, dispatch_fn):
+        from ...base import getWindow
         win = getWindow()
         win_x, win_y = win.get_location()
 
@@ -145,6 +149,7 @@ class WM_TOUCHProvider(TouchProvider):
 
 
     def stop(self):
+        from ...base import getWindow
         win = getWindow()
         if win:
             windll.user32.UnregisterTouchWindow(win._hwnd)
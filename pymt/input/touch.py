@@ -41,12 +41,21 @@ testing the profile ::
 
 __all__ = ['Touch']
 
+from sys import getrefcount
+from weakref import getweakrefcount
 from ..logger import pymt_logger
 from ..clock import getClock
+from history import TouchHistory
 
 class Touch(object):
     '''Abstract class to represent a touch, and support TUIO 1.0 definition.
 
+    Attributes are stored in slots. Providers receiving lot of touches can
+    use create() instead of the constructor: touches released by the event
+    loop after their up event are reused, if nobody keep a reference (or a
+    weak reference) on them. When a touch is released, its grab list and
+    its userdata are dropped.
+
     :Parameters:
         `id` : str
             uniq ID of the touch
@@ -54,6 +63,16 @@ class Touch(object):
             list of parameters, passed to depack() function
     '''
 
+    __slots__ = ('uid', 'device', 'attr', 'grab_list',
+                 'grab_exclusive_class', 'grab_state', 'grab_current',
+                 'id', 'sx', 'sy', 'sz', 'a', 'b', 'c', 'X', 'Y', 'Z',
+                 'A', 'B', 'C', 'm', 'r', 'profile', 'x', 'y', 'z', 'shape',
+                 'dxpos', 'dypos', 'dzpos', 'oxpos', 'oypos', 'ozpos',
+                 'time_start', 'is_timeout', 'have_event_down', 'do_event',
+                 'is_double_tap', 'double_tap_time', 'double_tap_distance',
+                 'no_event', 'history', '_userdata', '__dict__',
+                 '__weakref__')
+
     __uniq_id = 0
     copy_attributes = \
         ('id','sx','sy','sz','a','b','c',
@@ -61,6 +80,14 @@ class Touch(object):
          'profile','x','y','z','dxpos',
          'dypos','dzpos',)
 
+    #: Number of positions kept in the history of each touch
+    history_size = 64
+
+    #: Maximum number of released touches kept for reuse, per class
+    pool_size = 64
+
+    # class -> list of released touches
+    _pools = {}
 
     def __init__(self, device, id, args):
         if self.__class__ == Touch:
@@ -71,11 +98,16 @@ class Touch(object):
         self.uid = Touch.__uniq_id
         self.device = device
 
-        # For push/pop
-        self.attr = []
-
-        # For grab
-        self.grab_list = []
+        # For push/pop, grab and history. They are kept if the touch is
+        # reused.
+        try:
+            del self.attr[:]
+            del self.grab_list[:]
+            self.history.clear()
+        except AttributeError:
+            self.attr = []
+            self.grab_list = []
+            self.history = TouchHistory(self.history_size)
         self.grab_exclusive_class = None
         self.grab_state = False
         self.grab_current = None
@@ -115,16 +147,62 @@ class Touch(object):
         self.do_event = None
         self.is_double_tap = False
         self.double_tap_time = 0
+        self.double_tap_distance = 0
         self.no_event = False
-        self.userdata = {}
+        self._userdata = None
 
         self.depack(args)
 
+    @classmethod
+    def create(cls, device, id, args):
+        '''Return a new touch, reusing a released one if possible'''
+        pool = Touch._pools.get(cls)
+        if pool:
+            for index in xrange(len(pool) - 1, -1, -1):
+                touch = pool[index]
+                # references: pool, touch variable, and getrefcount argument
+                if getrefcount(touch) > 3 or getweakrefcount(touch):
+                    continue
+                del pool[index]
+                # remove the attributes added by the user
+                if touch.__dict__:
+                    touch.__dict__.clear()
+                touch.__init__(device, id, args)
+                return touch
+        return cls(device, id, args)
+
+    def release(self):
+        '''Give back the touch to the pool of its class. Called by the event
+        loop when the up event have been dispatched.'''
+        # don't keep the widgets alive from the pool
+        del self.grab_list[:]
+        self.grab_exclusive_class = None
+        self.grab_current = None
+        self._userdata = None
+        pool = Touch._pools.get(self.__class__)
+        if pool is None:
+            pool = Touch._pools[self.__class__] = []
+        elif len(pool) >= self.pool_size:
+            del pool[0]
+        pool.append(self)
+
+    def _get_userdata(self):
+        if self._userdata is None:
+            self._userdata = {}
+        return self._userdata
+    def _set_userdata(self, userdata):
+        self._userdata = userdata
+    userdata = property(_get_userdata, _set_userdata,
+            doc='''Dict to store data of the user on the touch''')
+
     def depack(self, args):
         '''Depack `args` into attributes in class'''
         if self.oxpos is None:
             self.oxpos, self.oypos = self.sx, self.sy
             self.dxpos, self.dypos = self.sx, self.sy
+        # timestamped on arrival: the moves coalesced in one frame keep
+        # distinct times
+        self.history.append(getClock().get_current_time(), self.sx, self.sy)
 
     def grab(self, class_instance, exclusive=False):
         '''Grab a touch. You can grab a touch if you absolutly want to receive
@@ -35,6 +35,7 @@ import math
 import sys
 import string
 import pprint
+from pymt.logger import pymt_logger
 
 
 def hexDump(bytes):
@@ -216,65 +217,135 @@ def parseArgs(args):
 
 
 
-def decodeOSC(data):
-    """Converts a typetagged OSC message to a Python list."""
-    table = { "i" : readInt, "f" : readFloat, "s" : readString, "b" : readBlob, "d" : readDouble }
-    decoded = []
-    address,  rest = readString(data)
-    typetags = ""
+# Precompiled structs used by the decoder
+_int = struct.Struct(">i")
+_plans = {}
+
+def _compilePlan(typetags):
+    """Return the list of operations to decode the arguments of a typetags
+    string: 's' and 'b' for strings and blobs, and a precompiled Struct
+    for each run of fixed size arguments (ints, floats and doubles)."""
+    plan = []
+    fmt = ""
+    for tag in typetags[1:]:
+        if tag in "ifd":
+            fmt = fmt + tag
+            continue
+        if tag not in "sb":
+            raise KeyError(tag)
+        if fmt:
+            plan.append(struct.Struct(">" + fmt))
+            fmt = ""
+        plan.append(tag)
+    if fmt:
+        plan.append(struct.Struct(">" + fmt))
+    if len(_plans) > 1024:
+        _plans.clear()
+    _plans[typetags] = plan
+    return plan
+
+
+def _readStringAt(data, offset, end):
+    length = data.find("\0", offset, end) - offset
+    if length < 0:
+        raise struct.error("unterminated string")
+    return data[offset:offset + length], offset + ((length + 4) & ~3)
+
+
+def _decodeAt(data, offset, end):
+    """Decode the message or bundle between offset and end. The data is
+    never copied, only the strings and blobs are extracted."""
+    address, offset = _readStringAt(data, offset, end)
 
     if address == "#bundle":
-        time, rest = readLong(rest)
-#       decoded.append(address)
-#       decoded.append(time)
-        while len(rest)>0:
-            length, rest = readInt(rest)
-            decoded.append(decodeOSC(rest[:length]))
-            rest = rest[length:]
-
-    elif len(rest) > 0:
-        typetags, rest = readString(rest)
-        decoded.append(address)
-        decoded.append(typetags)
-        if typetags[0] == ",":
-            for tag in typetags[1:]:
-                value, rest = table[tag](rest)
-                decoded.append(value)
+        # skip the time tag
+        offset = offset + 8
+        decoded = []
+        while offset < end:
+            length = _int.unpack_from(data, offset)[0]
+            offset = offset + 4
+            decoded.append(_decodeAt(data, offset, offset + length))
+            offset = offset + length
+        return decoded
+
+    if offset >= end:
+        return []
+
+    typetags, offset = _readStringAt(data, offset, end)
+    decoded = [address, typetags]
+    if typetags[:1] != ",":
+        pymt_logger.warning('OSC: typetag lacks the magic , in %s' % address)
+        return decoded
+
+    plan = _plans.get(typetags)
+    if plan is None:
+        plan = _compilePlan(typetags)
+    for op in plan:
+        if op == "s":
+            value, offset = _readStringAt(data, offset, end)
+            decoded.append(value)
+        elif op == "b":
+            length = _int.unpack_from(data, offset)[0]
+            offset = offset + 4
+            decoded.append(data[offset:offset + length])
+            offset = offset + ((length + 3) & ~3)
         else:
-            print "Oops, typetag lacks the magic ,"
-
+            if offset + op.size > end:
+                raise struct.error("too few bytes for %s" % op.format)
+            decoded.extend(op.unpack_from(data, offset))
+            offset = offset + op.size
     return decoded
 
 
+def decodeOSC(data):
+    """Converts a typetagged OSC message to a Python list."""
+    try:
+        return _decodeAt(data, 0, len(data))
+    except struct.error, e:
+        pymt_logger.warning('OSC: malformed message (%s)' % e)
+        return []
+    except KeyError, e:
+        pymt_logger.warning('OSC: unsupported typetag %s' % e)
+        return []
+
+
 class CallbackManager:
     """This utility class maps OSC addresses to callables.
 
     The CallbackManager calls its callbacks with a list
     of decoded OSC arguments, including the address and
-    the typetags as the first two arguments."""
+    the typetags as the first two arguments.
+
+    Callbacks added with bundle=True are called once per
+    bundle, with the list of the messages for their address."""
 
     def __init__(self):
         self.callbacks = {}
+        self.bundle_callbacks = {}
         self.add(self.unbundler, "#bundle")
 
     def handle(self, data, source = None):
         """Given OSC data, tries to call the callback with the
         right address."""
         decoded = decodeOSC(data)
-        self.dispatch(decoded, source)
+        if decoded:
+            self.dispatch(decoded, source)
 
     def dispatch(self, message, source = None):
         """Sends decoded OSC data to an appropriate calback"""
+        address = None
         try:
             if type(message[0]) == str :
                 # got a single message
                 address = message[0]
-                self.callbacks[address](message, source)
+                if address in self.bundle_callbacks:
+                    self.bundle_callbacks[address]([message], source)
+                else:
+                    self.callbacks[address](message, source)
 
             elif type(message[0]) == list :
                 # smells like nested messages
-                for msg in message :
-                    self.dispatch(msg, source)
+                self.dispatchBundle(message, source)
 
         except KeyError, e:
             # address not found
@@ -288,13 +359,43 @@ class CallbackManager:
 
         return
 
-    def add(self, callback, name):
+    def dispatchBundle(self, bundle, source = None):
+        """Sends the messages of a decoded bundle. The messages
+        for a bundle callback are grouped in one call."""
+        groups = {}
+        order = []
+        self._groupBundle(bundle, source, groups, order)
+        for address in order:
+            self.bundle_callbacks[address](groups[address], source)
+
+    def _groupBundle(self, bundle, source, groups, order):
+        for message in bundle:
+            if not message:
+                continue
+            if type(message[0]) == list:
+                self._groupBundle(message, source, groups, order)
+            elif message[0] in self.bundle_callbacks:
+                address = message[0]
+                if address not in groups:
+                    groups[address] = []
+                    order.append(address)
+                groups[address].append(message)
+            else:
+                self.dispatch(message, source)
+
+    def add(self, callback, name, bundle = False):
         """Adds a callback to our set of callbacks,
         or removes the callback with name if callback
-        is None."""
+        is None. If bundle is True, the callback receive
+        all the messages of a bundle at once."""
         if callback == None:
-            del self.callbacks[name]
+            self.callbacks.pop(name, None)
+            self.bundle_callbacks.pop(name, None)
+        elif bundle:
+            self.callbacks.pop(name, None)
+            self.bundle_callbacks[name] = callback
         else:
+            self.bundle_callbacks.pop(name, None)
             self.callbacks[name] = callback
 
     def unbundler(self, messages):
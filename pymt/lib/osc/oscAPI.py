@@ -29,7 +29,7 @@
 '''
 
 import OSC
-import socket, os, time, errno
+import socket, select, os, time, errno
 from threading import Thread, Lock
 from pymt.logger import pymt_logger
 
@@ -52,12 +52,17 @@ def init() :
     oscLock.release()
 
 
-def bind(func, oscaddress):
-    '''bind given oscaddresses with given functions in address manager
+def bind(func, oscaddress, bundle=False):
+    '''bind given oscaddresses with given functions in address manager.
+    If bundle is True, the function is called once per bundle, with the
+    list of messages.
+
+    Functions are called in the thread of the server: they must be quick,
+    and give the messages to the main thread with a deque for example.
     '''
     global oscLock, addressManager
     oscLock.acquire()
-    addressManager.add(func, oscaddress)
+    addressManager.add(func, oscaddress, bundle)
     oscLock.release()
 
 
@@ -113,6 +118,12 @@ def createBinaryMsg(oscAddress, dataArray):
 ################################ receive osc from The Other.
 
 class OSCServer(Thread) :
+    #: Size of the receive buffer, enough for the biggest UDP datagram
+    bufsize = 65536
+
+    #: Size of the socket receive buffer asked to the system
+    rcvbuf = 1024 * 1024
+
     def __init__(self, ipAddr='127.0.0.1', port = 9001) :
         Thread.__init__(self)
         self.ipAddr = ipAddr
@@ -130,11 +141,18 @@ class OSCServer(Thread) :
         if os.name in ['posix', 'mac'] and hasattr(socket, 'SO_REUSEADDR'):
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
+        # keep the datagrams received while we are dispatching
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                                   self.rcvbuf)
+        except socket.error:
+            pass
+
         # try to bind the socket, retry if necessary
         while not self.haveSocket and self.isRunning:
             try :
                 self.socket.bind((self.ipAddr, self.port))
-                self.socket.settimeout(0.5)
+                self.socket.setblocking(0)
                 self.haveSocket = True
 
             except socket.error, e:
@@ -150,23 +168,40 @@ class OSCServer(Thread) :
                 # sleep 2 second before retry
                 time.sleep(2)
 
-        oscLock.acquire()
         pymt_logger.info('listening for Tuio on %s:%i' % (self.ipAddr, self.port))
-        oscLock.release()
 
         while self.isRunning:
             try:
-                message = self.socket.recv(1024)
-                oscLock.acquire()
-                addressManager.handle(message)
-                oscLock.release()
+                readable = select.select([self.socket], [], [], 0.5)[0]
+                if readable:
+                    self.drain()
             except Exception, e:
-                if type(e) == socket.timeout:
-                    continue
+                if not self.isRunning:
+                    # socket closed by dontListen()
+                    break
                 pymt_logger.error('Error in Tuio recv()')
                 pymt_logger.exception(e)
                 return 'no data arrived'
 
+    def drain(self):
+        '''Read and dispatch all the pending datagrams. The callbacks are
+        called without the oscLock.'''
+        recv = self.socket.recv
+        bufsize = self.bufsize
+        handle = addressManager.handle
+        while self.isRunning:
+            try:
+                data = recv(bufsize)
+            except socket.error, e:
+                if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+            try:
+                handle(data)
+            except Exception, e:
+                pymt_logger.error('Error while handling an OSC message')
+                pymt_logger.exception(e)
+
 def listen(ipAddr='127.0.0.1', port = 9001):
     '''Creates a new thread listening to that port
     defaults to ipAddr='127.0.0.1', port 9001
@@ -16,6 +16,7 @@ import re
 import math
 from ctypes import CFUNCTYPE, POINTER, byref, cast
 import sys, os
+import struct
 try:
     # get the faster one
     from cStringIO import StringIO
@@ -23,6 +24,20 @@ except ImportError:
     # fallback to the default one
     from StringIO import StringIO
 from pymt.logger import pymt_logger
+from pymt.cache import Cache
+from pymt.diskcache import DiskCache
+
+# Display lists of SVG files. They are shared by all SVG objects of the same
+# file, and the size is the number of vertices (color + position).
+Cache.register('svg', limit=100)
+
+# Tessellated SVG, as stored in the disk cache:
+# header (width, height, number of draw commands, number of vertices),
+# draw commands (mode, first vertex, vertex count), then the vertices
+# (color, position) in GL_C4UB_V3F format.
+_svg_header = struct.Struct('<ffII')
+_svg_command = struct.Struct('<III')
+_svg_vertex = struct.Struct('<4B3f')
 
 
 if sys.platform == 'win32':
@@ -383,6 +398,22 @@ class RadialGradient(Gradient):
     def grad_value(self, pt):
         return math.sqrt((pt[0] - self.cx) ** 2 + (pt[1] - self.cy) ** 2)/self.r
 
+class _SVGDisplayList(object):
+    '''Display list of a SVG file, deleted when no object use it anymore'''
+    def __init__(self, width, height, size):
+        self.dl = glGenLists(1)
+        self.width = width
+        self.height = height
+        self.size = size
+
+    def __del__(self):
+        # same as Texture, it can fail when leaving the application.
+        try:
+            glDeleteLists(self.dl, 1)
+        except:
+            pass
+
+
 class SVG(object):
     """Opaque SVG image object.
 
@@ -392,7 +423,6 @@ class SVG(object):
     """
 
     _tess = None
-    _disp_list_cache = {}
     def __init__(self, filename, anchor_x=0, anchor_y=0, bezier_points=BEZIER_POINTS, circle_points=CIRCLE_POINTS, rawdata=None):
         """Creates an SVG object from a .svg or .svgz file.
 
@@ -460,24 +490,35 @@ class SVG(object):
     anchor_y = property(_get_anchor_y, _set_anchor_y)
 
     def generate_disp_list(self):
-        if (self.filename, self.bezier_points) in self._disp_list_cache:
-            self.disp_list, self.width, self.height = self._disp_list_cache[self.filename, self.bezier_points]
+        key = (self.filename, self.bezier_points)
+        svg_list = Cache.get('svg', key)
+        if svg_list is not None:
+            self.width, self.height = svg_list.width, svg_list.height
         else:
             if self.rawdata != None:
-                f = StringIO(self.rawdata)
+                data = self.rawdata
             else:
-                if open(self.filename, 'rb').read(3) == '\x1f\x8b\x08': #gzip magic numbers
+                data = open(self.filename, 'rb').read()
+
+            # the tessellation is long, try to reuse the one of a previous run
+            diskkey = DiskCache.hash(data, self.bezier_points, self.circle_points)
+            tessellation = DiskCache.load('svg', diskkey)
+            if tessellation is None:
+                if data[:3] == '\x1f\x8b\x08': #gzip magic numbers
                     import gzip
-                    f = gzip.open(self.filename, 'rb')
+                    f = gzip.GzipFile(fileobj=StringIO(data))
                 else:
-                    f = open(self.filename, 'rb')
-            self.tree = parse(f)
-            self.parse_doc()
-            self.disp_list = glGenLists(1)
-            glNewList(self.disp_list, GL_COMPILE)
-            self.render_slowly()
-            glEndList()
-            self._disp_list_cache[self.filename, self.bezier_points] = (self.disp_list, self.width, self.height)
+                    f = StringIO(data)
+                self.tree = parse(f)
+                self.parse_doc()
+                tessellation = self.tessellate()
+                DiskCache.save('svg', diskkey, tessellation)
+
+            svg_list = self.compile_tessellation(tessellation)
+            Cache.append('svg', key, svg_list, size=svg_list.size)
+        # keep a reference: the list is alive as long as we are using it
+        self.svg_list = svg_list
+        self.disp_list = svg_list.dl
 
     def draw(self, x, y, z=0, angle=0, scale=1):
         """Draws the SVG to screen.
@@ -511,29 +552,26 @@ class SVG(object):
         glCallList(self.disp_list)
         glPopMatrix()
 
-    def render_slowly(self):
-        self.n_tris = 0
-        self.n_lines = 0
+    def tessellate(self):
+        """Return the parsed document as a binary string, to be used with
+        compile_tessellation()."""
+        commands = []
+        vertices = []
+        pack = _svg_vertex.pack
         for path, stroke, tris, fill, transform in self.paths:
             if tris:
-                self.n_tris += len(tris)/3
                 if isinstance(fill, str):
                     g = self.gradients[fill]
                     fills = [g.interp(x) for x in tris]
                 else:
                     fills = [fill for x in tris]
-                #pyglet.graphics.draw(len(tris), GL_TRIANGLES,
-                #                     ('v3f', sum((x + [0] for x in tris), [])),
-                #                     ('c3B', sum(fills, [])))
-                glBegin(GL_TRIANGLES)
+                commands.append((GL_TRIANGLES, len(vertices), len(tris)))
                 for vtx, clr in zip(tris, fills):
                     vtx = transform(vtx)
-                    glColor4ub(*clr)
-                    glVertex3f(vtx[0], vtx[1], 0)
-                glEnd()
+                    vertices.append(pack(clr[0], clr[1], clr[2], clr[3],
+                                         vtx[0], vtx[1], 0))
             if path:
                 for loop in path:
-                    self.n_lines += len(loop) - 1
                     loop_plus = []
                     for i in xrange(len(loop) - 1):
                         loop_plus += [loop[i], loop[i+1]]
@@ -542,15 +580,47 @@ class SVG(object):
                         strokes = [g.interp(x) for x in loop_plus]
                     else:
                         strokes = [stroke for x in loop_plus]
-                    #pyglet.graphics.draw(len(loop_plus), GL_LINES,
-                    #                     ('v3f', sum((x + [0] for x in loop_plus), [])),
-                    #                     ('c3B', sum((stroke for x in loop_plus), [])))
-                    glBegin(GL_LINES)
+                    commands.append((GL_LINES, len(vertices), len(loop_plus)))
                     for vtx, clr in zip(loop_plus, strokes):
                         vtx = transform(vtx)
-                        glColor4ub(*clr)
-                        glVertex3f(vtx[0], vtx[1], 0)
-                    glEnd()
+                        vertices.append(pack(clr[0], clr[1], clr[2], clr[3],
+                                             vtx[0], vtx[1], 0))
+        return ''.join([_svg_header.pack(self.width, self.height,
+                                         len(commands), len(vertices))] +
+                       [_svg_command.pack(*c) for c in commands] + vertices)
+
+    def compile_tessellation(self, tessellation):
+        """Create the display list from a tessellation (string or memory
+        map), and return it."""
+        offset = _svg_header.size
+        self.width, self.height, n_commands, n_vertices = \
+            _svg_header.unpack(tessellation[:offset])
+        commands = []
+        for i in xrange(n_commands):
+            commands.append(_svg_command.unpack(
+                tessellation[offset:offset + _svg_command.size]))
+            offset += _svg_command.size
+        vertices = tessellation[offset:offset + n_vertices * _svg_vertex.size]
+
+        self.n_tris = self.n_lines = 0
+        for mode, first, count in commands:
+            if mode == GL_TRIANGLES:
+                self.n_tris += count / 3
+            else:
+                self.n_lines += count / 2
+
+        svg_list = _SVGDisplayList(self.width, self.height, len(vertices))
+        glNewList(svg_list.dl, GL_COMPILE)
+        if n_vertices:
+            # vertex arrays are read when the list is compiled
+            glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+            glInterleavedArrays(GL_C4UB_V3F, 0, vertices)
+            for mode, first, count in commands:
+                glDrawArrays(mode, first, count)
+            glPopClientAttrib()
+        glEndList()
+        return svg_list
+
     def parse_float(self, txt):
         if txt.endswith('px'):
             return float(txt[:-2])
@@ -0,0 +1,104 @@
+'''
+Null GL: OpenGL functions doing nothing, for the headless mode
+
+When the null window is used without an OSMesa context, the OpenGL
+functions are replaced by functions doing nothing, before the graphics
+modules are imported. The widgets are drawn as usual (on_draw is
+dispatched, and all the drawing code is run), but nothing is sent to
+OpenGL. The constants and the types are kept from PyOpenGL.
+
+The functions returning a value return a neutral one: the new names
+(textures, display lists, framebuffers...) are increasing numbers, the
+matrices are the identity, the framebuffers are complete, and no extension
+is available.
+'''
+
+__all__ = ('install_null_gl', 'null_gl_installed')
+
+import sys
+from types import ModuleType
+from logger import pymt_logger
+
+#: Modules replaced by their null version
+null_gl_modules = ('OpenGL.GL', 'OpenGL.GLU', 'OpenGL.extensions',
+                   'OpenGL.GL.ARB.texture_rectangle',
+                   'OpenGL.GL.NV.texture_rectangle',
+                   'OpenGL.GL.EXT.framebuffer_object')
+
+_state = {'installed': False, 'name': 0}
+
+def _null(*largs, **kwargs):
+    return None
+
+def _new_name(*largs, **kwargs):
+    _state['name'] += 1
+    return _state['name']
+
+def _zero(*largs, **kwargs):
+    return 0
+
+def _empty(*largs, **kwargs):
+    return ''
+
+def _identity(*largs, **kwargs):
+    return [[1., 0., 0., 0.], [0., 1., 0., 0.],
+            [0., 0., 1., 0.], [0., 0., 0., 1.]]
+
+def _null_functions(module):
+    # functions returning a value
+    complete = getattr(module, 'GL_FRAMEBUFFER_COMPLETE_EXT', 0)
+    return {
+        'glGenTextures': _new_name,
+        'glGenLists': _new_name,
+        'glGenFramebuffersEXT': _new_name,
+        'glGenRenderbuffersEXT': _new_name,
+        'glCreateProgram': _new_name,
+        'glCreateShader': _new_name,
+        'gluNewTess': _new_name,
+        'glGetUniformLocation': _zero,
+        'glGetError': _zero,
+        'glIsEnabled': _zero,
+        'glGetIntegerv': _zero,
+        'glGetFloatv': _identity,
+        'glGetDoublev': _identity,
+        'glGetString': _empty,
+        'gluErrorString': _empty,
+        'glCheckFramebufferStatusEXT': lambda *largs: complete,
+        'hasGLExtension': _zero,
+    }
+
+def _null_module(module):
+    null = ModuleType(module.__name__, module.__doc__)
+    null.__dict__.update(module.__dict__)
+    functions = _null_functions(module)
+    for name, value in module.__dict__.iteritems():
+        if name in functions:
+            setattr(null, name, functions[name])
+        elif name.startswith('gl') and callable(value):
+            setattr(null, name, _null)
+    return null
+
+def null_gl_installed():
+    '''Return True if the OpenGL functions are replaced'''
+    return _state['installed']
+
+def install_null_gl():
+    '''Replace the OpenGL functions by functions doing nothing. Must be
+    called before the import of the graphics modules. Return True if
+    the functions are replaced.'''
+    if _state['installed']:
+        return True
+    try:
+        for name in null_gl_modules:
+            __import__(name)
+    except ImportError, e:
+        pymt_logger.warning('NullGL: unable to import %s' % e)
+        return False
+    for name in null_gl_modules:
+        null = _null_module(sys.modules[name])
+        sys.modules[name] = null
+        parent, child = name.rsplit('.', 1)
+        setattr(sys.modules[parent], child, null)
+    _state['installed'] = True
+    pymt_logger.info('NullGL: OpenGL calls are ignored')
+    return True
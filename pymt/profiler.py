@@ -0,0 +1,212 @@
+'''
+Profiler: measure the time spent in each widget
+
+The profiler record the wall time of the on_update, on_draw and touch events
+of each widget, and the total time of each frame. It's deactivated by
+default, and cost nothing in this case: the dispatch and idle functions are
+replaced only while the profiler is active.
+
+Activate it with the -e command line option (or show_eventstats in the
+configuration), a summary is printed when the application leave. To get a
+trace readable by Chrome (chrome://tracing) ::
+
+    python myapp.py --profile-trace=trace.json
+
+Times are inclusive: the on_draw time of a widget contains the on_draw time
+of its children. The summary show also the self time of each widget.
+'''
+
+from __future__ import with_statement
+
+__all__ = ('Profiler', 'getProfiler')
+
+import os
+try:
+    import json
+except ImportError:
+    import simplejson as json
+from logger import pymt_logger
+from clock import getClock
+
+class Profiler(object):
+    '''Record the time spent in widgets events and frames.
+
+    :Parameters:
+        `events` : list, default to update/draw/touch events
+            Events to profile
+        `max_trace_events` : int, default to 1000000
+            Maximum number of events kept for the trace. When reached, the
+            trace is not recorded anymore, but stats are still computed.
+    '''
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('events', ('on_update', 'on_draw', 'on_touch_down',
+                                     'on_touch_move', 'on_touch_up'))
+        kwargs.setdefault('max_trace_events', 1000000)
+        self.events = set(kwargs.get('events'))
+        self.max_trace_events = kwargs.get('max_trace_events')
+        self.enabled = False
+        self.trace = False
+        self._patched = []
+        self.reset()
+
+    def reset(self):
+        '''Clear all the recorded stats'''
+        # (widget name, event type) -> [count, total, self, max]
+        self.stats = {}
+        # frames count, total, max
+        self.frames = [0, 0., 0.]
+        self.trace_events = []
+        self._stack = []
+        self._frame_start = None
+        self._time_start = getClock().get_current_time()
+
+    def activate(self, trace=False):
+        '''Start to profile. If `trace` is True, every event is kept for
+        export_trace()'''
+        self.trace = trace
+        if self.enabled:
+            return
+        self.enabled = True
+
+        # imported here to prevent circular imports
+        from base import TouchEventLoop
+        from ui.widgets.widget import MTWidget
+
+        self._patch(MTWidget, 'dispatch_event', self._wrap_dispatch)
+        self._patch(TouchEventLoop, 'idle', self._wrap_idle)
+        self._patch(TouchEventLoop, 'sleep', self._wrap_sleep)
+
+    def deactivate(self):
+        '''Stop to profile, recorded stats are kept'''
+        if not self.enabled:
+            return
+        self.enabled = False
+        for cls, name, func in reversed(self._patched):
+            if func is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, func)
+        self._patched = []
+
+    def _patch(self, cls, name, wrapper):
+        self._patched.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, wrapper(getattr(cls, name)))
+
+    def _wrap_dispatch(self, func):
+        events = self.events
+        stack = self._stack
+        now = getClock().get_current_time
+        record = self._record
+        def dispatch_event(widget, event_type, *args):
+            if event_type not in events:
+                return func(widget, event_type, *args)
+            stack.append(0.)
+            start = now()
+            try:
+                return func(widget, event_type, *args)
+            finally:
+                duration = now() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += duration
+                record(widget, event_type, start, duration, duration - children)
+        return dispatch_event
+
+    def _wrap_idle(self, func):
+        def idle(evloop):
+            self._frame_start = getClock().get_current_time()
+            try:
+                return func(evloop)
+            finally:
+                self._frame_end()
+        return idle
+
+    def _wrap_sleep(self, func):
+        def sleep(evloop):
+            # don't count the sleep in the frame time
+            self._frame_end()
+            return func(evloop)
+        return sleep
+
+    def _frame_end(self):
+        start = self._frame_start
+        if start is None:
+            return
+        self._frame_start = None
+        duration = getClock().get_current_time() - start
+        frames = self.frames
+        frames[0] += 1
+        frames[1] += duration
+        if duration > frames[2]:
+            frames[2] = duration
+        if self.trace:
+            self._add_trace('frame', 'frame', start, duration)
+
+    def _record(self, widget, event_type, start, duration, selftime):
+        if widget.id:
+            name = '%s(%s)' % (widget.__class__.__name__, widget.id)
+        else:
+            name = '%s#%x' % (widget.__class__.__name__, id(widget))
+        key = (name, event_type)
+        stat = self.stats.get(key)
+        if stat is None:
+            self.stats[key] = [1, duration, selftime, duration]
+        else:
+            stat[0] += 1
+            stat[1] += duration
+            stat[2] += selftime
+            if duration > stat[3]:
+                stat[3] = duration
+        if self.trace:
+            self._add_trace(name, event_type, start, duration)
+
+    def _add_trace(self, name, category, start, duration):
+        if len(self.trace_events) >= self.max_trace_events:
+            if self.trace:
+                pymt_logger.warning('Profiler: trace is full, stop recording')
+                self.trace = False
+            return
+        self.trace_events.append({
+            'name': name, 'cat': category, 'ph': 'X', 'pid': 0, 'tid': 0,
+            'ts': (start - self._time_start) * 1000000.,
+            'dur': duration * 1000000.})
+
+    def export_trace(self, filename):
+        '''Write the recorded events in a Chrome trace file (JSON)'''
+        filename = os.path.expanduser(filename)
+        with open(filename, 'w') as fd:
+            json.dump({'traceEvents': self.trace_events,
+                       'displayTimeUnit': 'ms'}, fd)
+        pymt_logger.info('Profiler: trace saved in %s (%d events)' % (
+                         filename, len(self.trace_events)))
+
+    def get_summary(self, count=20):
+        '''Return the `count` slowest (widget, event) as a list of
+        (name, event type, calls, total, self, max), sorted by self time'''
+        stats = [(key[0], key[1]) + tuple(value)
+                 for key, value in self.stats.iteritems()]
+        stats.sort(key=lambda x: x[4], reverse=True)
+        return stats[:count]
+
+    def print_summary(self, count=20):
+        '''Print the frames stats, and the `count` slowest widgets'''
+        frames, total, fmax = self.frames
+        pymt_logger.info('Profiler: %d frames, %.2fms average, %.2fms max' % (
+                         frames, total * 1000. / max(1, frames), fmax * 1000.))
+        pymt_logger.info('Profiler: %8s %10s %10s %10s  %s' % (
+                         'calls', 'total(ms)', 'self(ms)', 'max(ms)', 'widget'))
+        for name, event_type, calls, total, selftime, dmax in \
+            self.get_summary(count):
+            pymt_logger.info('Profiler: %8d %10.2f %10.2f %10.2f  %s.%s' % (
+                             calls, total * 1000., selftime * 1000.,
+                             dmax * 1000., name, event_type))
+
+
+# create a default profiler
+_default_profiler = Profiler()
+
+def getProfiler():
+    '''Return the default profiler'''
+    global _default_profiler
+    return _default_profiler
@@ -3,6 +3,7 @@ UI package: base for all ui things
 '''
 from factory import *
 from animation import *
+from spatialindex import *
 from window import *
 from widgets import *
 from colors import *
@@ -127,6 +127,9 @@ class AnimationBase(object):
             vstart, vend =  self._prop_list[prop]
             value = self._calculate_attribute_value(vstart, vend, t)
             self._set_value_from(value, prop)
+        # properties can be set without setters (style...)
+        if hasattr(self.widget, 'invalidate'):
+            self.widget.invalidate()
 
     def _calculate_attribute_value(self, vstart, vend, t):
         value = None
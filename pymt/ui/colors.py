@@ -5,6 +5,10 @@ Currently, the default css is included in this file.
 You can easily extend the default style by create a css file
 in your ~/.pymt/user.css.
 
+Style sheets are compiled to a list of rules (selectors, properties), and
+the compiled rules are kept in the disk cache: cssutils is used only when a
+sheet change.
+
 Exemple of user.css ::
 
     * {
@@ -23,9 +27,11 @@ please look on the widget documentation.
 
 from __future__ import with_statement
 __all__ = ['default_css', 'css_get_style', 'get_truncated_classname',
-           'pymt_sheet', 'css_add_sheet', 'css_get_widget_id']
+           'pymt_sheet', 'css_add_sheet', 'css_get_widget_id', 'css_compile',
+           'css_invalidate', 'WidgetStyle']
 
 from ..logger import pymt_logger
+from ..diskcache import DiskCache
 from parser import *
 import pymt
 import os
@@ -33,7 +39,7 @@ import sys
 import shutil
 import logging
 import re
-import cssutils
+import marshal
 
 # Auto conversion from css to a special type.
 auto_convert = {
@@ -117,7 +123,7 @@ def get_widget_parents(widget):
                 break
             parent = parent[0].__bases__
         widgets_parents[widget.__class__] = widget_classes
-    return widgets_parents[widget.__class__]
+    return list(widgets_parents[widget.__class__])
 
 def css_get_widget_id(widget):
     if not hasattr(widget, 'cls'):
@@ -128,7 +134,33 @@ def css_get_widget_id(widget):
         idwidget = str(widget.__class__) + ':' + '.'.join(widget.cls)
     return idwidget
 
+# Compiled rules, indexed by element name (None for rules without element),
+# then by the first css class of the selector (None for rules without class).
+# Each entry is a tuple (rule order, score, css classes, properties).
+css_index = {}
+css_rules_count = 0
+
+def css_index_rules(rules):
+    '''Add compiled rules to the index, return the set of elements used by
+    the rules'''
+    global css_index, css_rules_count
+    elements = set()
+    for selectors, properties in rules:
+        order = css_rules_count
+        css_rules_count += 1
+        for element, cssclass, specificity in selectors:
+            a, b, c, d = specificity
+            score = b * 100 + c * 10 + d
+            entry = (order, score, tuple(cssclass), properties)
+            key = None
+            if cssclass:
+                key = cssclass[0]
+            css_index.setdefault(element, {}).setdefault(key, []).append(entry)
+            elements.add(element)
+    return elements
+
 css_cache = {}
+css_cache_classes = {}
 def css_get_style(widget, sheet=None):
     '''Return a dict() with all the style for the widget.
 
@@ -139,87 +171,257 @@ def css_get_style(widget, sheet=None):
             Custom style sheet to use (instead of pymt_sheet)
     '''
 
-    global pymt_sheet
     global css_cache
 
     idwidget = css_get_widget_id(widget)
     if idwidget in css_cache:
         return css_cache[idwidget]
 
-    if not sheet:
-        sheet = pymt_sheet
-
     widget_classes = get_widget_parents(widget)
-    widget_classes.append('*')
-
-    styles = dict()
-    rules = []
-
-    # first, select rules that match the widget
-    for w in pymt_sheet.cssRules:
-        rule_selected = False
-        rule_score = 0
-        # get the appropriate selector
-        for s in w.selectorList:
-            rule_stop_processing = False
-            if s.element is not None:
-                if s.element[1] not in reversed(widget_classes):
+    if type(widget.cls) == str:
+        classes = (None, widget.cls)
+    else:
+        classes = [None] + list(widget.cls)
+    classes_set = set(classes)
+
+    # first, select rules that match the widget, from the index. A selector
+    # match if the widget have all of its classes. Each rule keep the better
+    # score of its selectors, and the nearest element.
+    matches = {}
+    elements = widget_classes + ['*', None]
+    for distance, element in enumerate(elements):
+        index = css_index.get(element)
+        if index is None:
+            continue
+        for cssclass in classes:
+            for order, score, required, properties in index.get(cssclass, ()):
+                if len(required) > 1 and not classes_set.issuperset(required):
                     continue
-            if s.specificity[2] == 1:
-                cssclass = s.selectorText.split('.')[1:]
-                if type(widget.cls) == str:
-                    if widget.cls not in cssclass:
-                        rule_stop_processing = True
-                        continue
-                else:
-                    rule_stop_processing = True
-                    for c in widget.cls:
-                        if c in cssclass:
-                            rule_stop_processing = False
-            if rule_stop_processing:
-                continue
-            # selector match !
-            rule_selected = True
-            # get the better score
-            a, b, c, d = s.specificity
-            score = b * 100 + c * 10 + d
-            if score > rule_score:
-                rule_score = score
-        # rule ok :)
-        if rule_selected:
-            rules.append([rule_score, w])
+                key = (score, -distance)
+                match = matches.get(order)
+                if match is None or key > match[0]:
+                    matches[order] = (key, properties)
 
-    # sort by score / parent
-    #TODO
+    # sort by score / parent / order in sheet: the last one wins
+    rules = [(key, order, properties)
+             for order, (key, properties) in matches.iteritems()]
+    rules.sort()
 
     # compiles rules
-    for score, rule in rules:
-        for prop in rule.style.getProperties():
-            value = prop.value
-            if prop.name in auto_convert:
+    styles = dict()
+    for key, order, properties in rules:
+        for name, value in properties:
+            if name in auto_convert:
                 try:
-                    value = auto_convert[prop.name](prop.value)
+                    value = auto_convert[name](value)
                 except:
                     pymt_logger.exception(
-                        'Error while convert %s: %s' % (prop.name, prop.value))
+                        'Error while convert %s: %s' % (name, value))
                     pass
-            styles[prop.name] = value
+            styles[name] = value
 
     css_cache[idwidget] = styles
+    css_cache_classes[idwidget] = widget_classes
     return styles
 
+def css_invalidate(elements=None):
+    '''Remove from the style cache the widgets using one of the elements,
+    or all the widgets if `elements` is None'''
+    global css_cache
+    if elements is None or '*' in elements or None in elements:
+        css_cache.clear()
+        css_cache_classes.clear()
+        return
+    for idwidget, widget_classes in css_cache_classes.items():
+        for element in widget_classes:
+            if element in elements:
+                del css_cache[idwidget]
+                del css_cache_classes[idwidget]
+                break
+
+
+class WidgetStyle(object):
+    '''Style of a widget, used like a dict.
+
+    All the widgets of the same class and cls share the style returned by
+    css_get_style(), which is never modified. A widget store only the values
+    changed by inline style or at runtime ::
+
+        style = WidgetStyle(css_get_style(widget=self))
+        style['bg-color'] = (1, 0, 0, 1) # only this value is stored
+
+    :Parameters:
+        `shared` : dict
+            Shared style, read-only
+        `own` : dict
+            Values specific to the widget
+    '''
+
+    __slots__ = ('shared', 'own')
+
+    _empty = {}
+
+    def __init__(self, shared=None, own=None):
+        if shared is None:
+            shared = WidgetStyle._empty
+        self.shared = shared
+        self.own = own
+
+    def __getitem__(self, key):
+        own = self.own
+        if own is not None and key in own:
+            return own[key]
+        return self.shared[key]
+
+    def get(self, key, default=None):
+        own = self.own
+        if own is not None and key in own:
+            return own[key]
+        return self.shared.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.shared or (self.own is not None and key in self.own)
+
+    has_key = __contains__
+
+    def __setitem__(self, key, value):
+        if self.own is None:
+            self.own = {}
+        self.own[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        # fork the shared style, to remove the key from it
+        if key in self.shared:
+            self.own = self.copy()
+            self.shared = WidgetStyle._empty
+        del self.own[key]
+
+    def keys(self):
+        return self.copy().keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    iterkeys = __iter__
+
+    def items(self):
+        return self.copy().items()
+
+    def iteritems(self):
+        return self.copy().iteritems()
+
+    def values(self):
+        return self.copy().values()
+
+    def itervalues(self):
+        return self.copy().itervalues()
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def __len__(self):
+        return len(self.keys())
+
+    def update(self, other=None, **kwargs):
+        # applying the shared style again (like apply_css() in widget
+        # __init__) doesn't change anything
+        if other is self.shared and not kwargs:
+            return
+        if other is not None:
+            for key in other.keys():
+                self[key] = other[key]
+        for key in kwargs:
+            self[key] = kwargs[key]
+
+    def setdefault(self, key, value=None):
+        if key in self:
+            return self[key]
+        self[key] = value
+        return value
+
+    def clear(self):
+        self.shared = WidgetStyle._empty
+        self.own = None
+
+    def copy(self):
+        '''Return the style as a new dict'''
+        if self.own is None:
+            return self.shared.copy()
+        style = self.shared.copy()
+        style.update(self.own)
+        return style
+
+    def is_shared(self):
+        '''Return True if the widget doesn't have its own values'''
+        return not self.own
+
+    def __repr__(self):
+        if self.own is None:
+            return repr(self.shared)
+        return repr(self.copy())
+
+    def __eq__(self, other):
+        return self.copy() == dict(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def _parse_sheet(text):
+    # cssutils is slow to import, load it only if needed
+    import cssutils
+    parser = cssutils.CSSParser(loglevel=logging.ERROR)
+    rules = []
+    for rule in parser.parseString(text).cssRules:
+        # ignore comments, @import...
+        if not hasattr(rule, 'selectorList'):
+            continue
+        selectors = []
+        for s in rule.selectorList:
+            element = None
+            if s.element is not None:
+                element = s.element[1]
+            cssclass = tuple(s.selectorText.split('.')[1:])
+            selectors.append((element, cssclass, tuple(s.specificity)))
+        properties = [(prop.name, prop.value)
+                      for prop in rule.style.getProperties()]
+        rules.append((selectors, properties))
+    return rules
+
+def css_compile(text):
+    '''Compile a css text to a list of rules (selectors, properties).
+    Selectors are (element, classes, specificity) tuples, and properties
+    (name, value) tuples. The result is kept in the disk cache.'''
+    key = DiskCache.hash(text)
+    data = DiskCache.load('css', key)
+    if data is not None:
+        try:
+            return marshal.loads(data[:])
+        except (EOFError, ValueError, TypeError):
+            pymt_logger.warning('CSS: invalid compiled sheet in cache')
+    rules = _parse_sheet(text)
+    DiskCache.save('css', key, marshal.dumps(rules))
+    return rules
 
 # Add default CSS
-parser = cssutils.CSSParser(loglevel=logging.ERROR)
-pymt_sheet = parser.parseString(default_css)
+pymt_sheet = css_compile(default_css)
 
 # Add user css if exist
 pymt_home_dir = os.path.expanduser('~/.pymt/')
 css_filename = os.path.join(pymt_home_dir, 'user.css')
 if os.path.exists(css_filename):
-    user_sheet = parser.parseFile(css_filename)
-    for rule in user_sheet.cssRules:
-        pymt_sheet.add(rule)
+    with open(css_filename) as fd:
+        pymt_sheet.extend(css_compile(fd.read()))
+
+css_index_rules(pymt_sheet)
 
 def css_add_sheet(text):
     '''Add a css text to use ::
@@ -229,7 +431,9 @@ def css_add_sheet(text):
 
     '''
     global pymt_sheet
-    pymt_sheet.cssText += text
+    rules = css_compile(text)
+    pymt_sheet.extend(rules)
+    css_invalidate(css_index_rules(rules))
 
 if __name__ == '__main__':
     from pymt import *
@@ -0,0 +1,140 @@
+'''
+Spatial index: find quickly the children under a point
+
+The index is an uniform grid: each cell contains the children whose
+bounding box intersect the cell. It's used by widgets and window created
+with `spatial_index=True`, to offer a touch only to the children that can
+collide with it, instead of every children.
+
+Children are giving their bounding box in the parent coordinate space with
+get_parent_bbox(). A child can return None if it can collide everywhere: it
+will be always a candidate.
+'''
+
+__all__ = ['SpatialGrid']
+
+from math import floor
+
+class SpatialGrid(object):
+    '''Uniform grid of objects bounding box.
+
+    :Parameters:
+        `cell_size` : int, default to 128
+            Size of a grid cell
+        `max_cells` : int, default to 256
+            Maximum number of cells used by one object. Bigger objects are
+            considered as unbounded.
+    '''
+    def __init__(self, cell_size=128, max_cells=256):
+        self.cell_size = float(cell_size)
+        self.max_cells = max_cells
+        self._cells = {}
+        self._objects = {}
+        self._unbounded = set()
+        # position of the objects in the children list
+        self._order = {}
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, obj):
+        return obj in self._objects
+
+    def _get_cells(self, bbox):
+        x1, y1, x2, y2 = bbox
+        s = self.cell_size
+        i1, i2 = int(floor(x1 / s)), int(floor(x2 / s))
+        j1, j2 = int(floor(y1 / s)), int(floor(y2 / s))
+        if (i2 - i1 + 1) * (j2 - j1 + 1) > self.max_cells:
+            return None
+        return [(i, j) for i in xrange(i1, i2 + 1) for j in xrange(j1, j2 + 1)]
+
+    def update(self, obj, bbox):
+        '''Insert or move an object in the grid. `bbox` is a (x1, y1, x2, y2)
+        tuple, or None if the object is unbounded.'''
+        cells = None
+        if bbox is not None:
+            cells = self._get_cells(bbox)
+        if obj in self._objects:
+            if self._objects[obj] == cells:
+                return
+            self.remove(obj)
+        self._objects[obj] = cells
+        if cells is None:
+            self._unbounded.add(obj)
+            return
+        grid = self._cells
+        for cell in cells:
+            content = grid.get(cell)
+            if content is None:
+                grid[cell] = set([obj])
+            else:
+                content.add(obj)
+
+    def remove(self, obj):
+        '''Remove an object from the grid'''
+        cells = self._objects.pop(obj, None)
+        if cells is None:
+            self._unbounded.discard(obj)
+            return
+        grid = self._cells
+        for cell in cells:
+            content = grid[cell]
+            content.discard(obj)
+            if not content:
+                del grid[cell]
+
+    def clear(self):
+        '''Remove all objects from the grid'''
+        self._cells = {}
+        self._objects = {}
+        self._unbounded = set()
+        self._order = {}
+
+    def rebuild(self, children):
+        '''Rebuild the grid from a list of widgets'''
+        self.clear()
+        for child in children:
+            bbox = None
+            if hasattr(child, 'get_parent_bbox'):
+                bbox = child.get_parent_bbox()
+            self.update(child, bbox)
+
+    def query_point(self, x, y):
+        '''Return a set of objects that can collide the point'''
+        s = self.cell_size
+        content = self._cells.get((int(floor(x / s)), int(floor(y / s))))
+        if content is None:
+            return set(self._unbounded)
+        return content | self._unbounded
+
+    def get_children_at(self, children, x, y):
+        '''Return the children that can collide with the point, sorted from
+        the front to the back (reverse order of `children`).'''
+        # children list have been changed without add_widget/remove_widget
+        if len(self._objects) != len(children):
+            self.rebuild(children)
+        candidates = self.query_point(x, y)
+        if not candidates:
+            return []
+        if len(candidates) == 1:
+            return list(candidates)
+        order = self._get_order(children, candidates)
+        return sorted(candidates, key=order.get, reverse=True)
+
+    def _get_order(self, children, candidates):
+        # return the position of the children, checked for the candidates
+        # only: the children can be reordered without the grid (like with
+        # bring_to_front()), the positions are computed again in this case.
+        order = self._order
+        try:
+            for obj in candidates:
+                if children[order[obj]] is not obj:
+                    break
+            else:
+                return order
+        except (KeyError, IndexError):
+            pass
+        order = self._order = dict([(child, index) for index, child in
+                                    enumerate(children)])
+        return order
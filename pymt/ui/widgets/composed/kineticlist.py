@@ -7,7 +7,7 @@ __all__ = ['MTKineticList', 'MTKineticObject', 'MTKineticItem', 'MTKineticImage'
 import pymt
 from OpenGL.GL import *
 from ....graphx import set_color, drawRectangle
-from ....graphx import drawCSSRectangle
+from ....graphx import drawCSSRectangle, viewportGet
 from ...factory import MTWidgetFactory
 from ....vector import Vector
 from ....base import getFrameDt
@@ -54,6 +54,9 @@ class MTKineticList(MTStencilContainer):
         `trigger_distance` : int, default to 3
             Maximum trigger distance to dispatch event on children
             (this mean if you move too much, trigger will not happen.)
+        `velocity_duration` : float, default to 0.05
+            Duration (in seconds) of the end of the touch history used to
+            compute the velocity of the list when the touch is released.
 
     :Styles:
         `bg-color` : color
@@ -81,6 +84,7 @@ class MTKineticList(MTStencilContainer):
         kwargs.setdefault('deletable', True)
         kwargs.setdefault('searchable', True)
         kwargs.setdefault('trigger_distance', 3)
+        kwargs.setdefault('velocity_duration', .05)
 
         super(MTKineticList, self).__init__(**kwargs)
 
@@ -97,6 +101,7 @@ class MTKineticList(MTStencilContainer):
         self.w_limit    = kwargs.get('w_limit')
         self.h_limit    = kwargs.get('h_limit')
         self.trigger_distance = kwargs.get('trigger_distance')
+        self.velocity_duration = kwargs.get('velocity_duration')
 
         if self.w_limit and self.h_limit:
             raise Exception('You cannot limit both axes')
@@ -106,7 +111,8 @@ class MTKineticList(MTStencilContainer):
         # How far to offset the axes(used for scrolling/panning)
         self.xoffset = 0
         self.yoffset = 0
-        # X and Y translation vectors for the kinetic movement
+        # X and Y translation vectors for the kinetic movement, in pixels
+        # per second
         self.vx = 0
         self.vy = 0
         # List of all children, whatever will be the search
@@ -406,8 +412,7 @@ class MTKineticList(MTStencilContainer):
             return
 
         t = self.touch[touch.id]
-        self.vx = t['xmot']
-        self.vy = t['ymot']
+        self.vx, self.vy = self.get_touch_velocity(touch)
 
         # check if we can transmit event to children
         if (self.do_x and t['travelx'] > self.trigger_distance) or \
@@ -421,6 +426,19 @@ class MTKineticList(MTStencilContainer):
             child.dispatch_event('on_touch_up', touch)
         return True
 
+    def get_touch_velocity(self, touch):
+        '''Return the velocity of the touch at its end, in pixels per second
+        and in the coordinates of the touch (the parent coordinates)'''
+        win = self.get_parent_window()
+        if win is None:
+            return 0, 0
+        vx, vy = touch.history.velocity(self.velocity_duration)
+        w, h = win.size
+        to_widget = self.parent.to_widget
+        x0, y0 = to_widget(0, 0)
+        x1, y1 = to_widget(vx * w, vy * h)
+        return x1 - x0, y1 - y0
+
     def ensure_bounding(self):
         size = float(self._last_content_size)
         if size <= 0:
@@ -450,8 +468,8 @@ class MTKineticList(MTStencilContainer):
         self.vx /= 1 + (self.friction * dt)
         self.vy /= 1 + (self.friction * dt)
 
-        self.xoffset += self.vx * self.do_x
-        self.yoffset += self.vy * self.do_y
+        self.xoffset += self.vx * dt * self.do_x
+        self.yoffset += self.vy * dt * self.do_y
 
         self.ensure_bounding()
 
@@ -462,6 +480,7 @@ class MTKineticList(MTStencilContainer):
 
         # draw children
         self.stencil_push()
+        viewport = viewportGet()
         for w in self.children:
             # internal update of children
             w.update()
@@ -470,6 +489,9 @@ class MTKineticList(MTStencilContainer):
                 continue
             if self.do_x and (w.x + w.width < self.x or w.x > self.x + self.width):
                 continue
+            # the list can be partially outside the window
+            if w.is_culled(viewport):
+                continue
             w.on_draw()
         self.stencil_pop()
 
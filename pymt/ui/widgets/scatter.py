@@ -7,9 +7,10 @@ __all__ = ['MTScatterWidget', 'MTScatterSvg', 'MTScatterPlane', 'MTScatterImage'
 
 import pymt
 from OpenGL.GL import *
-from ...graphx import drawRectangle, gx_matrix, gx_matrix_identity, set_color, \
+from ...graphx import drawRectangle, gx_matrix, set_color, \
     drawTexturedRectangle, gx_blending
-from ...vector import Vector, matrix_mult, matrix_inv_mult
+from ...vector import Vector
+from ...affine import AffineTransform
 from ...utils import SafeList
 from ..animation import Animation, AnimationAlpha
 from ..factory import MTWidgetFactory
@@ -81,13 +82,6 @@ class MTScatterWidget(MTWidget):
                     self.do_translation_y = 1.0
             self.do_translation = True
 
-        # Cache to_local value
-        self.__to_local = (-9999, 9999) # Invalid cache for the first run
-        self.__to_local_x = 0
-        self.__to_local_y = 0
-        self.__to_parent = (-9999, 9999) # Invalid cache for the first run
-        self.__to_parent_x = 0
-        self.__to_parent_y = 0
         self.__width = 0
         self.__height = 0
 
@@ -95,7 +89,8 @@ class MTScatterWidget(MTWidget):
 
         self.touches        = {}
         self.scale          = 1
-        self.transform_mat  = (GLfloat * 16)()
+        self._transform     = AffineTransform()
+        self._transform_gl  = None
         if kwargs.get('translation')[0] != 0 or kwargs.get('translation')[1] != 0:
             self.init_transform(kwargs.get('rotation'), kwargs.get('scale'), kwargs.get('translation'))
         else:
@@ -108,6 +103,8 @@ class MTScatterWidget(MTWidget):
             w.parent = self
         except:
             pass
+        if self.spatial_index is not None:
+            self.spatial_index.update(w, w.get_parent_bbox())
 
     def init_transform(self, angle, scale, trans, point=(0, 0)):
         '''Initialize transformation matrix with new parameters.
@@ -126,13 +123,31 @@ class MTScatterWidget(MTWidget):
         if self.scale_max is not None and scale > self.scale_max:
             scale = self.scale_max
         self.scale = scale
-        with gx_matrix_identity:
-            glTranslatef(trans[0], trans[1], 0)
-            glTranslatef(point[0], point[1], 0)
-            glScalef(scale, scale, 1)
-            glRotatef(angle,0,0,1)
-            glTranslatef(-point[0], -point[1], 0)
-            self.transform_mat = glGetFloatv(GL_MODELVIEW_MATRIX)
+        self.transform = AffineTransform.translation(trans[0], trans[1]) \
+            .translate(point[0], point[1]) \
+            .scale(scale) \
+            .rotate(angle) \
+            .translate(-point[0], -point[1])
+
+    def _get_transform(self):
+        return self._transform
+    def _set_transform(self, transform):
+        self._transform = transform
+        self._transform_gl = None
+        self.invalidate_transform()
+        self.invalidate()
+        self.update_spatial_index()
+    transform = property(_get_transform, _set_transform,
+        doc='AffineTransform: transformation from local to parent coordinates')
+
+    def _get_transform_mat(self):
+        if self._transform_gl is None:
+            self._transform_gl = self._transform.to_gl()
+        return self._transform_gl
+    def _set_transform_mat(self, m):
+        self.transform = AffineTransform.from_gl(m)
+    transform_mat = property(_get_transform_mat, _set_transform_mat,
+        doc='Transformation as an OpenGL 4x4 matrix')
 
     def draw(self):
         set_color(*self.style.get('bg-color'))
@@ -145,22 +160,21 @@ class MTScatterWidget(MTWidget):
             glMultMatrixf(self.transform_mat)
             super(MTScatterWidget, self).on_draw()
 
-    def to_parent(self, x, y):
-        if self.__to_parent == (x, y):
-            return (self.__to_parent_x, self.__to_parent_y)
+    def get_parent_matrix(self):
+        return self._transform
 
-        self.__to_parent = (x, y)
-        self.new_point = matrix_mult(self.transform_mat, (x, y, 0, 1))
-        self.__to_parent_x, self.__to_parent_y = self.new_point.x, self.new_point.y
-        return (self.new_point.x, self.new_point.y)
+    def to_parent(self, x, y):
+        return self._transform.transform_point(x, y)
 
     def to_local(self, x, y):
-        if self.__to_local == (x, y):
-            return (self.__to_local_x, self.__to_local_y)
-        self.__to_local = (x, y)
-        self.new_point = matrix_inv_mult(self.transform_mat, (x, y, 0, 1))
-        self.__to_local_x, self.__to_local_y = self.new_point.x, self.new_point.y
-        return (self.new_point.x, self.new_point.y)
+        return self._transform.inverse().transform_point(x, y)
+
+    def get_parent_bbox(self):
+        points = [self.to_parent(x, y) for x, y in (
+            (0, 0), (self.width, 0), (0, self.height), (self.width, self.height))]
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return (min(xs), min(ys), max(xs), max(ys))
 
     def collide_point(self, x, y):
         local_coords = self.to_local(x, y)
@@ -197,21 +211,17 @@ class MTScatterWidget(MTWidget):
             scale = self.scale_max
             self.scale = old_scale
             scale = 1
-        with gx_matrix_identity:
-            if self.do_translation:
-                glTranslatef(trans.x * self.do_translation_x, trans.y * self.do_translation_y, 0)
-            glTranslatef(point.x, point.y, 0)
-            if self.do_scale:
-                glScalef(scale, scale, 1)
-            if self.do_rotation:
-                glRotatef(angle, 0, 0, 1)
-            glTranslatef(-point.x, -point.y,0)
-            glMultMatrixf(self.transform_mat)
-            self.transform_mat = glGetFloatv(GL_MODELVIEW_MATRIX)
-
-        #invalidate cashed values for parent transform calucaltion
-        self.__to_local = (-9999, 9999)
-        self.__to_parent = (-9999, 9999)
+        t = AffineTransform()
+        if self.do_translation:
+            t = t.translate(trans.x * self.do_translation_x,
+                            trans.y * self.do_translation_y)
+        t = t.translate(point.x, point.y)
+        if self.do_scale:
+            t = t.scale(scale)
+        if self.do_rotation:
+            t = t.rotate(angle)
+        t = t.translate(-point.x, -point.y)
+        self.transform = t.multiply(self._transform)
 
         self.dispatch_event('on_transform', angle, scale, trans, point)
 
@@ -302,8 +312,8 @@ class MTScatterWidget(MTWidget):
 
         '''
         if use_gl:
-            p1_trans = matrix_mult(self.transform_mat, (1,1,0,1))
-            p2_trans = matrix_mult(self.transform_mat, (2,1,0,1))
+            p1_trans = Vector(*self.to_parent(1, 1))
+            p2_trans = Vector(*self.to_parent(2, 1))
             dist_trans = p1_trans.distance(p2_trans)
             return dist_trans
         else:
@@ -419,6 +429,9 @@ class MTScatterPlane(MTScatterWidget):
     def draw(self):
         pass
 
+    def get_parent_bbox(self):
+        return None
+
     def collide_point(self, x, y):
         return True
 
@@ -8,7 +8,8 @@ __all__ = ['MTStencilContainer']
 
 from OpenGL.GL import *
 from widget import MTWidget
-from ...graphx import drawRectangle, stencilPush, stencilPop, stencilUse
+from ...graphx import drawRectangle, stencilPush, stencilPop, stencilUse, \
+    viewportPush, viewportPop, viewportGet
 from ..factory import MTWidgetFactory
 
 stencil_stack = 0
@@ -25,6 +26,9 @@ class MTStencilContainer(MTWidget):
         w.add_widget(s)
         runTouchApp()
     '''
+
+    clip_children = True
+
     def __init__(self, **kwargs):
         super(MTStencilContainer, self).__init__(**kwargs)
 
@@ -34,14 +38,20 @@ class MTStencilContainer(MTWidget):
         drawRectangle(pos=self.pos, size=self.size)
         # switch drawing to color buffer.
         stencilUse()
+        # children outside the container will be culled
+        viewportPush(self.get_window_bbox())
 
     def stencil_pop(self):
+        viewportPop()
         stencilPop()
 
     def on_draw(self):
         self.stencil_push()
         # draw childrens
+        viewport = viewportGet()
         for w in self.children.iterate():
+            if w.is_culled(viewport):
+                continue
             w.dispatch_event('on_draw')
         self.stencil_pop()
 
@@ -11,12 +11,16 @@ import sys
 import os
 from ...event import EventDispatcher
 from ...logger import pymt_logger
-from ...base import getCurrentTouches
+from ...profiler import getProfiler
+from ...base import getCurrentTouches, getWindow
 from ...input import Touch
 from ...utils import SafeList
+from ...affine import AffineTransform
+from ...graphx import viewportGet, viewportIntersect
 from ..animation import Animation, AnimationAlpha
 from ..factory import MTWidgetFactory
-from ..colors import css_get_style
+from ..colors import css_get_style, WidgetStyle
+from ..spatialindex import SpatialGrid
 
 import inspect
 
@@ -29,20 +33,18 @@ def getWidgetById(id):
         return _id_2_widget[id]
 getWidgetByID = getWidgetById
 
-_event_stats = {}
-_event_stats_activate = False
+_identity = AffineTransform()
 
 def event_stats_activate(activate=True):
-    '''Activate or deactivate debug info on event'''
-    global _event_stats_activate
-    _event_stats_activate = activate
+    '''Activate or deactivate the widgets profiler'''
+    if activate:
+        getProfiler().activate()
+    else:
+        getProfiler().deactivate()
 
 def event_stats_print():
-    '''Print actual event stats'''
-    pymt_logger.info('Event stats')
-    global _event_stats
-    for k in _event_stats:
-        pymt_logger.info('%6d: %s' % (_event_stats[k], k))
+    '''Print the widgets profiler summary'''
+    getProfiler().print_summary()
 
 class MTWidget(EventDispatcher):
     '''Global base for any multitouch widget.
@@ -73,6 +75,13 @@ class MTWidget(EventDispatcher):
 			Add inline CSS
 		`cls` : str, default is ''
 			CSS class of this widget
+        `cull` : bool, default is True
+            Skip the drawing of the widget when it's outside the visible
+            area (window or stencil container)
+        `spatial_index` : bool, default is False
+            Use a spatial index to find the children under a touch in
+            on_touch_down. Children must catch touches only inside their
+            bounding box (see get_parent_bbox())
 
     :Events:
         `on_update` ()
@@ -97,6 +106,10 @@ class MTWidget(EventDispatcher):
         'on_touch_move',
         'on_touch_down'
     ]
+
+    # indicate if the children are drawn only inside the widget bounding box
+    clip_children = False
+
     def __init__(self, **kwargs):
         kwargs.setdefault('pos', (0, 0))
         kwargs.setdefault('x', None)
@@ -109,6 +122,8 @@ class MTWidget(EventDispatcher):
         kwargs.setdefault('no_css', False)
         kwargs.setdefault('cls', '')
         kwargs.setdefault('style', {})
+        kwargs.setdefault('spatial_index', False)
+        kwargs.setdefault('cull', True)
 
         self._id = None
         if 'id' in kwargs:
@@ -120,6 +135,9 @@ class MTWidget(EventDispatcher):
         for ev in MTWidget.visible_events:
             self.register_event_type(ev)
 
+        self._window_matrix         = None
+        self._window_matrix_valid   = False
+        self._parent                = None
         self.parent					= None
         self.children				= SafeList()
         self._visible				= False
@@ -128,6 +146,12 @@ class MTWidget(EventDispatcher):
         self.animations				= []
         self.visible				= kwargs.get('visible')
         self.draw_children          = kwargs.get('draw_children')
+        self.cull                   = kwargs.get('cull')
+
+        # spatial index of children, for touch dispatching
+        self.spatial_index          = None
+        if kwargs.get('spatial_index'):
+            self.spatial_index      = SpatialGrid()
 
         # cache for get_parent_window()
         self._parent_window         = None
@@ -150,11 +174,13 @@ class MTWidget(EventDispatcher):
         if kwargs.get('height'):
             self.height = kwargs.get('height')
 
-        # apply css
-        self.style = {}
+        # apply css: the style is shared with all the widgets of the same
+        # class, until inline style or a runtime change is applied
+        self.style = WidgetStyle()
         self.cls = kwargs.get('cls')
         if not kwargs.get('no_css'):
             style = css_get_style(widget=self)
+            self.style.shared = style
             self.apply_css(style)
 
         # apply inline css
@@ -165,6 +191,15 @@ class MTWidget(EventDispatcher):
 
         self.init()
 
+    def _set_parent(self, parent):
+        if self._parent is parent:
+            return
+        self._parent = parent
+        self.invalidate_transform()
+    def _get_parent(self):
+        return self._parent
+    parent = property(_get_parent, _set_parent, doc='MTWidget: parent of widget')
+
     def _set_id(self, id):
         global _id_2_widget
         if self._id and self._id in _id_2_widget:
@@ -180,6 +215,7 @@ class MTWidget(EventDispatcher):
         if self._visible == visible:
             return
         self._visible = visible
+        self.invalidate()
     def _get_visible(self):
         return self._visible
     visible = property(_get_visible, _set_visible, doc='bool: visibility of widget')
@@ -188,6 +224,8 @@ class MTWidget(EventDispatcher):
         if self._x == x:
             return
         self._x = x
+        self.invalidate()
+        self.update_spatial_index()
         self.dispatch_event('on_move', self.x, self.y)
     def _get_x(self):
         return self._x
@@ -197,6 +235,8 @@ class MTWidget(EventDispatcher):
         if self._y == y:
             return
         self._y = y
+        self.invalidate()
+        self.update_spatial_index()
         self.dispatch_event('on_move', self.x, self.y)
     def _get_y(self):
         return self._y
@@ -206,6 +246,8 @@ class MTWidget(EventDispatcher):
         if self._width == w:
             return
         self._width = w
+        self.invalidate()
+        self.update_spatial_index()
         self.dispatch_event('on_resize', self._width, self._height)
     def _get_width(self):
         return self._width
@@ -215,6 +257,8 @@ class MTWidget(EventDispatcher):
         if self._height == h:
             return
         self._height = h
+        self.invalidate()
+        self.update_spatial_index()
         self.dispatch_event('on_resize', self._width, self._height)
     def _get_height(self):
         return self._height
@@ -230,6 +274,8 @@ class MTWidget(EventDispatcher):
         if self._x == pos[0] and self._y == pos[1]:
             return
         self._x, self._y = pos
+        self.invalidate()
+        self.update_spatial_index()
         self.dispatch_event('on_move', self._x, self._y)
     def _get_pos(self):
         return (self._x, self._y)
@@ -239,6 +285,8 @@ class MTWidget(EventDispatcher):
         if self._width == size[0] and self._height == size[1]:
             return
         self._width, self._height = size
+        self.invalidate()
+        self.update_spatial_index()
         self.dispatch_event('on_resize', self.width, self.height)
     def _get_size(self):
         return (self.width, self.height)
@@ -249,6 +297,62 @@ class MTWidget(EventDispatcher):
         '''Called at __init__ time to applied css attribute in current class.
         '''
         self.style.update(styles)
+        self.invalidate()
+
+    def invalidate(self):
+        '''Ask to redraw the window on the next frame. Setters of the widget
+        are calling it, you must call it yourself only if you change
+        something that affect the drawing without using them.'''
+        win = getWindow()
+        if win is not None:
+            win.need_redraw = True
+
+    def get_parent_bbox(self):
+        '''Return the bounding box of the widget in parent coordinates, as
+        (x1, y1, x2, y2). Return None if the widget can collide everywhere.
+        Used by the spatial index of the parent.'''
+        x, y = self.pos
+        return (x, y, x + self.width, y + self.height)
+
+    def get_window_bbox(self):
+        '''Return the bounding box of the widget in window coordinates, as
+        (x1, y1, x2, y2), or None if unknown.'''
+        parent = self.parent
+        if parent is None:
+            return None
+        bbox = self.get_parent_bbox()
+        if bbox is None:
+            return None
+        x1, y1, x2, y2 = bbox
+        points = [parent.to_window(x, y, initial=False) for x, y in (
+            (x1, y1), (x2, y1), (x1, y2), (x2, y2))]
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def is_culled(self, viewport):
+        '''Return True if the widget and his children can't draw anything
+        inside the viewport (x1, y1, x2, y2), in window coordinates.'''
+        if not self.cull or viewport is None:
+            return False
+        # children can draw outside of us
+        if len(self.children) and not self.clip_children:
+            return False
+        bbox = self.get_window_bbox()
+        if bbox is None:
+            return False
+        return not viewportIntersect(bbox, viewport)
+
+    def update_spatial_index(self):
+        '''Update the position of the widget in the spatial index of his
+        parent. Call it if you change the bounding box without setters.'''
+        parent = self.parent
+        if parent is None:
+            return
+        index = getattr(parent, 'spatial_index', None)
+        if index is None or self not in index:
+            return
+        index.update(self, self.get_parent_bbox())
 
     def connect(self, p1, w2, p2=None, func=lambda x: x):
         '''Connect events to a widget property'''
@@ -279,17 +383,73 @@ class MTWidget(EventDispatcher):
 
     def to_widget(self, x, y):
         '''Return the coordinate from window to local widget'''
-        x, y = self.parent.to_widget(x, y)
-        return self.to_local(x, y)
+        m = self.get_window_matrix()
+        if m is None:
+            x, y = self.parent.to_widget(x, y)
+            return self.to_local(x, y)
+        return m.inverse().transform_point(x, y)
 
     def to_window(self, x, y, initial=True):
         '''Transform local coordinate to window coordinate'''
         if not initial:
+            m = self.get_window_matrix()
+            if m is not None:
+                return m.transform_point(x, y)
             x, y = self.to_parent(x, y)
         if self.parent:
+            m = self.parent.get_window_matrix()
+            if m is not None:
+                return m.transform_point(x, y)
             return self.parent.to_window(x, y, initial=False)
         return (x, y)
 
+    def get_parent_matrix(self):
+        '''Return the transformation applied by to_parent(), as an
+        AffineTransform. Widgets overriding to_parent()/to_local() must
+        override it too, otherwise the transformations are computed by
+        calling them recursively. None mean no transformation.'''
+        return None
+
+    def get_window_matrix(self):
+        '''Return the transformation from local coordinates to window
+        coordinates, or None if a widget of the tree override to_parent()
+        without get_parent_matrix(). The result is cached until the
+        transformation or the parent of the widget, or of one of his
+        parents, change.'''
+        if self._window_matrix_valid:
+            return self._window_matrix
+        parent = self.parent
+        if parent is None:
+            m = _identity
+        else:
+            m = parent.get_window_matrix()
+        if m is not None:
+            local = self.get_parent_matrix()
+            if local is not None:
+                m = m.multiply(local)
+            elif self._have_custom_transform():
+                m = None
+        self._window_matrix = m
+        self._window_matrix_valid = True
+        return m
+
+    def _have_custom_transform(self):
+        cls = self.__class__
+        return cls.to_parent.im_func is not MTWidget.to_parent.im_func or \
+               cls.to_local.im_func is not MTWidget.to_local.im_func
+
+    def invalidate_transform(self):
+        '''Invalidate the cached transformation of the widget and his
+        children. Must be called when the result of get_parent_matrix()
+        change.'''
+        self._window_matrix_valid = False
+        self._window_matrix = None
+        # children with a valid cache have a parent with a valid cache, so
+        # we can stop at the ones already invalidated
+        for child in self.children:
+            if getattr(child, '_window_matrix_valid', False):
+                child.invalidate_transform()
+
     def to_parent(self, x, y):
         '''Transform local coordinate to parent coordinate'''
         return (x, y)
@@ -354,6 +514,7 @@ class MTWidget(EventDispatcher):
         if self.parent:
             self.parent.children.remove(self)
             self.parent.children.append(self)
+            self.invalidate()
 
     def hide(self):
         '''Hide the widget'''
@@ -381,7 +542,10 @@ class MTWidget(EventDispatcher):
 
         self.draw()
         if self.draw_children:
+            viewport = viewportGet()
             for w in self.children.iterate():
+                if w.is_culled(viewport):
+                    continue
                 w.dispatch_event('on_draw')
 
     def draw(self):
@@ -399,6 +563,9 @@ class MTWidget(EventDispatcher):
             w.parent = self
         except:
             pass
+        if self.spatial_index is not None:
+            self.spatial_index.update(w, w.get_parent_bbox())
+        self.invalidate()
 
     def add_widgets(self, *widgets):
         for w in widgets:
@@ -409,6 +576,9 @@ class MTWidget(EventDispatcher):
         '''Remove a widget from the children list'''
         if w in self.children.iterate():
             self.children.remove(w)
+            if self.spatial_index is not None:
+                self.spatial_index.remove(w)
+            self.invalidate()
 
     def __setattr__(self, name, value):
         super(MTWidget, self).__setattr__(name, value)
@@ -425,7 +595,12 @@ class MTWidget(EventDispatcher):
             c.dispatch_event('on_move', x, y)
 
     def on_touch_down(self, touch):
-        for w in self.children.iterate(reverse=True):
+        if self.spatial_index is not None:
+            children = self.spatial_index.get_children_at(
+                self.children, touch.x, touch.y)
+        else:
+            children = self.children.iterate(reverse=True)
+        for w in children:
             if w.dispatch_event('on_touch_down', touch):
                 return True
 
@@ -6,6 +6,7 @@ your system. Actually, theses libraries are handled :
 
     * PyGame (wrapper around SDL)
     * GLUT (last solution, really buggy :/)
+    * Null (no display, for benchmarks and tests)
 
 '''
 
@@ -17,14 +18,19 @@ import pymt
 from ...logger import pymt_logger
 from ...base import getCurrentTouches, setWindow, touch_event_listeners
 from ...clock import getClock
-from ...graphx import set_color, drawCircle, drawLabel, drawRectangle, drawCSSRectangle
+from ...graphx import set_color, drawCircle, drawLabel, drawRectangle, drawCSSRectangle, \
+    viewportPush, viewportPop
 from ...modules import pymt_modules
 from ...event import EventDispatcher
 from ...utils import SafeList
 from ..colors import css_get_style
+from ..spatialindex import SpatialGrid
+from ...affine import AffineTransform
 from ..factory import MTWidgetFactory
 from ..widgets import MTWidget
 
+_identity = AffineTransform()
+
 class BaseWindow(EventDispatcher):
     '''BaseWindow is a abstract window widget, for any window implementation.
 
@@ -39,12 +45,20 @@ class BaseWindow(EventDispatcher):
             Vsync window
         `display` : int
             Display index to use
+        `redraw_on_demand` : bool
+            Draw the window only when a widget need to be redrawn
+        `spatial_index` : bool
+            Use a spatial index to find the children under a touch
 
     :Styles:
         `bg-color` : color
             Background color of window
     '''
 
+    #: Maximum time the event loop can sleep without polling the window
+    #: events, or None if the window have no events
+    poll_timeout = 1 / 30.
+
     __instance = None
     __initialized = False
     _wallpaper = None
@@ -62,6 +76,7 @@ class BaseWindow(EventDispatcher):
         kwargs.setdefault('show_fps', False)
         kwargs.setdefault('style', {})
         kwargs.setdefault('gradient', True)
+        kwargs.setdefault('spatial_index', False)
 
         # don't init window 2 times,
         # except if force is specified
@@ -76,6 +91,14 @@ class BaseWindow(EventDispatcher):
         self._size = (0, 0)
         self.gradient = kwargs.get('gradient')
 
+        # redraw on demand
+        self.need_redraw = True
+        if 'redraw_on_demand' in kwargs:
+            self.redraw_on_demand = kwargs.get('redraw_on_demand')
+        else:
+            self.redraw_on_demand = pymt.pymt_config.getboolean(
+                'graphics', 'redraw_on_demand')
+
         # event subsystem
         self.register_event_type('on_draw')
         self.register_event_type('on_update')
@@ -105,6 +128,11 @@ class BaseWindow(EventDispatcher):
         self.parent = self
         self.visible = True
 
+        # spatial index of children, for touch dispatching
+        self.spatial_index = None
+        if kwargs.get('spatial_index'):
+            self.spatial_index = SpatialGrid()
+
         # add view
         if 'view' in kwargs:
             self.add_widget(kwargs.get('view'))
@@ -202,6 +230,11 @@ class BaseWindow(EventDispatcher):
 
     def apply_css(self, styles):
         self.cssstyle.update(styles)
+        self.need_redraw = True
+
+    def invalidate(self):
+        '''Ask to redraw the window on the next frame'''
+        self.need_redraw = True
 
     def _get_modifiers(self):
         return self._modifiers
@@ -213,6 +246,7 @@ class BaseWindow(EventDispatcher):
         if self._size == size:
             return False
         self._size = size
+        self.need_redraw = True
         pymt_logger.debug('Resize window to %s' % str(self.size))
         self.dispatch_event('on_resize', *size)
         return True
@@ -274,6 +308,9 @@ class BaseWindow(EventDispatcher):
         '''Add a widget on window'''
         self.children.append(w)
         w.parent = self
+        if self.spatial_index is not None:
+            self.spatial_index.update(w, w.get_parent_bbox())
+        self.need_redraw = True
 
     def remove_widget(self, w):
         '''Remove a widget from window'''
@@ -281,6 +318,9 @@ class BaseWindow(EventDispatcher):
             return
         self.children.remove(w)
         w.parent = None
+        if self.spatial_index is not None:
+            self.spatial_index.remove(w)
+        self.need_redraw = True
 
     def clear(self):
         '''Clear the window with background color'''
@@ -337,6 +377,9 @@ class BaseWindow(EventDispatcher):
     def to_window(self, x, y, initial=True):
         return (x, y)
 
+    def get_window_matrix(self):
+        return _identity
+
     def get_root_window(self):
         return self
 
@@ -361,9 +404,14 @@ class BaseWindow(EventDispatcher):
         # draw our window
         self.draw()
 
-        # then, draw childrens
+        # then, draw childrens, skipping the ones outside the window
+        viewport = (0, 0, self.width, self.height)
+        viewportPush(viewport)
         for w in self.children.iterate():
+            if w.is_culled(viewport):
+                continue
             w.dispatch_event('on_draw')
+        viewportPop()
 
         if self.show_fps:
             fps = getClock().get_fps()
@@ -385,7 +433,12 @@ class BaseWindow(EventDispatcher):
     def on_touch_down(self, touch):
         '''Event called when a touch is down'''
         touch.scale_for_screen(*self.size)
-        for w in self.children.iterate(reverse=True):
+        if self.spatial_index is not None:
+            children = self.spatial_index.get_children_at(
+                self.children, touch.x, touch.y)
+        else:
+            children = self.children.iterate(reverse=True)
+        for w in children:
             if w.dispatch_event('on_touch_down', touch):
                 return True
 
@@ -475,7 +528,12 @@ class MTDisplay(MTWidget):
 
 # Searching the best provider
 MTWindow = None
-if 'pygame' in pymt.options['window']:
+if 'null' in pymt.options['window']:
+    import win_null
+    MTWindow = win_null.MTWindowNull
+    pymt_logger.info('Window: use Null as window provider (headless).')
+
+if MTWindow is None and 'pygame' in pymt.options['window']:
     try:
         import win_pygame
         MTWindow = win_pygame.MTWindowPygame
@@ -111,6 +111,7 @@ class MTWindowGlut(BaseWindow):
         self.dispatch_event('on_mouse_move', x, y, self.modifiers)
 
     def _glut_keyboard(self, key, x, y):
+        self.need_redraw = True
         self.dispatch_event('on_keyboard', key, None, None)
 
     def _glut_update_modifiers(self):
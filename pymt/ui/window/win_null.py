@@ -0,0 +1,79 @@
+'''
+Window Null: window provider without display, for benchmarks and tests
+
+The null window run the event loop without any display. Select it with the
+--headless option, or with the environment variable PYMT_WINDOW=null ::
+
+    python myapp.py --headless --fixed-timestep=0.02 --max-frames=500
+
+The widgets are updated and drawn on each frame. If PyOpenGL use OSMesa
+(with PYOPENGL_PLATFORM=osmesa), they are drawn in an offscreen OpenGL
+context. Otherwise, the OpenGL calls do nothing (see pymt.nullgl), and
+on_draw is dispatched only to run the drawing code.
+'''
+
+__all__ = ('MTWindowNull', )
+
+import os
+from . import BaseWindow
+from ...logger import pymt_logger
+from ...base import getEventLoop
+from ...nullgl import null_gl_installed
+
+class MTWindowNull(BaseWindow):
+
+    # no events to poll
+    poll_timeout = None
+
+    def create_window(self, params):
+        self._size = params['width'], params['height']
+        self.gl_context = None
+        self.gl_buffer = None
+        if os.environ.get('PYOPENGL_PLATFORM') == 'osmesa':
+            self._create_osmesa_context()
+        # draw without context if the OpenGL calls do nothing
+        self.have_gl = self.gl_context is not None or null_gl_installed()
+        if not self.have_gl:
+            pymt_logger.info('Window: no OpenGL context, drawing disabled')
+        super(MTWindowNull, self).create_window(params)
+
+    def _create_osmesa_context(self):
+        try:
+            from OpenGL import osmesa, arrays
+            from OpenGL.GL import GL_UNSIGNED_BYTE
+            width, height = self._size
+            context = osmesa.OSMesaCreateContextExt(
+                osmesa.OSMESA_RGBA, 16, 1, 0, None)
+            buf = arrays.GLubyteArray.zeros((height, width, 4))
+            if not osmesa.OSMesaMakeCurrent(context, buf, GL_UNSIGNED_BYTE,
+                                            width, height):
+                raise Exception('OSMesaMakeCurrent failed')
+        except Exception, e:
+            pymt_logger.warning('Window: unable to create OSMesa context')
+            pymt_logger.exception(e)
+            return
+        self.gl_context = context
+        self.gl_buffer = buf
+        pymt_logger.info('Window: use an OSMesa offscreen context')
+
+    def init_gl(self):
+        if self.have_gl:
+            super(MTWindowNull, self).init_gl()
+
+    def on_resize(self, width, height):
+        if self.have_gl:
+            super(MTWindowNull, self).on_resize(width, height)
+
+    def on_draw(self):
+        if self.have_gl:
+            super(MTWindowNull, self).on_draw()
+
+    def flip(self):
+        if self.gl_context is not None:
+            from OpenGL.GL import glFinish
+            glFinish()
+
+    def mainloop(self):
+        self.dispatch_event('on_resize', *self.size)
+        # no window events: same loop as without window
+        getEventLoop().mainloop()
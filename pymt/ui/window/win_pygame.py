@@ -70,7 +70,8 @@ class MTWindowPygame(BaseWindow):
         if self._vsync:
             from pymt.clock import getClock
             import time
-            s = 1/60. - (time.time() - getClock().get_time())
+            clock = getClock()
+            s = 1/60. - (clock.get_current_time() - clock.get_time())
             if s > 0:
                 time.sleep(s)
 
@@ -93,6 +94,9 @@ class MTWindowPygame(BaseWindow):
 
             for event in pygame.event.get():
 
+                # window events can change the state of widgets
+                self.need_redraw = True
+
                 # kill application (SIG_TERM)
                 if event.type == pygame.QUIT:
                     evloop.quit = True
@@ -20,10 +20,8 @@ try:
     import numpy
     _use_numpy = True
 except:
-    pymt_logger.warning('you do not have numpy installed.  Computing '
-        'transformations for MTScatterWidget can get painfully '
-        'slow without numpy. You should install numpy: '
-        'http://numpy.scipy.org/')
+    pymt_logger.debug('numpy not found, matrix functions of pymt.vector '
+        'will use the pure Python implementation')
     from matrix import Matrix, RowVector
 
 class Vector(list):
@@ -0,0 +1,27 @@
+import unittest
+from pymt.affine import AffineTransform
+
+__all__ = ['AffineTestCase']
+
+def near(a, b):
+    return abs(a[0] - b[0]) < 1e-6 and abs(a[1] - b[1]) < 1e-6
+
+class AffineTestCase(unittest.TestCase):
+    def testIdentity(self):
+        t = AffineTransform()
+        self.failUnless(t.is_identity())
+        self.failUnless(t.transform_point(3, 4) == (3, 4))
+
+    def testCompose(self):
+        t = AffineTransform.translation(10, 20).rotate(90).scale(2)
+        self.failUnless(near(t.transform_point(1, 0), (10, 22)))
+
+    def testInverse(self):
+        t = AffineTransform.translation(10, 20).rotate(33).scale(1.5)
+        x, y = t.transform_point(7, -3)
+        self.failUnless(near(t.inverse().transform_point(x, y), (7, -3)))
+
+    def testGL(self):
+        t = AffineTransform.translation(5, 6).rotate(45)
+        u = AffineTransform.from_gl(t.to_gl())
+        self.failUnless(near(u.transform_point(1, 2), t.transform_point(1, 2)))
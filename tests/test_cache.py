@@ -0,0 +1,83 @@
+import unittest
+from pymt.cache import Cache
+from pymt.clock import getClock
+
+__all__ = ['CacheTestCase']
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        Cache.register('test', limit=2, timeout=2)
+
+    def tearDown(self):
+        Cache.remove('test')
+
+    def testLimit(self):
+        Cache.append('test', 'a', 1)
+        Cache.append('test', 'b', 2)
+        self.failUnless(Cache.get('test', 'a') == 1)
+        Cache.append('test', 'c', 3)
+        # b is the least recently used
+        self.failUnless(Cache.get('test', 'b') is None)
+        self.failUnless(Cache.get('test', 'a') == 1)
+        self.failUnless(Cache.get('test', 'c') == 3)
+        stats = Cache.get_stats('test')
+        self.failUnless(stats['count'] == 2)
+        self.failUnless(stats['hits'] == 3)
+        self.failUnless(stats['misses'] == 1)
+        self.failUnless(stats['evictions'] == 1)
+
+    def testTimeout(self):
+        clock = getClock()
+        start = clock._last_tick
+        try:
+            Cache.append('test', 'a', 1)
+            Cache.append('test', 'b', 2)
+            clock._last_tick = start + 1.5
+            Cache.get('test', 'a')
+            clock._last_tick = start + 3
+            Cache._purge_by_timeout()
+            self.failUnless(Cache.get('test', 'b') is None)
+            self.failUnless(Cache.get('test', 'a') == 1)
+            clock._last_tick = start + 6
+            Cache._purge_by_timeout()
+            self.failUnless(Cache.get_stats('test')['expirations'] == 2)
+        finally:
+            clock._last_tick = start
+
+    def testSizeBudget(self):
+        released = []
+        Cache.register('test_size', size_limit=100,
+                       release=released.append)
+        try:
+            Cache.append('test_size', 'a', 'a', size=60)
+            Cache.append('test_size', 'b', 'b', size=30)
+            Cache.append('test_size', 'c', 'c', size=30)
+            self.failUnless(released == ['a'])
+            Cache.set_size_budget(40)
+            self.failUnless(released == ['a', 'b'])
+            self.failUnless(Cache.get_size() == 30)
+        finally:
+            Cache.set_size_budget(None)
+            Cache.remove('test_size')
+
+    def testSizeBudgetUnsized(self):
+        # objects without size don't stop the eviction of the sized ones
+        Cache.register('test_size', size_limit=100)
+        try:
+            Cache.append('test_size', 'unsized', 'x')
+            Cache.append('test_size', 'a', 'a', size=50)
+            Cache.append('test_size', 'b', 'b', size=50)
+            Cache.append('test_size', 'c', 'c', size=50)
+            self.failUnless(Cache.get('test_size', 'a') is None)
+            self.failUnless(Cache.get_stats('test_size')['count'] == 3)
+            # the least recently used object have no size
+            Cache.set_size_budget(50)
+            self.failUnless(Cache.get('test_size', 'b') is None)
+            self.failUnless(Cache.get('test_size', 'c') == 'c')
+            self.failUnless(Cache.get('test_size', 'unsized') == 'x')
+            self.failUnless(Cache.get_size() == 50)
+            Cache.remove('test_size', 'c')
+            self.failUnless(Cache.get_size() == 0)
+        finally:
+            Cache.set_size_budget(None)
+            Cache.remove('test_size')
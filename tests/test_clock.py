@@ -0,0 +1,46 @@
+import unittest
+from pymt.clock import Clock
+
+__all__ = ['ClockTestCase']
+
+class ClockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.calls = []
+
+    def callback(self, dt):
+        self.calls.append(dt)
+
+    def testScheduleOnce(self):
+        self.clock.schedule_once(self.callback, 0)
+        self.clock.tick()
+        self.clock.tick()
+        self.failUnless(len(self.calls) == 1)
+
+    def testScheduleInterval(self):
+        self.clock.schedule_interval(self.callback, 0)
+        self.clock.tick()
+        self.clock.tick()
+        self.failUnless(len(self.calls) == 2)
+
+    def testCancel(self):
+        event = self.clock.schedule_interval(self.callback, 0)
+        self.clock.tick()
+        event.cancel()
+        self.clock.tick()
+        self.failUnless(len(self.calls) == 1)
+
+    def testUnschedule(self):
+        self.clock.schedule_interval(self.callback, 0)
+        self.clock.schedule_once(self.callback, 0)
+        self.clock.unschedule(self.callback)
+        self.clock.tick()
+        self.failUnless(len(self.calls) == 0)
+
+    def testTrigger(self):
+        trigger = self.clock.create_trigger(self.callback)
+        trigger()
+        trigger()
+        self.clock.tick()
+        self.clock.tick()
+        self.failUnless(len(self.calls) == 1)
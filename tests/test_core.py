@@ -0,0 +1,86 @@
+import sys
+import shutil
+import tempfile
+import unittest
+from types import ModuleType
+import pymt
+import pymt.core as core
+from pymt.diskcache import DiskCache
+
+__all__ = ['CoreTestCase']
+
+class CoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.enabled = DiskCache._enabled
+        self.directory = DiskCache._directory
+        self.retry_delay = core.probe_retry_delay
+        self.options = pymt.options['text']
+        DiskCache._enabled = True
+        DiskCache._directory = tempfile.mkdtemp()
+        DiskCache._usage = {}
+        pymt.options['text'] = ('a', 'b', 'c')
+        self.llist = (('a', 'fake_a', 'Label'), ('b', 'fake_b', 'Label'),
+                      ('c', 'fake_c', 'Label'))
+
+    def tearDown(self):
+        shutil.rmtree(DiskCache._directory)
+        DiskCache._enabled = self.enabled
+        DiskCache._directory = self.directory
+        DiskCache._usage = {}
+        core.probe_retry_delay = self.retry_delay
+        pymt.options['text'] = self.options
+        for name in ('a', 'b', 'c'):
+            self.uninstall(name)
+
+    def install(self, name):
+        # a provider module, installed in the text category
+        module = ModuleType('pymt.core.text.fake_%s' % name)
+        module.Label = name
+        sys.modules[module.__name__] = module
+
+    def uninstall(self, name):
+        sys.modules.pop('pymt.core.text.fake_%s' % name, None)
+
+    def failed(self, llist):
+        return sorted(core._probe_load(core._probe_key('text', llist)))
+
+    def testSelectLib(self):
+        self.install('b')
+        self.install('c')
+        self.failUnless(core.core_select_lib('text', self.llist) == 'b')
+        self.failUnless(self.failed(self.llist) == ['a'])
+
+        # a is installed later: tried again only after the delay
+        self.install('a')
+        self.failUnless(core.core_select_lib('text', self.llist) == 'b')
+        core.probe_retry_delay = 0
+        self.failUnless(core.core_select_lib('text', self.llist) == 'a')
+        self.failUnless(self.failed(self.llist) == [])
+
+    def testSelectLibFallback(self):
+        self.install('c')
+        self.failUnless(core.core_select_lib('text', self.llist) == 'c')
+        self.failUnless(self.failed(self.llist) == ['a', 'b'])
+
+        # c is removed: the providers that failed are tried again, in the
+        # configured order
+        self.uninstall('c')
+        self.install('b')
+        self.failUnless(core.core_select_lib('text', self.llist) == 'b')
+        self.failUnless(self.failed(self.llist) == ['a', 'c'])
+
+    def testRegisterLibs(self):
+        libs = [(option, module) for option, module, cls in self.llist]
+        self.install('a')
+        core.core_register_libs('text', libs)
+        self.failUnless(self.failed(libs) == ['b', 'c'])
+
+        # a is still working: b and c are not tried again
+        self.install('b')
+        core.core_register_libs('text', libs)
+        self.failUnless(self.failed(libs) == ['b', 'c'])
+
+        # nothing work anymore: all the loaders are tried
+        self.uninstall('a')
+        core.core_register_libs('text', libs)
+        self.failUnless(self.failed(libs) == ['a', 'c'])
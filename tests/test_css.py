@@ -0,0 +1,48 @@
+import unittest
+from pymt.ui import colors
+from pymt.ui.colors import css_index_rules, css_get_style, css_invalidate
+
+__all__ = ['CSSTestCase']
+
+class MTCssTestWidget(object):
+    def __init__(self, cls=''):
+        self.cls = cls
+
+class CSSTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = colors.css_index
+        colors.css_index = {}
+        css_invalidate()
+
+    def tearDown(self):
+        colors.css_index = self.index
+        css_invalidate()
+
+    def _style(self, rules, cls=''):
+        css_invalidate()
+        css_index_rules(rules)
+        return css_get_style(widget=MTCssTestWidget(cls))
+
+    def testCompoundClass(self):
+        rules = [([('csstestwidget', ('a', 'b'), (0, 0, 2, 1))],
+                  [('font-size', '20')])]
+        self.failUnless('font-size' not in self._style(rules, 'a'))
+        self.failUnless('font-size' not in self._style(rules, ['b']))
+        self.failUnless(self._style(rules, ['a', 'b'])['font-size'] == 20)
+        self.failUnless(self._style(rules, ['b', 'c', 'a'])['font-size'] == 20)
+
+    def testPrecedence(self):
+        rules = [
+            ([('csstestwidget', ('a', ), (0, 0, 1, 1))],
+             [('font-size', '20')]),
+            ([('csstestwidget', (), (0, 0, 0, 1))],
+             [('font-size', '10'), ('bold', '1')]),
+            ([('*', (), (0, 0, 0, 0))],
+             [('bold', '0')]),
+        ]
+        # more specific selector wins, then the nearest element
+        style = self._style(rules, 'a')
+        self.failUnless(style['font-size'] == 20)
+        self.failUnless(style['bold'] == '1')
+        style = self._style(rules)
+        self.failUnless(style['font-size'] == 10)
@@ -0,0 +1,68 @@
+from __future__ import with_statement
+
+import os
+import unittest
+import shutil
+import tempfile
+from pymt.diskcache import DiskCache
+
+__all__ = ['DiskCacheTestCase']
+
+class DiskCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.enabled = DiskCache._enabled
+        self.directory = DiskCache._directory
+        DiskCache._enabled = True
+        DiskCache._directory = tempfile.mkdtemp()
+        DiskCache._usage = {}
+
+    def tearDown(self):
+        shutil.rmtree(DiskCache._directory)
+        DiskCache._enabled = self.enabled
+        DiskCache._directory = self.directory
+        DiskCache._usage = {}
+
+    def testHash(self):
+        self.failUnless(DiskCache.hash('a', 1) == DiskCache.hash('a', 1))
+        self.failUnless(DiskCache.hash('a', 1) != DiskCache.hash('a', 2))
+        self.failUnless(DiskCache.hash('ab', 'c') != DiskCache.hash('a', 'bc'))
+
+    def testSaveLoad(self):
+        key = DiskCache.hash('test')
+        self.failUnless(DiskCache.load('test', key) is None)
+        DiskCache.save('test', key, 'data\0data')
+        self.failUnless(DiskCache.load('test', key)[:] == 'data\0data')
+        DiskCache.remove('test')
+        self.failUnless(DiskCache.load('test', key) is None)
+
+    def testSizeLimit(self):
+        DiskCache.set_size_limit('test', 100)
+        try:
+            for x in xrange(3):
+                key = DiskCache.hash(x)
+                DiskCache.save('test', key, 'x' * 30)
+                # make the order of the files independant of the clock
+                filename = os.path.join(DiskCache._directory, 'test', key)
+                os.utime(filename, (x, x))
+            # a loaded file become the most recently used
+            DiskCache.load('test', DiskCache.hash(0))
+            # over the limit, files are removed until 3/4 of the limit
+            DiskCache.save('test', DiskCache.hash(3), 'x' * 30)
+            self.failUnless(DiskCache._usage['test'] == 60)
+            self.failUnless(DiskCache.load('test', DiskCache.hash(0)))
+            self.failUnless(DiskCache.load('test', DiskCache.hash(3)))
+            self.failUnless(DiskCache.load('test', DiskCache.hash(1)) is None)
+            self.failUnless(DiskCache.load('test', DiskCache.hash(2)) is None)
+        finally:
+            del DiskCache._size_limits['test']
+
+    def testStat(self):
+        filename = os.path.join(DiskCache._directory, 'font')
+        self.failUnless(DiskCache.stat(filename) == '')
+        self.failUnless(DiskCache.stat(None) == '')
+        with open(filename, 'wb') as fd:
+            fd.write('font')
+        stat = DiskCache.stat(filename)
+        with open(filename, 'wb') as fd:
+            fd.write('other font')
+        self.failUnless(stat and DiskCache.stat(filename) != stat)
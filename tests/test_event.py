@@ -0,0 +1,46 @@
+import unittest
+from pymt.event import EventDispatcher
+
+__all__ = ['EventTestCase']
+
+class Dispatcher(EventDispatcher):
+    def __init__(self):
+        super(Dispatcher, self).__init__()
+        self.register_event_type('on_test')
+        self.calls = []
+
+    def on_test(self, value):
+        self.calls.append(('default', value))
+
+class EventTestCase(unittest.TestCase):
+    def setUp(self):
+        self.d = Dispatcher()
+
+    def testDefault(self):
+        self.d.dispatch_event('on_test', 1)
+        self.failUnless(self.d.calls == [('default', 1)])
+
+    def testUnknown(self):
+        self.d.unregister_event_type('on_test')
+        self.d.dispatch_event('on_test', 1)
+        self.failUnless(self.d.calls == [])
+
+    def testHandlerStack(self):
+        def on_test(value):
+            self.d.calls.append(('stack', value))
+            return True
+        self.d.push_handlers(on_test=on_test)
+        self.failUnless(self.d.dispatch_event('on_test', 2))
+        self.failUnless(self.d.calls == [('stack', 2)])
+        self.d.remove_handlers(on_test=on_test)
+        self.d.dispatch_event('on_test', 3)
+        self.failUnless(self.d.calls == [('stack', 2), ('default', 3)])
+
+    def testInstanceHandler(self):
+        self.d.dispatch_event('on_test', 1)
+        self.d.on_test = lambda value: self.d.calls.append(('instance', value))
+        self.d.dispatch_event('on_test', 2)
+        self.failUnless(self.d.calls == [('default', 1), ('instance', 2)])
+
+    def testBadArguments(self):
+        self.assertRaises(TypeError, self.d.dispatch_event, 'on_test', 1, 2)
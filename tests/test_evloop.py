@@ -0,0 +1,134 @@
+import time
+import unittest
+import pymt.base as base
+from pymt.base import TouchEventLoop
+from pymt.clock import getClock
+from pymt.input.provider import TouchProvider
+
+__all__ = ['EventLoopTestCase']
+
+class PolledProvider(TouchProvider):
+    pass
+
+class CountingProvider(TouchProvider):
+    def __init__(self, device, args):
+        super(CountingProvider, self).__init__(device, args)
+        self.started = self.stopped = 0
+    def start(self):
+        self.started += 1
+    def stop(self):
+        self.stopped += 1
+
+class FakeWindow(object):
+    poll_timeout = .01
+    def __init__(self, redraw_on_demand):
+        self.redraw_on_demand = redraw_on_demand
+        self.need_redraw = True
+        self.events = []
+    def dispatch_events(self):
+        pass
+    def dispatch_event(self, name, *largs):
+        self.events.append(name)
+    def flip(self):
+        pass
+    def close(self):
+        self.events.append('close')
+
+class FailingWindow(FakeWindow):
+    def dispatch_event(self, name, *largs):
+        if name == 'on_update':
+            raise ValueError('update failed')
+
+class EventLoopTestCase(unittest.TestCase):
+    def tearDown(self):
+        base.pymt_providers[:] = []
+        base.touch_event_listeners[:] = []
+        base.pymt_window = None
+
+    def _run_frames(self, window, frames):
+        base.pymt_window = window
+        base.touch_event_listeners.append(window)
+        evloop = TouchEventLoop()
+        getClock().max_fps = 0
+        for x in xrange(frames):
+            evloop.idle()
+        return evloop
+
+    def testRedrawAlways(self):
+        window = FakeWindow(False)
+        window.need_redraw = False
+        self._run_frames(window, 3)
+        self.failUnless(window.events.count('on_update') == 3)
+        self.failUnless(window.events.count('on_draw') == 3)
+
+    def testRedrawOnDemand(self):
+        window = FakeWindow(True)
+        evloop = self._run_frames(window, 3)
+        # first frame is drawn, then nothing changed
+        self.failUnless(window.events.count('on_update') == 3)
+        self.failUnless(window.events.count('on_draw') == 1)
+        self.failUnless(not window.need_redraw)
+        window.need_redraw = True
+        evloop.idle()
+        self.failUnless(window.events.count('on_draw') == 2)
+        self.failUnless(not window.need_redraw)
+
+    def testIdleTimeout(self):
+        evloop = TouchEventLoop()
+        getClock().max_fps = 0
+        getClock().tick()
+        event = getClock().schedule_once(lambda dt: None, .5)
+        timeout = evloop.get_sleep_timeout()
+        self.failUnless(.4 < timeout <= .5)
+        # activity, or a polled provider: don't sleep
+        evloop.have_activity = True
+        self.failUnless(evloop.get_sleep_timeout() == 0)
+        evloop.have_activity = False
+        base.pymt_providers.append(PolledProvider(None, ''))
+        self.failUnless(evloop.get_sleep_timeout() == 0)
+        event.cancel()
+
+    def testWakeup(self):
+        evloop = TouchEventLoop()
+        getClock().max_fps = 0
+        getClock().tick()
+        event = getClock().schedule_once(lambda dt: None, .5)
+        evloop.wakeup()
+        start = time.time()
+        evloop.sleep()
+        self.failUnless(time.time() - start < .1)
+        # the wakeup is consumed
+        start = time.time()
+        evloop.sleep()
+        self.failUnless(time.time() - start > .3)
+        event.cancel()
+
+    def _mainloop(self, window):
+        base.pymt_window = window
+        base.touch_event_listeners.append(window)
+        provider = CountingProvider(None, '')
+        base.pymt_providers.append(provider)
+        evloop = TouchEventLoop()
+        getClock().max_fps = 0
+        evloop.max_frames = 3
+        evloop.start()
+        return evloop, provider
+
+    def testMainloop(self):
+        window = FakeWindow(False)
+        evloop, provider = self._mainloop(window)
+        evloop.mainloop()
+        self.failUnless(window.events.count('on_draw') == 3)
+        # the providers are stopped once, and the window closed
+        self.failUnless(provider.started == 1 and provider.stopped == 1)
+        self.failUnless(window.events[-1] == 'close')
+        evloop.exit()
+        self.failUnless(provider.stopped == 1)
+
+    def testMainloopException(self):
+        window = FailingWindow(False)
+        evloop, provider = self._mainloop(window)
+        self.failUnlessRaises(ValueError, evloop.mainloop)
+        self.failUnless(evloop.quit)
+        self.failUnless(provider.stopped == 1)
+        self.failUnless(window.events == ['close'])
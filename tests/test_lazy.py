@@ -0,0 +1,57 @@
+import os
+import sys
+import subprocess
+import unittest
+
+__all__ = ['LazyImportTestCase']
+
+def run_python(code):
+    '''Run the code in a new interpreter, and return its output'''
+    env = dict(os.environ)
+    env['PYMT_SHADOW_WINDOW'] = '0'
+    path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(
+        [path] + [x for x in env.get('PYTHONPATH', '').split(os.pathsep) if x])
+    process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return process.communicate()[0].split()
+
+class LazyImportTestCase(unittest.TestCase):
+    def testLightImport(self):
+        self.failUnless(run_python('''if 1:
+            import sys, pymt
+            print type(sys.modules['pymt']).__name__
+            print pymt.Vector is not None, pymt.getClock is not None
+            try:
+                pymt._missing
+            except AttributeError:
+                print 'AttributeError'
+            print 'pymt.ui' in sys.modules, 'pymt.graphx' in sys.modules
+        ''') == ['_PyMTModule', 'True', 'True', 'AttributeError',
+                 'False', 'False'])
+
+    def testHeavyImport(self):
+        self.failUnless(run_python('''if 1:
+            import sys, pymt
+            print pymt.MTWidget.__name__
+            print 'pymt.ui' in sys.modules, 'pymt.graphx' in sys.modules
+            print 'MTWidget' in pymt.__all__
+            try:
+                pymt.MTMissingWidget
+            except AttributeError:
+                print 'AttributeError'
+        ''') == ['MTWidget', 'True', 'True', 'True', 'AttributeError'])
+
+    def testImportStar(self):
+        self.failUnless(run_python('''if 1:
+            from pymt import *
+            print MTWidget.__name__, getWindow.__name__
+        ''') == ['MTWidget', 'getWindow'])
+
+    def testSubmoduleImport(self):
+        # the heavy submodules can be imported first, without the package
+        for name in ('pymt.base', 'pymt.ui.colors', 'pymt.input'):
+            self.failUnless(run_python('''if 1:
+                import %s
+                print 'imported'
+            ''' % name) == ['imported'])
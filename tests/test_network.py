@@ -0,0 +1,55 @@
+import time
+import socket
+import unittest
+from pymt.input.providers.network import DatagramTouchProvider
+
+__all__ = ['NetworkTestCase']
+
+class EchoProvider(DatagramTouchProvider):
+    def decode(self, data, address):
+        if data == 'bad':
+            raise KeyError(data)
+        return data.upper()
+
+    def process(self, dispatch_fn, item):
+        dispatch_fn('data', item)
+
+class NetworkTestCase(unittest.TestCase):
+    def testLoopback(self):
+        providers = [EchoProvider(None, '127.0.0.1:0', queue_size=4)
+                     for x in xrange(2)]
+        for provider in providers:
+            provider.start()
+        out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for provider in providers:
+            for x in xrange(6):
+                out.sendto('abc', provider.socket.getsockname())
+
+        received = []
+        dispatch = lambda type, item: received.append(item)
+        for x in xrange(20):
+            for provider in providers:
+                provider.update(dispatch)
+            if len(received) == 12:
+                break
+            time.sleep(.05)
+
+        for provider in providers:
+            provider.stop()
+        self.failUnless(received == ['ABC'] * 12)
+
+    def testBadDatagram(self):
+        # read the socket without the network thread
+        provider = EchoProvider(None, '127.0.0.1:0')
+        provider.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        provider.socket.bind(('127.0.0.1', 0))
+        provider.socket.setblocking(0)
+        out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for data in ('abc', 'bad', 'def'):
+            out.sendto(data, provider.socket.getsockname())
+        out.close()
+
+        # one read() get all the datagrams, even after a decode error
+        provider.read()
+        provider.socket.close()
+        self.failUnless(list(provider.queue) == ['ABC', 'DEF'])
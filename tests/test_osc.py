@@ -0,0 +1,77 @@
+import socket
+import unittest
+from pymt.lib.osc import OSC, oscAPI
+
+__all__ = ['OSCTestCase']
+
+def message(address, args):
+    m = OSC.OSCMessage()
+    m.setAddress(address)
+    for arg in args:
+        m.append(arg)
+    return m.getBinary()
+
+class OSCTestCase(unittest.TestCase):
+    def testMessage(self):
+        decoded = OSC.decodeOSC(message('/test', ['set', 1, 0.5, 'abcd']))
+        self.failUnless(decoded == ['/test', ',sifs', 'set', 1, 0.5, 'abcd'])
+
+    def testBundle(self):
+        bundle = OSC.OSCMessage()
+        bundle.append('#bundle')
+        bundle.append(0)
+        bundle.append(0)
+        bundle.append(message('/tuio/2Dcur', ['alive', 1, 2]), 'b')
+        bundle.append(message('/tuio/2Dcur', ['fseq', 3]), 'b')
+        decoded = OSC.decodeOSC(bundle.message)
+        self.failUnless(decoded == [
+            ['/tuio/2Dcur', ',sii', 'alive', 1, 2],
+            ['/tuio/2Dcur', ',si', 'fseq', 3]])
+
+    def testTruncated(self):
+        self.failUnless(OSC.decodeOSC(message('/test', [1, 2])[:-2]) == [])
+
+    def testUnknownTypetag(self):
+        # 'T' (true) is not supported by the decoder
+        data = '/test\0\0\0' + ',iT\0' + '\0\0\0\1'
+        self.failUnless(OSC.decodeOSC(data) == [])
+        decoded = OSC.decodeOSC(message('/test', [1]))
+        self.failUnless(decoded == ['/test', ',i', 1])
+
+    def testDrain(self):
+        oscAPI.init()
+        received = []
+        bundles = []
+        def callback(message, source):
+            received.append(message[2:])
+            if message[2] == 'fail':
+                raise Exception('callback error')
+        oscAPI.bind(callback, '/test/drain')
+        oscAPI.bind(lambda messages, source: bundles.append(len(messages)),
+                    '/test/drainbundle', bundle=True)
+
+        server = oscAPI.OSCServer(port=0)
+        server.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.socket.bind(('127.0.0.1', 0))
+        server.socket.setblocking(0)
+        address = server.socket.getsockname()
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for value in ('a', 'fail', 'b'):
+                sender.sendto(message('/test/drain', [value]), address)
+            sender.sendto('/test/drain\0,T\0', address)
+            bundle = oscAPI.createBundle()
+            oscAPI.appendToBundle(bundle, '/test/drainbundle', [1])
+            oscAPI.appendToBundle(bundle, '/test/drainbundle', [2])
+            sender.sendto(bundle.message, address)
+
+            # all the pending datagrams are read, even after an error in a
+            # callback, and drain() returns when there is nothing to read
+            server.drain()
+            self.failUnless(received == [['a'], ['fail'], ['b']])
+            self.failUnless(bundles == [2])
+            server.drain()
+            self.failUnless(len(received) == 3)
+        finally:
+            sender.close()
+            server.socket.close()
@@ -0,0 +1,67 @@
+from __future__ import with_statement
+
+import os
+try:
+    import json
+except ImportError:
+    import simplejson as json
+import tempfile
+import unittest
+from pymt.base import TouchEventLoop
+from pymt.profiler import Profiler
+from pymt.ui.widgets.widget import MTWidget
+
+__all__ = ['ProfilerTestCase']
+
+class ProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+
+    def tearDown(self):
+        self.profiler.deactivate()
+
+    def testInstall(self):
+        idle = TouchEventLoop.__dict__['idle']
+        sleep = TouchEventLoop.__dict__['sleep']
+        self.failUnless('dispatch_event' not in MTWidget.__dict__)
+        self.profiler.activate()
+        self.failUnless('dispatch_event' in MTWidget.__dict__)
+        self.failUnless(TouchEventLoop.__dict__['idle'] is not idle)
+        # activate twice don't wrap twice
+        patched = MTWidget.__dict__['dispatch_event']
+        self.profiler.activate()
+        self.failUnless(MTWidget.__dict__['dispatch_event'] is patched)
+        self.profiler.deactivate()
+        self.failUnless('dispatch_event' not in MTWidget.__dict__)
+        self.failUnless(TouchEventLoop.__dict__['idle'] is idle)
+        self.failUnless(TouchEventLoop.__dict__['sleep'] is sleep)
+
+    def testRecord(self):
+        root = MTWidget(id='root')
+        root.add_widget(MTWidget(id='child'))
+        self.profiler.activate(trace=True)
+        root.dispatch_event('on_update')
+        root.dispatch_event('on_move', 0, 0)
+        self.profiler.deactivate()
+        # recorded stats are kept, but nothing is recorded anymore
+        root.dispatch_event('on_update')
+
+        stats = self.profiler.stats
+        self.failUnless(sorted(stats.keys()) == [
+            ('MTWidget(child)', 'on_update'), ('MTWidget(root)', 'on_update')])
+        root_stat = stats[('MTWidget(root)', 'on_update')]
+        child_stat = stats[('MTWidget(child)', 'on_update')]
+        self.failUnless(root_stat[0] == 1 and child_stat[0] == 1)
+        # the root total time contains the child time
+        self.failUnless(root_stat[1] >= child_stat[1])
+        self.failUnless(abs(root_stat[1] - root_stat[2] - child_stat[1]) < 1e-6)
+
+        fd, filename = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            self.profiler.export_trace(filename)
+            with open(filename) as fd:
+                trace = json.load(fd)
+        finally:
+            os.unlink(filename)
+        self.failUnless(len(trace['traceEvents']) == 2)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+import pymt
+from pymt.clock import getClock
+from pymt.input.providers.tuio import Tuio2dCurTouch
+from pymt.input.providers.replay import ReplayTouchProvider
+from pymt.input.postproc.recorder import InputPostprocRecorder, \
+        record_header
+
+__all__ = ['RecordTestCase']
+
+def snapshot(type, touch, id):
+    shape = None
+    if touch.shape is not None:
+        shape = (touch.shape.width, touch.shape.height)
+    return (type, id, touch.profile, touch.sx, touch.sy,
+            touch.X, touch.Y, touch.m, shape)
+
+class RecordTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.rec')
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def start_record(self):
+        # one tick of the clock per recorded frame
+        clock = getClock()
+        self.fixed_dt, clock.fixed_dt = clock.fixed_dt, .02
+        self.record_input = pymt.pymt_config.get('pymt', 'record_input')
+        pymt.pymt_config.set('pymt', 'record_input', self.filename)
+        self.recorder = InputPostprocRecorder()
+
+    def stop_record(self):
+        self.recorder.close()
+        pymt.pymt_config.set('pymt', 'record_input', self.record_input)
+        getClock().fixed_dt = self.fixed_dt
+
+    def testRoundTrip(self):
+        # a touch with a shape, and a touch with only a position. The
+        # values are exact in simple precision, like in the file.
+        shaped = Tuio2dCurTouch.create(None, 1,
+                                       [.25, .5, .125, .5, 2., .0625, .25])
+        simple = Tuio2dCurTouch.create(None, 2, [.75, .75])
+        recorded = []
+        def frame(*events):
+            getClock().tick()
+            self.recorder.process(list(events))
+            recorded.append([snapshot(type, touch, touch.uid)
+                             for type, touch in events])
+        self.start_record()
+        try:
+            frame(('down', shaped))
+            shaped.move([.5, .5, .25, 0., 1., .125, .125])
+            frame(('move', shaped), ('down', simple))
+            simple.move([.5, .25])
+            frame(('up', shaped), ('move', simple))
+            frame(('up', simple))
+        finally:
+            self.stop_record()
+
+        provider = ReplayTouchProvider(None, self.filename + ',fast')
+        provider.start()
+        played = []
+        for x in xrange(len(recorded) + 1):
+            events = []
+            provider.update(lambda type, touch: events.append(
+                            snapshot(type, touch, touch.id)))
+            played.append(events)
+        provider.stop()
+
+        # same events, with the same attributes, frame by frame
+        self.failUnless(played[:-1] == recorded)
+        self.failUnless(played[-1] == [])
+        self.failUnless(recorded[0][0][2] == ('pos', 'mov', 'motacc',
+                                              'shape'))
+        self.failUnless(recorded[1][1][2] == ('pos', ))
+
+    def testBadHeader(self):
+        for header in ('NOTAREC\0' + '\0' * 4,
+                       record_header.pack('PYMTREC\0', 99), 'PYMT'):
+            fd = open(self.filename, 'wb')
+            fd.write(header)
+            fd.close()
+            provider = ReplayTouchProvider(None, self.filename)
+            provider.start()
+            events = []
+            provider.update(lambda type, touch: events.append(type))
+            self.failUnless(events == [])
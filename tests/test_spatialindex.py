@@ -0,0 +1,58 @@
+import unittest
+from pymt.ui.spatialindex import SpatialGrid
+
+__all__ = ['SpatialGridTestCase']
+
+class SpatialGridTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grid = SpatialGrid(cell_size=100)
+        self.children = ['a', 'b', 'c', 'd']
+        self.grid.update('a', (0, 0, 150, 150))
+        self.grid.update('b', (50, 50, 80, 80))
+        self.grid.update('c', (500, 500, 600, 600))
+        self.grid.update('d', (10, 10, 20, 20))
+
+    def testOrder(self):
+        # front to the back: reverse order of the children
+        self.failUnless(self.grid.get_children_at(self.children, 60, 60) ==
+                        ['d', 'b', 'a'])
+        self.failUnless(self.grid.get_children_at(self.children, 120, 20) ==
+                        ['a'])
+        self.failUnless(self.grid.get_children_at(self.children, 900, 900) ==
+                        [])
+
+    def testUnbounded(self):
+        self.grid.update('b', None)
+        self.failUnless(self.grid.get_children_at(self.children, 900, 900) ==
+                        ['b'])
+        self.failUnless(self.grid.get_children_at(self.children, 550, 550) ==
+                        ['c', 'b'])
+
+    def testMove(self):
+        self.grid.update('c', (0, 0, 10, 10))
+        self.failUnless(self.grid.get_children_at(self.children, 5, 5) ==
+                        ['d', 'c', 'b', 'a'])
+        self.failUnless(self.grid.get_children_at(self.children, 550, 550) ==
+                        [])
+        self.grid.remove('a')
+        self.failUnless(self.grid.get_children_at(self.children[1:], 120, 20)
+                        == [])
+
+    def testRebuild(self):
+        # children changed without the grid
+        children = ['d', 'a']
+        self.failUnless(self.grid.get_children_at(children, 15, 15) ==
+                        ['a', 'd'])
+        self.failUnless('b' not in self.grid)
+
+    def testReorder(self):
+        self.failUnless(self.grid.get_children_at(self.children, 60, 60) ==
+                        ['d', 'b', 'a'])
+        # children reordered without the grid, like bring_to_front()
+        self.children.remove('a')
+        self.children.append('a')
+        self.failUnless(self.grid.get_children_at(self.children, 60, 60) ==
+                        ['a', 'd', 'b'])
+        self.children.reverse()
+        self.failUnless(self.grid.get_children_at(self.children, 60, 60) ==
+                        ['b', 'd', 'a'])
@@ -0,0 +1,30 @@
+import unittest
+from pymt.ui.colors import WidgetStyle
+
+__all__ = ['StyleTestCase']
+
+class StyleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.shared = {'bg-color': (0, 0, 0, 1), 'font-size': 10}
+
+    def testShared(self):
+        a = WidgetStyle(self.shared)
+        a.update(self.shared)
+        self.failUnless(a.is_shared())
+        self.failUnless(a['font-size'] == 10)
+        self.failUnless(dict(a) == self.shared)
+
+    def testFork(self):
+        a = WidgetStyle(self.shared)
+        b = WidgetStyle(self.shared)
+        a['font-size'] = 12
+        self.failUnless(a['font-size'] == 12)
+        self.failUnless(b['font-size'] == 10)
+        self.failUnless(self.shared['font-size'] == 10)
+        self.failUnless(a.own == {'font-size': 12})
+
+    def testDelete(self):
+        a = WidgetStyle(self.shared)
+        del a['bg-color']
+        self.failUnless('bg-color' not in a)
+        self.failUnless('bg-color' in self.shared)
@@ -0,0 +1,70 @@
+import unittest
+from pymt.clock import getClock
+from pymt.input.providers.tuio import Tuio2dCurTouch
+from pymt.input.providers.synthetic import SyntheticTouchProvider
+
+__all__ = ['SyntheticTestCase']
+
+class SyntheticTestCase(unittest.TestCase):
+    def setUp(self):
+        # fixed clock, with times exact in floating point
+        self.clock = clock = getClock()
+        self.saved = clock.fixed_dt, clock._last_tick
+        clock.fixed_dt = .125
+        clock._last_tick = 1000.
+
+    def tearDown(self):
+        self.clock.fixed_dt, self.clock._last_tick = self.saved
+
+    def play(self, args, frames=40):
+        # return the events of each frame, one move per frame
+        provider = SyntheticTouchProvider(None, 'rate=8,' + args)
+        provider.start()
+        played = []
+        for x in xrange(frames):
+            self.clock.tick()
+            events = []
+            provider.update(lambda type, touch: events.append(
+                (type, touch.id, touch.profile, touch.__class__)))
+            played.append(events)
+        provider.stop()
+        return played
+
+    def check_sequences(self, played):
+        types = {}
+        for events in played:
+            for type, id, profile, cls in events:
+                self.failUnless(cls is Tuio2dCurTouch)
+                self.failUnless(profile == ('pos', 'mov', 'motacc'))
+                types.setdefault(id, []).append(type)
+        # down, moves and up for each touch, nothing after the up
+        for sequence in types.itervalues():
+            self.failUnless(sequence[0] == 'down')
+            self.failUnless(set(sequence[1:-1]) <= set(['move']))
+            self.failUnless('up' not in sequence[:-1])
+        return types
+
+    def testTouches(self):
+        for pattern in ('walk', 'swipe', 'tap'):
+            played = self.play('touches=6,seed=1,pattern=%s' % pattern)
+            # the first frame only start the clock of the provider
+            self.failUnless(played[0] == [])
+            for events in played[1:]:
+                self.failUnless(len(events) == 6)
+                self.failUnless(len(set([e[1] for e in events])) == 6)
+            types = self.check_sequences(played)
+            self.failUnless(len(types) > 6)
+
+    def testMixed(self):
+        played = self.play('touches=20,seed=2')
+        self.check_sequences(played)
+        self.failUnless(played == self.play('touches=20,seed=2'))
+
+    def testInvalidOptions(self):
+        for args in ('touches=abc', 'touches=-1', 'rate=0', 'rate=-5',
+                     'rate=nan', 'rate=x', 'seed=1.5', 'unknown=1'):
+            provider = SyntheticTouchProvider(None, args)
+            self.failUnless(provider.count == 10)
+            self.failUnless(provider.rate == 60)
+        provider = SyntheticTouchProvider(None, 'touches=3,rate=30.5,seed=4')
+        self.failUnless(provider.count == 3 and provider.rate == 30.5)
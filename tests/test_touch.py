@@ -0,0 +1,94 @@
+import weakref
+import unittest
+from pymt.input.touch import Touch
+from pymt.input.history import TouchHistory
+
+__all__ = ['TouchTestCase']
+
+class PoolTouch(Touch):
+    __slots__ = ()
+    def depack(self, args):
+        self.sx, self.sy = args
+        super(PoolTouch, self).depack(args)
+
+class TouchTestCase(unittest.TestCase):
+    def testSlots(self):
+        touch = PoolTouch(None, 1, (.5, .5))
+        self.failUnless(touch.spos == (.5, .5))
+        self.failUnless(touch.userdata == {})
+        touch.custom = 1
+        self.failUnless(touch.custom == 1)
+
+    def testReuse(self):
+        touch = PoolTouch.create(None, 1, (.1, .2))
+        touch.custom = 1
+        uid = touch.uid
+        touch.release()
+        del touch
+        touch = PoolTouch.create(None, 2, (.3, .4))
+        self.failUnless(touch.uid != uid)
+        self.failUnless(touch.id == 2 and touch.opos == (.3, .4))
+        self.failUnless(not hasattr(touch, 'custom'))
+
+    def testReferenced(self):
+        touch = PoolTouch.create(None, 1, (.1, .2))
+        touch.release()
+        other = PoolTouch.create(None, 2, (.3, .4))
+        self.failUnless(other is not touch)
+        self.failUnless(touch.id == 1)
+
+    def testHistory(self):
+        history = TouchHistory(size=3)
+        for t, x in ((0, 0), (1, 1), (2, 3), (3, 6)):
+            history.append(t, x, 0)
+        self.failUnless(len(history) == 3)
+        self.failUnless(history[0] == (1, 1, 0))
+        self.failUnless(history.positions() == [(1, 0), (3, 0), (6, 0)])
+        self.failUnless(history.path_length == 6)
+        self.failUnless(history.velocity() == (3, 0))
+        self.failUnless(history.velocity(2) == (2.5, 0))
+        self.failUnless(history.acceleration() == (1, 0))
+
+    def testHistoryWrap(self):
+        history = TouchHistory(size=4)
+        for t in xrange(10):
+            history.append(t, t * 2, -t)
+        self.failUnless(list(history.get_times()) == [6, 7, 8, 9])
+        self.failUnless(list(history) == [(6, 12, -6), (7, 14, -7),
+                                          (8, 16, -8), (9, 18, -9)])
+        self.failUnless(history.positions(.5, 2) == [(6, -12), (7, -14),
+                                                     (8, -16), (9, -18)])
+        # the last position at least 2.5s before is t=6
+        self.failUnless(history.velocity(2.5) == (2, -1))
+        # longer than the history: the oldest position is used
+        self.failUnless(history.velocity(100) == (2, -1))
+
+    def testTouchHistory(self):
+        touch = PoolTouch(None, 1, (.1, .2))
+        touch.move((.4, .6))
+        self.failUnless(touch.history.positions() == [(.1, .2), (.4, .6)])
+        # the moves are timestamped when received, not with the frame time
+        t0, t1 = touch.history.get_times()
+        self.failUnless(t1 > t0)
+
+    def testWeakReferenced(self):
+        touch = PoolTouch.create(None, 1, (.1, .2))
+        ref = weakref.ref(touch)
+        touch.release()
+        del touch
+        other = PoolTouch.create(None, 2, (.3, .4))
+        self.failUnless(ref() is not other)
+        self.failUnless(ref().id == 1)
+
+    def testReleaseReferences(self):
+        touch = PoolTouch.create(None, 1, (.1, .2))
+        widget = object()
+        touch.grab(widget, exclusive=True)
+        userdata = touch.userdata
+        userdata['key'] = widget
+        touch.release()
+        self.failUnless(touch.grab_list == [])
+        self.failUnless(touch.grab_exclusive_class is None)
+        self.failUnless(touch.userdata == {})
+        # the userdata taken before is still valid
+        self.failUnless(userdata['key'] is widget)
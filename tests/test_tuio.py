@@ -0,0 +1,55 @@
+import unittest
+from pymt.input.providers.tuio import TuioTouchProvider
+
+__all__ = ['TuioTestCase']
+
+CUR = '/tuio/2Dcur'
+
+def frame(fseq, alive, *sets):
+    messages = [(CUR, ['alive'] + list(alive), None)]
+    for args in sets:
+        messages.append((CUR, ['set'] + list(args), None))
+    messages.append((CUR, ['fseq', fseq], None))
+    return messages
+
+class TuioTestCase(unittest.TestCase):
+    def setUp(self):
+        self.provider = TuioTouchProvider(None, '127.0.0.1:0')
+        self.provider.start()
+        self.events = []
+
+    def tearDown(self):
+        self.provider.stop()
+
+    def dispatch(self, type, touch):
+        self.events.append((type, touch.id, touch.sx))
+
+    def process(self, messages):
+        self.events = []
+        self.provider.process(self.dispatch, messages)
+        return self.events
+
+    def testFrame(self):
+        # only the last set of a touch is applied
+        events = self.process(frame(10, [1], (1, .1, .5), (1, .2, .5)))
+        self.failUnless(events == [('down', 1, .2)])
+        events = self.process(frame(11, []))
+        self.failUnless(events == [('up', 1, .2)])
+
+    def testStaleFrame(self):
+        self.process(frame(10, [1], (1, .1, .5)))
+        # older or already seen frames are ignored
+        self.failUnless(self.process(frame(9, [])) == [])
+        self.failUnless(self.process(frame(10, [1], (1, .3, .5))) == [])
+        events = self.process(frame(11, [1], (1, .4, .5)))
+        self.failUnless(events == [('move', 1, .4)])
+        # redundant frames are always applied
+        events = self.process(frame(-1, [1], (1, .5, .5)))
+        self.failUnless(events == [('move', 1, .5)])
+
+    def testRestartedTracker(self):
+        self.process(frame(5000, [1], (1, .1, .5)))
+        # a big step back: the tracker was restarted
+        events = self.process(frame(1, [2], (2, .2, .5)))
+        self.failUnless(events == [('down', 2, .2), ('up', 1, .1)])
+        self.failUnless(self.process(frame(1, [])) == [])
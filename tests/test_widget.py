@@ -0,0 +1,120 @@
+import unittest
+import pymt.base as base
+from pymt.affine import AffineTransform
+from pymt.ui.widgets.widget import MTWidget
+from pymt.ui.widgets.scatter import MTScatterWidget
+
+__all__ = ['WidgetTestCase']
+
+class FakeWindow(object):
+    need_redraw = False
+
+class WidgetTestCase(unittest.TestCase):
+    def tearDown(self):
+        base.setWindow(None)
+
+    def testInvalidate(self):
+        window = FakeWindow()
+        base.setWindow(window)
+        w = MTWidget()
+        child = MTWidget()
+        for action in (lambda: setattr(w, 'pos', (10, 10)),
+                       lambda: setattr(w, 'size', (50, 50)),
+                       lambda: setattr(w, 'visible', False),
+                       lambda: w.add_widget(child),
+                       lambda: w.remove_widget(child)):
+            window.need_redraw = False
+            action()
+            self.failUnless(window.need_redraw)
+        # nothing changed
+        window.need_redraw = False
+        w.pos = (10, 10)
+        self.failUnless(not window.need_redraw)
+
+    def testCulled(self):
+        viewport = (0, 0, 100, 100)
+        root = MTWidget()
+        w = MTWidget(pos=(200, 200), size=(50, 50))
+        root.add_widget(w)
+        self.failUnless(w.is_culled(viewport))
+        self.failUnless(not w.is_culled(None))
+        w.pos = (80, 80)
+        self.failUnless(not w.is_culled(viewport))
+        w.pos = (200, 200)
+        w.cull = False
+        self.failUnless(not w.is_culled(viewport))
+
+    def testCulledChildren(self):
+        # children can draw outside of their parent
+        viewport = (0, 0, 100, 100)
+        root = MTWidget()
+        w = MTWidget(pos=(200, 200), size=(50, 50))
+        root.add_widget(w)
+        w.add_widget(MTWidget(pos=(0, 0), size=(10, 10)))
+        self.failUnless(not w.is_culled(viewport))
+
+    def testCulledScatter(self):
+        # the bounding box is computed through the scatter transformation
+        viewport = (0, 0, 100, 100)
+        root = MTWidget()
+        scatter = MTScatterWidget(size=(10, 10))
+        root.add_widget(scatter)
+        w = MTWidget(pos=(200, 200), size=(50, 50))
+        scatter.add_widget(w)
+        self.failUnless(w.is_culled(viewport))
+        scatter.transform = AffineTransform.translation(-180, -180)
+        self.failUnless(not w.is_culled(viewport))
+
+    def testTransformCache(self):
+        root = MTWidget()
+        a, b = MTScatterWidget(), MTScatterWidget()
+        root.add_widget(a)
+        root.add_widget(b)
+        child = MTWidget()
+        a.add_widget(child)
+        m = child.get_window_matrix()
+        mb = b.get_window_matrix()
+        self.failUnless(child.get_window_matrix() is m)
+        # only the subtree of the transformed widget is invalidated
+        a.transform = AffineTransform.translation(10, 20)
+        self.failUnless(b.get_window_matrix() is mb)
+        self.failUnless(child.to_window(0, 0, initial=False) == (10, 20))
+        self.failUnless(child.to_widget(10, 20) == (0, 0))
+        # reparent
+        a.remove_widget(child)
+        b.add_widget(child)
+        self.failUnless(child.to_window(0, 0, initial=False) == (0, 0))
+
+    def testCustomTransform(self):
+        class OffsetWidget(MTWidget):
+            def to_parent(self, x, y):
+                return x + 5, y
+            def to_local(self, x, y):
+                return x - 5, y
+        root = MTWidget()
+        w = OffsetWidget()
+        root.add_widget(w)
+        child = MTWidget()
+        w.add_widget(child)
+        self.failUnless(child.get_window_matrix() is None)
+        self.failUnless(child.to_window(1, 1, initial=False) == (6, 1))
+        self.failUnless(child.to_window(1, 1) == (6, 1))
+        self.failUnless(child.to_widget(6, 1) == (1, 1))
+
+    def testScatterTransformMat(self):
+        # setting the matrix update the spatial index and ask a redraw
+        window = FakeWindow()
+        base.setWindow(window)
+        root = MTWidget(spatial_index=True)
+        scatter = MTScatterWidget(size=(10, 10))
+        root.add_widget(scatter)
+        self.failUnless(root.spatial_index.get_children_at(
+                        root.children, 5, 5) == [scatter])
+        window.need_redraw = False
+        scatter.transform_mat = \
+            AffineTransform.translation(500, 500).to_gl()
+        self.failUnless(window.need_redraw)
+        self.failUnless(root.spatial_index.get_children_at(
+                        root.children, 5, 5) == [])
+        self.failUnless(root.spatial_index.get_children_at(
+                        root.children, 505, 505) == [scatter])
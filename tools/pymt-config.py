@@ -1,9 +1,61 @@
 #!/usr/bin/env python
 
 from __future__ import with_statement
+import sys
+import time
+import __builtin__
+
+class ImportTimer(object):
+    '''Measure the import time of each module, like "python -X importtime"'''
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._import = None
+
+    def install(self):
+        self._import = __builtin__.__import__
+        __builtin__.__import__ = self.timed_import
+
+    def uninstall(self):
+        __builtin__.__import__ = self._import
+
+    def timed_import(self, name, *largs, **kwargs):
+        count = len(sys.modules)
+        self._stack.append(0.)
+        start = time.time()
+        try:
+            return self._import(name, *largs, **kwargs)
+        finally:
+            duration = time.time() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += duration
+            # report only the imports that loaded a new module
+            if len(sys.modules) > count:
+                self.records.append((len(self._stack), name,
+                                     duration - children, duration))
+
+    def report(self):
+        print 'import time: self [us] | cumulative | imported package'
+        for depth, name, selftime, duration in self.records:
+            print 'import time: %9d | %10d | %s%s' % (
+                selftime * 1000000, duration * 1000000, '  ' * depth, name)
+
+# Report the import time of PyMT, light part and heavy subsystems
+if '--import-time' in sys.argv:
+    sys.argv.remove('--import-time')
+    timer = ImportTimer()
+    timer.install()
+    try:
+        import pymt
+        pymt.pymt_import_all()
+    finally:
+        timer.uninstall()
+        timer.report()
+    sys.exit(0)
+
 from Tkinter import *
 import tkMessageBox
-import sys
 from pymt import pymt_modules, pymt_config, pymt_config_fn, curry
 
 class AutoConfig(dict):